@@ -58,13 +58,15 @@ async function processResume(text, role, exp, isFile = false) {
     }
 
     console.log(`[UI] Extracted skills: ${skills.join(', ')}, level: ${experience}`);
-    const qRes = await postJson('/generate-questions', {
+    // The backend keeps skills/role for the session; answers only send the session ID
+    const qRes = await postJson('/sessions', {
       role,
       experience_level: exp || experience,
       skills
     });
 
     window.currentSession = {
+      sessionId: qRes.session_id,
       resumeText: isFile ? skills.join(', ') : text,
       skills, experience, role,
       questions: qRes.questions,
@@ -191,7 +193,7 @@ function setupResumeForm() {
 // ============================================================================
 
 window.currentSession = {
-  resumeText: '', skills: [], experience: '', role: '', questions: [], evaluations: []
+  sessionId: null, resumeText: '', skills: [], experience: '', role: '', questions: [], evaluations: []
 };
 
 window.evaluateAnswer = async function(questionId, question) {
@@ -204,10 +206,9 @@ window.evaluateAnswer = async function(questionId, question) {
 
   try {
     console.log(`[UI] Evaluating answer for Q${questionId}...`);
-    const evalRes = await postJson('/evaluate-answer', {
-      question, answer,
-      resume_skills: window.currentSession.skills,
-      role: window.currentSession.role
+    const evalRes = await postJson(`/sessions/${window.currentSession.sessionId}/answers`, {
+      question_id: questionId,
+      answer
     });
 
     window.currentSession.evaluations.push({ questionId, question, answer, evaluation: evalRes });
@@ -0,0 +1,162 @@
+"""Per-route admission control: concurrency budgets with a bounded wait queue."""
+import asyncio
+import os
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional
+
+from fastapi.responses import JSONResponse
+
+from extraction import PDF_WORKERS
+from metrics import ADMISSION_ACTIVE, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTIONS_TOTAL
+from profiling import stage
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Uploads mostly wait on the PDF pool, so a couple per pool worker keeps it busy
+ADMISSION_UPLOAD_CONCURRENCY = int(os.environ.get("ADMISSION_UPLOAD_CONCURRENCY", str(max(2, 2 * PDF_WORKERS))))
+ADMISSION_UPLOAD_QUEUE = int(os.environ.get("ADMISSION_UPLOAD_QUEUE", "32"))
+ADMISSION_SCORING_CONCURRENCY = int(os.environ.get("ADMISSION_SCORING_CONCURRENCY", "64"))
+ADMISSION_SCORING_QUEUE = int(os.environ.get("ADMISSION_SCORING_QUEUE", "256"))
+# Longest a request may wait for a slot before it is turned away
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT_SECONDS", "10"))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.environ.get("ADMISSION_RETRY_AFTER_SECONDS", "2"))
+
+
+class Overloaded(Exception):
+    """A budget could not admit the request; ``reason`` is queue_full or timeout."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+# ============================================================================
+# BUDGETS
+# ============================================================================
+
+class Budget:
+    """At most ``limit`` requests run at once and at most ``queue`` wait, first come first served.
+
+    Only touched from the event loop, so plain counters are enough. A
+    finishing request hands its slot straight to the oldest waiter.
+    """
+
+    def __init__(self, name: str, limit: int, queue: int, timeout: float = ADMISSION_QUEUE_TIMEOUT_SECONDS):
+        self.name = name
+        self.limit = max(1, limit)
+        self.queue = max(0, queue)
+        self.timeout = timeout
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        if self.active < self.limit and not self._waiters:
+            self._admit()
+            return
+        if len(self._waiters) >= self.queue:
+            raise Overloaded("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        ADMISSION_QUEUE_DEPTH.set(self.name, value=len(self._waiters))
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                # The slot arrived as the timer fired; keep it
+                return
+            self._waiters.remove(waiter)
+            ADMISSION_QUEUE_DEPTH.set(self.name, value=len(self._waiters))
+            raise Overloaded("timeout") from None
+        except BaseException:
+            # Cancelled while waiting: drop out of line, or pass on a slot already handed over
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+                ADMISSION_QUEUE_DEPTH.set(self.name, value=len(self._waiters))
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            ADMISSION_QUEUE_DEPTH.set(self.name, value=len(self._waiters))
+            if not waiter.done():
+                # The slot moves to the waiter; active stays the same
+                waiter.set_result(None)
+                return
+        self.active -= 1
+        ADMISSION_ACTIVE.set(self.name, value=self.active)
+
+    def _admit(self) -> None:
+        self.active += 1
+        ADMISSION_ACTIVE.set(self.name, value=self.active)
+
+    def stats(self) -> Dict[str, int]:
+        return {"active": self.active, "limit": self.limit, "waiting": self.waiting, "queue": self.queue}
+
+
+def default_budgets() -> Dict[str, Budget]:
+    """Separate budgets so slow uploads cannot starve the cheap scoring endpoints."""
+    return {
+        "upload": Budget("upload", ADMISSION_UPLOAD_CONCURRENCY, ADMISSION_UPLOAD_QUEUE),
+        "scoring": Budget("scoring", ADMISSION_SCORING_CONCURRENCY, ADMISSION_SCORING_QUEUE),
+    }
+
+
+# ============================================================================
+# MIDDLEWARE
+# ============================================================================
+
+class AdmissionMiddleware:
+    """Run requests for the listed path prefixes under their budget.
+
+    Paths that match no prefix (health checks, metrics) are never queued
+    or rejected. Rejected requests get a 503 with Retry-After instead of
+    piling onto an overloaded worker.
+    """
+
+    def __init__(self, app, budgets: Dict[str, Budget], routes: Dict[str, Iterable[str]]):
+        self.app = app
+        self.budgets = budgets
+        # Longest prefix first so "/evaluate-answers" is not caught by a shorter one
+        self.routes = sorted(
+            ((prefix, budgets[name]) for name, prefixes in routes.items() for prefix in prefixes),
+            key=lambda item: -len(item[0]),
+        )
+
+    def budget_for(self, path: str) -> Optional[Budget]:
+        for prefix, budget in self.routes:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return budget
+        return None
+
+    async def __call__(self, scope, receive, send):
+        budget = self.budget_for(scope["path"]) if scope["type"] == "http" else None
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            with stage("admission"):
+                await budget.acquire()
+        except Overloaded as e:
+            ADMISSION_REJECTIONS_TOTAL.inc(budget.name, e.reason)
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server is busy, retry shortly"},
+                headers={"Retry-After": str(ADMISSION_RETRY_AFTER_SECONDS)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            budget.release()
@@ -0,0 +1,224 @@
+"""Resume analysis logic shared by the API endpoints and offline tooling."""
+import re
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+# ============================================================================
+# KEYWORD TABLES
+# ============================================================================
+
+SKILL_KEYWORDS: Dict[str, List[str]] = {
+    "python": ["python", "django", "flask", "fastapi", "pandas", "numpy"],
+    "javascript": ["javascript", "js", "node", "react", "vue", "angular"],
+    "sql": ["sql", "mysql", "postgresql", "sqlite", "oracle"],
+    "docker": ["docker", "kubernetes", "k8s", "container"],
+    "aws": ["aws", "ec2", "s3", "lambda", "cloudformation"],
+    "git": ["git", "github", "gitlab", "bitbucket"],
+    "linux": ["linux", "ubuntu", "centos", "bash", "shell"],
+    "api": ["api", "rest", "graphql", "json", "http"],
+    "testing": ["pytest", "unittest", "jest", "selenium", "cypress"],
+    "ci/cd": ["jenkins", "github actions", "gitlab ci", "travis", "circleci"]
+}
+
+SENIOR_KEYWORDS: List[str] = ["senior", "lead", "principal", "architect", "manager", "director"]
+
+ADVANCED_SKILLS: List[str] = ["architect", "distributed", "microservices", "scalability"]
+
+# Group names for the non-skill keyword lists; they cannot collide with skills.
+SENIOR_TAG = "__senior__"
+ADVANCED_TAG = "__advanced__"
+
+# Part of every analysis cache key; bump it whenever the tables or the detection
+# rules change, so cached results from the old rules are never served.
+ANALYZER_VERSION = 2
+
+YEARS_PATTERN = re.compile(r'(\d+)\+?\s*years?')
+
+
+# ============================================================================
+# KEYWORD MATCHER
+# ============================================================================
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """Build a regex alternation factored as a prefix trie.
+
+    A flat ``a|b|c`` alternation is retried keyword by keyword at every
+    position; the trie form only follows characters that can still match,
+    so a scan stays linear in text length however large the taxonomy gets.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, dict]) -> str:
+        terminal = "" in node
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not terminal:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if terminal else group
+
+    return emit(trie)
+
+
+class KeywordMatcher:
+    """Find which keyword groups occur in a text with one regex pass.
+
+    Keywords only match on word boundaries, so "js" does not fire inside
+    "json". With ``plurals`` a trailing "s" is also accepted ("projects"
+    counts for "project"), and with ``versions`` a trailing version number
+    ("python3", "angular2.1"). Keywords of the ``stem_groups`` also match as
+    the start of a longer word ("leadership" for "lead"). ``patterns`` maps
+    extra group names to raw regexes that are scanned in the same pass.
+    Input text is expected to be lowercased already.
+    """
+
+    def __init__(
+        self,
+        groups: Dict[str, Iterable[str]],
+        patterns: Optional[Dict[str, str]] = None,
+        plurals: bool = False,
+        versions: bool = False,
+        stem_groups: Iterable[str] = (),
+    ):
+        owners: Dict[str, Set[str]] = {}
+        for group, keywords in groups.items():
+            for kw in keywords:
+                owners.setdefault(kw.lower(), set()).add(group)
+
+        # The scan is greedy and non-overlapping, so "github actions" consumes
+        # "github". Fold the groups of every keyword nested inside a longer one
+        # into that keyword's tags so nested hits are still reported.
+        self._tags: Dict[str, FrozenSet[str]] = {}
+        for kw in owners:
+            tags = set()
+            spans = [m.span() for m in re.finditer(r"\w+", kw)]
+            for i, (start, _) in enumerate(spans):
+                for _, end in spans[i:]:
+                    tags |= owners.get(kw[start:end], set())
+            self._tags[kw] = frozenset(tags | owners[kw])
+
+        patterns = patterns or {}
+        self._pattern_tags: Dict[str, FrozenSet[str]] = {}
+        alternatives = []
+        for i, (group, regex) in enumerate(patterns.items()):
+            self._pattern_tags[f"p{i}"] = frozenset([group])
+            alternatives.append(f"(?P<p{i}>{regex})")
+        suffixes = (["s"] if plurals else []) + ([r"\d+(?:\.\d+)*"] if versions else [])
+        suffix = "(?:" + "|".join(suffixes) + ")?" if suffixes else ""
+        alternatives.append(r"(?<!\w)(?P<kw>" + _trie_regex(owners) + ")" + suffix + r"(?!\w)")
+        # Tried after whole keywords, so a word that is exactly a keyword keeps all its groups
+        stems = {kw for group in stem_groups for kw in groups[group]}
+        if stems:
+            alternatives.append(r"(?<!\w)(?P<stem>" + _trie_regex(kw.lower() for kw in stems) + r")\w*")
+
+        self.groups: FrozenSet[str] = frozenset(groups) | frozenset(patterns)
+        # Longest keyword match, plural "s" included; ``patterns``, versions and stems are not bounded by it
+        self.longest_keyword = max(map(len, owners), default=0) + (1 if plurals else 0)
+        self._pattern = re.compile("|".join(alternatives))
+
+    def _match_tags(self, match: "re.Match[str]") -> FrozenSet[str]:
+        if match.lastgroup in ("kw", "stem"):
+            # The group holds the keyword alone, without a plural, version or stem suffix
+            return self._tags[match.group(match.lastgroup)]
+        return self._pattern_tags[match.lastgroup]
+
+    def find(self, text: str) -> Set[str]:
+        """Return the set of group names with at least one keyword in ``text``."""
+        found: Set[str] = set()
+        for match in self._pattern.finditer(text):
+            found |= self._match_tags(match)
+            if len(found) == len(self.groups):
+                break
+        return found
+
+    def matches(self, text: str, pos: int = 0) -> Iterator[Tuple[int, int, FrozenSet[str]]]:
+        """Yield (start, end, groups) for each hit at or after ``pos``, left to right."""
+        for match in self._pattern.finditer(text, pos):
+            yield match.start(), match.end(), self._match_tags(match)
+
+    def count(self, text: str) -> Counter:
+        """Return the number of hits per group name in ``text``."""
+        counts: Counter = Counter()
+        for match in self._pattern.finditer(text):
+            counts.update(self._match_tags(match))
+        return counts
+
+
+# Plurals, versions and stems keep the detections of the original substring scan
+# ("containers", "python3", "leadership", "architected") without its false hits inside
+# unrelated words ("js" in "json")
+RESUME_MATCHER = KeywordMatcher(
+    {**SKILL_KEYWORDS, SENIOR_TAG: SENIOR_KEYWORDS, ADVANCED_TAG: ADVANCED_SKILLS},
+    plurals=True,
+    versions=True,
+    stem_groups=[SENIOR_TAG, ADVANCED_TAG],
+)
+
+
+# ============================================================================
+# ANALYSIS
+# ============================================================================
+
+def analyze_text(text: str) -> Tuple[List[str], str]:
+    """Extract skills and infer an experience level from resume text."""
+    text_lower = text.lower()
+    found = RESUME_MATCHER.find(text_lower)
+
+    detected_skills = [skill for skill in SKILL_KEYWORDS if skill in found]
+
+    experience_score = 0
+
+    if SENIOR_TAG in found:
+        experience_score += 3
+
+    years_match = YEARS_PATTERN.search(text_lower)
+    if years_match:
+        years = int(years_match.group(1))
+        if years >= 7:
+            experience_score += 3
+        elif years >= 4:
+            experience_score += 2
+        elif years >= 2:
+            experience_score += 1
+
+    if ADVANCED_TAG in found:
+        experience_score += 2
+
+    if experience_score >= 5:
+        level = "senior"
+    elif experience_score >= 3:
+        level = "mid"
+    else:
+        level = "junior"
+
+    return detected_skills, level
+
+
+class AnalysisProgress:
+    """Track analysis evidence across chunks of a document read in order.
+
+    ``feed`` returns True once reading more text cannot change the result
+    of analyze_text(): every skill and level signal has been seen and the
+    first years-of-experience mention is already in the text read.
+    """
+
+    def __init__(self):
+        self.found: Set[str] = set()
+        self.has_years = False
+
+    def feed(self, chunk: str) -> bool:
+        chunk_lower = chunk.lower()
+        self.found |= RESUME_MATCHER.find(chunk_lower)
+        self.has_years = self.has_years or YEARS_PATTERN.search(chunk_lower) is not None
+        return self.complete
+
+    @property
+    def complete(self) -> bool:
+        return self.has_years and len(self.found) == len(RESUME_MATCHER.groups)
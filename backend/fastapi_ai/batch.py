@@ -0,0 +1,285 @@
+"""Offline batch analysis of resume archives, without the HTTP service.
+
+Usage:
+    python batch.py resumes/ --output results.jsonl
+    python batch.py archive.zip more/ --output results.csv --workers 8
+
+Inputs are files, directories (walked recursively) and zip archives of
+PDF/TXT resumes. Each one is read, extracted and analyzed inside a pool
+worker, exactly as /upload-resume would, and one result row is written per
+file as soon as it finishes. The output format follows the file extension
+(.jsonl or .csv) unless --format is given.
+
+Runs are resumable: when the output already exists, files it lists are
+skipped and new rows are appended, so an interrupted run is finished by
+rerunning the same command.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Set, TextIO, Tuple
+
+from analysis import analyze_text
+from extraction import (
+    PDF_MAX_CHARS,
+    PDF_MAX_PAGES,
+    PDF_TIMEOUT_SECONDS,
+    PDF_WORKERS,
+    PDFExtractionError,
+    PDFExtractionTimeout,
+    extract_pdf_tiered,
+    sniff_file_type,
+    time_limit,
+)
+
+
+# Bytes sniffed for the file type, as for uploads
+SNIFF_BYTES = 64 * 1024
+# Tasks queued per worker, so workers never idle while results are written
+TASKS_PER_WORKER = 4
+PROGRESS_INTERVAL_SECONDS = 0.5
+# Extra time past --timeout for reading and analysis before the whole file is abandoned
+TIMEOUT_GRACE_SECONDS = 5.0
+CSV_FIELDS = ["source", "skills", "experience_level", "pages", "tier", "error"]
+
+# (source label, path on disk, zip member or None)
+Source = Tuple[str, str, Optional[str]]
+
+
+# ============================================================================
+# INPUTS
+# ============================================================================
+
+def iter_sources(paths: List[str]) -> Iterator[Source]:
+    """Yield every resume under ``paths``; zip members are labelled "archive.zip!member"."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    yield from iter_sources([os.path.join(root, name)])
+        elif zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir():
+                        yield f"{path}!{info.filename}", path, info.filename
+        else:
+            yield path, path, None
+
+
+# Open archives of this worker process, so members are not re-indexed per file
+_archives: Dict[str, zipfile.ZipFile] = {}
+
+
+def _read(path: str, member: Optional[str]) -> bytes:
+    if member is None:
+        with open(path, "rb") as f:
+            return f.read()
+    archive = _archives.get(path)
+    if archive is None:
+        archive = _archives[path] = zipfile.ZipFile(path)
+    return archive.read(member)
+
+
+# ============================================================================
+# WORKER SIDE
+# ============================================================================
+
+def analyze_source(source: Source, timeout: float, max_pages: int) -> Dict:
+    """Read, extract and analyze one resume; errors become an ``error`` field."""
+    label, path, member = source
+    row: Dict = {"source": label}
+    content = b""
+    try:
+        with time_limit(timeout + TIMEOUT_GRACE_SECONDS if timeout else None):
+            content = _read(path, member)
+            kind = sniff_file_type(content[:SNIFF_BYTES])
+            if kind is None:
+                raise ValueError("Only PDF and TXT files are supported")
+            if kind == "pdf":
+                text, row["pages"], row["tier"] = extract_pdf_tiered(content, max_pages, timeout, PDF_MAX_CHARS)
+            else:
+                text = content.decode("utf-8")
+            if not text.strip():
+                raise ValueError("Could not extract text from file")
+            row["skills"], row["experience_level"] = analyze_text(text)
+    except PDFExtractionError:
+        row["error"] = "Invalid or corrupted PDF file"
+    except PDFExtractionTimeout:
+        row["error"] = "PDF took too long to process"
+    except UnicodeDecodeError:
+        row["error"] = "Text files must be UTF-8 encoded"
+    except (OSError, ValueError, zipfile.BadZipFile) as e:
+        row["error"] = str(e)
+    except Exception as e:
+        # Encrypted or unsupported zip members, parser bugs: one bad file must not end the run
+        row["error"] = f"Error processing file: {str(e)}"
+    row["bytes"] = len(content)
+    return row
+
+
+# ============================================================================
+# OUTPUT
+# ============================================================================
+
+def _truncate_partial_line(path: str) -> None:
+    """Drop a last line cut short by an interrupted write, so appends start cleanly."""
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end != len(data):
+            f.truncate(end)
+
+
+def completed_sources(path: str, fmt: str) -> Set[str]:
+    """Sources already present in an existing output file."""
+    if not os.path.exists(path):
+        return set()
+    _truncate_partial_line(path)
+    with open(path, encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            return {row["source"] for row in csv.DictReader(f)}
+        return {json.loads(line)["source"] for line in f if line.strip()}
+
+
+class ResultWriter:
+    """Append result rows as JSON lines or CSV records, flushing each one."""
+
+    def __init__(self, out: TextIO, fmt: str, header: bool):
+        self.out = out
+        self.fmt = fmt
+        self.csv = csv.DictWriter(out, CSV_FIELDS, extrasaction="ignore") if fmt == "csv" else None
+        if self.csv is not None and header:
+            self.csv.writeheader()
+
+    def write(self, row: Dict) -> None:
+        if self.csv is not None:
+            self.csv.writerow({**row, "skills": " ".join(row.get("skills", []))})
+        else:
+            self.out.write(json.dumps({k: v for k, v in row.items() if k != "bytes"}, ensure_ascii=False) + "\n")
+        self.out.flush()
+
+
+# ============================================================================
+# RUN
+# ============================================================================
+
+class Progress:
+    """Counters for the progress line and the final summary."""
+
+    def __init__(self, total: int, skipped: int, stream: Optional[TextIO]):
+        self.total = total
+        self.skipped = skipped
+        self.stream = stream
+        self.done = 0
+        self.errors = 0
+        self.pages = 0
+        self.bytes = 0
+        # PDFs by the extraction tier that read them
+        self.tiers: Dict[str, int] = {}
+        self.start = time.perf_counter()
+        self._shown = 0.0
+        self.interrupted = False
+
+    def add(self, row: Dict) -> None:
+        self.done += 1
+        self.errors += "error" in row
+        self.pages += row.get("pages", 0)
+        self.bytes += row.get("bytes", 0)
+        if "tier" in row:
+            self.tiers[row["tier"]] = self.tiers.get(row["tier"], 0) + 1
+        now = time.perf_counter()
+        if self.stream is not None and (now - self._shown >= PROGRESS_INTERVAL_SECONDS or self.done == self.total):
+            self._shown = now
+            rate = self.done / max(now - self.start, 1e-9)
+            eta = (self.total - self.done) / rate if rate else 0
+            self.stream.write(
+                f"\r{self.done}/{self.total} files  {rate:.1f} files/s  {self.errors} errors  ETA {eta:.0f}s "
+            )
+            self.stream.flush()
+
+    def summary(self) -> str:
+        elapsed = time.perf_counter() - self.start
+        lines = [
+            f"{self.done} files analyzed in {elapsed:.1f}s ({self.done / max(elapsed, 1e-9):.1f} files/s, "
+            f"{self.bytes / 1e6 / max(elapsed, 1e-9):.1f} MB/s, {self.pages} PDF pages)",
+            f"{self.errors} errors, {self.skipped} already in the output",
+        ]
+        if self.tiers:
+            tiers = ", ".join(f"{tier} {count}" for tier, count in sorted(self.tiers.items()))
+            lines.append(f"PDFs by extraction tier: {tiers}")
+        if self.interrupted:
+            lines.append(f"Interrupted with {self.total - self.done} files left; rerun the same command to resume")
+        return "\n".join(lines)
+
+
+def run(paths: List[str], output: str, fmt: str, workers: int, timeout: float, max_pages: int,
+        progress_stream: Optional[TextIO] = None) -> Progress:
+    """Analyze every source not already in ``output`` and append the results.
+
+    Ctrl-C stops the run after writing the rows already finished and marks
+    the returned progress as interrupted.
+    """
+    done = completed_sources(output, fmt)
+    sources = [source for source in iter_sources(paths) if source[0] not in done]
+    progress = Progress(len(sources), len(done), progress_stream)
+    header = not os.path.exists(output) or not os.path.getsize(output)
+
+    with open(output, "a", encoding="utf-8", newline="") as out, ProcessPoolExecutor(max_workers=workers) as pool:
+        writer = ResultWriter(out, fmt, header)
+        # Futures in flight and the source each one analyzes
+        pending: Dict[Future, Source] = {}
+        queued = iter(sources)
+        try:
+            while True:
+                for source in queued:
+                    pending[pool.submit(analyze_source, source, timeout, max_pages)] = source
+                    if len(pending) >= workers * TASKS_PER_WORKER:
+                        break
+                if not pending:
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    source = pending.pop(future)
+                    try:
+                        row = future.result()
+                    except Exception as e:
+                        # The worker itself died (e.g. out of memory); record the file and go on
+                        row = {"source": source[0], "error": f"Error processing file: {str(e)}"}
+                    writer.write(row)
+                    progress.add(row)
+        except KeyboardInterrupt:
+            progress.interrupted = True
+            for future in pending:
+                future.cancel()
+        finally:
+            if progress_stream is not None and progress.done:
+                progress_stream.write("\n")
+    return progress
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="resume files, directories or zip archives")
+    parser.add_argument("--output", "-o", required=True, help="results file (.jsonl or .csv)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="output format (default: from the extension)")
+    parser.add_argument("--workers", type=int, default=PDF_WORKERS, help="worker processes (default: PDF_WORKERS)")
+    parser.add_argument("--timeout", type=float, default=PDF_TIMEOUT_SECONDS, help="per-PDF time budget in seconds")
+    parser.add_argument("--max-pages", type=int, default=PDF_MAX_PAGES, help="pages read per PDF")
+    parser.add_argument("--quiet", action="store_true", help="no progress line")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.output.lower().endswith(".csv") else "jsonl")
+    stream = None if args.quiet else sys.stderr
+    progress = run(args.inputs, args.output, fmt, max(1, args.workers), args.timeout, args.max_pages, stream)
+    print(progress.summary(), file=sys.stderr)
+    return 130 if progress.interrupted else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""Content-addressed result cache with LRU + TTL eviction and an optional SQLite tier."""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.environ.get("ANALYSIS_CACHE_MAX_ENTRIES", "10000"))
+ANALYSIS_CACHE_MAX_BYTES = int(os.environ.get("ANALYSIS_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+ANALYSIS_CACHE_TTL_SECONDS = float(os.environ.get("ANALYSIS_CACHE_TTL_SECONDS", str(24 * 3600)))
+# Path of the on-disk tier; unset keeps the cache in memory only.
+ANALYSIS_CACHE_DB = os.environ.get("ANALYSIS_CACHE_DB") or None
+
+# Expired rows are swept from the disk tier once every this many writes.
+_DISK_SWEEP_INTERVAL = 500
+
+
+def content_key(namespace: str, data: bytes) -> str:
+    """Build a cache key from the SHA-256 of ``data``."""
+    return f"{namespace}:{hashlib.sha256(data).hexdigest()}"
+
+
+def config_namespace(namespace: str, *config: Any) -> str:
+    """Qualify ``namespace`` with the settings its results depend on.
+
+    Keys made under another analyzer version or extraction config never
+    match, so the disk tier cannot serve results computed by older logic.
+    """
+    return f"{namespace}@{hashlib.sha256(repr(config).encode()).hexdigest()[:16]}"
+
+
+def normalize_text(text: str) -> str:
+    """Normalize resume text for keying; analysis is case-insensitive."""
+    return text.replace("\r\n", "\n").strip().lower()
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class ResultCache:
+    """LRU cache of JSON-serializable results, bounded by entries, bytes and age.
+
+    Entries live in an in-process OrderedDict. When ``db_path`` is set every
+    write also goes to a SQLite table, and memory misses fall back to it, so
+    results survive restarts and can be shared by processes on one host.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = ANALYSIS_CACHE_MAX_ENTRIES,
+        max_bytes: int = ANALYSIS_CACHE_MAX_BYTES,
+        ttl: float = ANALYSIS_CACHE_TTL_SECONDS,
+        db_path: Optional[str] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            # WAL lets every worker of a multi-process server read while one writes
+            self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=5.0)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, _, expires = entry
+                if expires > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires FROM results WHERE key = ? AND expires > ?", (key, now)
+                ).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._store(key, value, len(row[0]), row[1])
+                    self.disk_hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        encoded = json.dumps(value, separators=(",", ":"))
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._store(key, value, len(encoded), expires)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, value, expires) VALUES (?, ?, ?)",
+                    (key, encoded, expires)
+                )
+                self._writes += 1
+                if self._writes % _DISK_SWEEP_INTERVAL == 0:
+                    self._db.execute("DELETE FROM results WHERE expires <= ?", (time.time(),))
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """``get`` for async callers; disk tier lookups run in a thread, off the event loop."""
+        if self._db is None:
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: Any) -> None:
+        """``set`` for async callers; disk tier writes run in a thread, off the event loop."""
+        if self._db is None:
+            self.set(key, value)
+        else:
+            await asyncio.to_thread(self.set, key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "disk_tier": self._db is not None,
+            }
+
+    def _store(self, key: str, value: Any, size: int, expires: float) -> None:
+        if key in self._entries:
+            self._remove(key)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, size, expires)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+analysis_cache = ResultCache(db_path=ANALYSIS_CACHE_DB)
@@ -0,0 +1,475 @@
+"""Resume text extraction, run off the event loop in a process pool.
+
+PDFs go through extraction tiers in order: cheap passes first (see
+FAST_TIERS), each accepted only when its text passes a quality check, and
+the pdfplumber layout pass last for everything else.
+"""
+import asyncio
+import codecs
+import io
+import os
+import re
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Protocol, Tuple
+
+from metrics import (
+    PDF_BYTES_TOTAL,
+    PDF_EARLY_STOPS_TOTAL,
+    PDF_EXTRACTION_SECONDS_TOTAL,
+    PDF_EXTRACTIONS_IN_FLIGHT,
+    PDF_PAGES_TOTAL,
+    PDF_TIER_SECONDS,
+    PDF_TIER_TOTAL,
+)
+from pdfstream import PAGE_COUNT_PATTERN, UnsupportedPDF, extract_stream_text, page_count
+from profiling import record_stage
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", os.cpu_count() or 1))
+PDF_TIMEOUT_SECONDS = float(os.environ.get("PDF_TIMEOUT_SECONDS", "20"))
+PDF_MAX_PAGES = int(os.environ.get("PDF_MAX_PAGES", "30"))
+# Text read per PDF before the remaining pages are skipped
+PDF_MAX_CHARS = int(os.environ.get("PDF_MAX_CHARS", "100000"))
+# Longer PDFs are split into ranges of this many pages extracted in parallel
+PDF_PAGES_PER_TASK = int(os.environ.get("PDF_PAGES_PER_TASK", "4"))
+# Start the pool and import pdfplumber in every worker right after startup,
+# so the first PDF upload does not pay for process spawn and imports.
+PDF_WARMUP = os.environ.get("PDF_WARMUP", "1").lower() not in ("0", "false", "no")
+# Cheap extraction tiers tried, in order, before the layout pass (empty: layout only)
+PDF_FAST_TIERS = [name.strip() for name in os.environ.get("PDF_FAST_TIERS", "stream").split(",") if name.strip()]
+# Fast-tier text is used only with this many characters per page...
+PDF_FAST_MIN_CHARS_PER_PAGE = int(os.environ.get("PDF_FAST_MIN_CHARS_PER_PAGE", "100"))
+# ...and this share of them printable (ligatures in custom encodings come out unprintable and
+# break words), otherwise the next tier runs
+PDF_FAST_MIN_PRINTABLE = float(os.environ.get("PDF_FAST_MIN_PRINTABLE", "0.999"))
+
+PDF_MAGIC = b"%PDF-"
+# The PDF spec lets readers accept a header anywhere in the first 1KB.
+PDF_MAGIC_WINDOW = 1024
+
+
+class PDFExtractionError(Exception):
+    """The upload is not a readable PDF."""
+
+
+class PDFExtractionTimeout(Exception):
+    """Extraction did not finish within the per-document time budget."""
+
+
+LAYOUT = "layout"
+# Tier outcomes: text accepted, text rejected by the quality check, or the tier could not read the file
+HIT, LOW_QUALITY, UNSUPPORTED, ERROR = "hit", "low_quality", "unsupported", "error"
+
+# Control characters, unmapped bytes and private-use glyphs: signs of a font the raw pass cannot decode
+_UNPRINTABLE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f\ufffd\ue000-\uf8ff]")
+
+
+# ============================================================================
+# FILE TYPE SNIFFING
+# ============================================================================
+
+def sniff_file_type(head: bytes) -> Optional[str]:
+    """Classify an upload as "pdf" or "txt" from its first bytes.
+
+    Returns None for anything else (images, Office documents, archives...).
+    """
+    if PDF_MAGIC in head[:PDF_MAGIC_WINDOW]:
+        return "pdf"
+    if b"\x00" in head:
+        return None
+    try:
+        # Incremental decode so a multi-byte character split at the end of
+        # the sniffed chunk is not mistaken for binary data.
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+    except UnicodeDecodeError:
+        return None
+    return "txt"
+
+
+# ============================================================================
+# WORKER SIDE
+# ============================================================================
+
+@contextmanager
+def time_limit(seconds: Optional[float]) -> Iterator[None]:
+    """Raise PDFExtractionTimeout after ``seconds``, even inside one slow page.
+
+    Extraction only checks its deadline between pages; a SIGALRM timer also
+    covers a single pathological page, so a timed-out document frees its
+    pool worker. Pool workers run tasks on their main thread, so the signal
+    reaches them. Limits nest: an outer one still fires on time. Off the main
+    thread or without setitimer (Windows) only the between-page deadline
+    applies.
+    """
+    if seconds is None or not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+    if seconds <= 0:
+        raise PDFExtractionTimeout("PDF extraction exceeded its time budget")
+
+    def expired(signum, frame):
+        raise PDFExtractionTimeout("PDF extraction exceeded its time budget")
+
+    # Time left on an enclosing limit, 0 if there is none
+    outer = signal.getitimer(signal.ITIMER_REAL)[0]
+    start = time.monotonic()
+    previous = signal.signal(signal.SIGALRM, expired)
+    signal.setitimer(signal.ITIMER_REAL, min(seconds, outer) if outer else seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+        if outer:
+            # Re-arm the enclosing limit with what is left of it
+            signal.setitimer(signal.ITIMER_REAL, max(outer - (time.monotonic() - start), 1e-3))
+
+def extract_pdf_range(
+    content: bytes,
+    start: int,
+    stop: int,
+    deadline: Optional[float] = None,
+    max_chars: Optional[int] = None,
+) -> Tuple[List[str], int]:
+    """Extract the text of pages ``start``..``stop - 1`` of a PDF.
+
+    Returns one string per page read and the document's total page count.
+    Runs inside a pool worker. ``deadline`` is a time.time() value checked
+    between pages and enforced by time_limit() within them, so a
+    pathological document frees its worker instead of running forever;
+    reading also stops once ``max_chars`` have been read.
+    """
+    import pdfplumber
+
+    texts: List[str] = []
+    chars = 0
+    try:
+        with time_limit(deadline - time.time() if deadline else None):
+            with pdfplumber.open(io.BytesIO(content)) as pdf:
+                for page in pdf.pages[start:stop]:
+                    if deadline and time.time() > deadline:
+                        raise PDFExtractionTimeout("PDF extraction exceeded its time budget")
+                    page_text = page.extract_text() or ""
+                    texts.append(page_text)
+                    chars += len(page_text)
+                    if max_chars and chars >= max_chars:
+                        break
+                total = len(pdf.pages)
+    except PDFExtractionTimeout:
+        raise
+    except Exception as e:
+        raise PDFExtractionError(str(e)) from None
+    return texts, total
+
+
+def extract_pdf_pages(
+    content: bytes,
+    max_pages: int = PDF_MAX_PAGES,
+    timeout: Optional[float] = None,
+    max_chars: Optional[int] = None,
+) -> Tuple[str, int]:
+    """Extract text from the first ``max_pages`` pages of a PDF in one process.
+
+    Returns the text and the number of pages read.
+    """
+    deadline = time.time() + timeout if timeout else None
+    texts, _ = extract_pdf_range(content, 0, max_pages, deadline, max_chars)
+    return "\n".join(text for text in texts if text), len(texts)
+
+
+def extract_pdf_text(content: bytes, max_pages: int = PDF_MAX_PAGES, timeout: Optional[float] = None) -> str:
+    """Extract text from the first ``max_pages`` pages of a PDF."""
+    return extract_pdf_pages(content, max_pages, timeout)[0]
+
+
+def extract_pdf_stream(
+    content: bytes,
+    max_pages: int,
+    max_chars: Optional[int] = None,
+    deadline: Optional[float] = None,
+) -> Tuple[str, int]:
+    """The "stream" tier: operator text of the raw content streams (see pdfstream).
+
+    Needs the page count to honour ``max_pages``, so documents whose page
+    tree cannot be found, or that are longer, are left to the layout pass.
+    """
+    text, pages = extract_stream_text(content, max_chars, deadline)
+    if pages is None or pages > max_pages:
+        raise UnsupportedPDF("page count unknown or over the page cap")
+    return text, pages
+
+
+# Fast tiers by name: (content, max_pages, max_chars, deadline) -> (text, pages read), raising when
+# unusable and TimeoutError once the time.time() deadline passes
+FAST_TIERS: Dict[str, Callable[[bytes, int, Optional[int], Optional[float]], Tuple[str, int]]] = {
+    "stream": extract_pdf_stream,
+}
+
+
+def extract_pdf_fast(
+    tier: str,
+    content: bytes,
+    max_pages: int,
+    max_chars: Optional[int] = None,
+    deadline: Optional[float] = None,
+) -> Optional[Tuple[str, int]]:
+    """Run fast tier ``tier`` in a pool worker; None when it cannot read this document.
+
+    Raises PDFExtractionTimeout once ``deadline``, shared with the layout
+    pass, has passed.
+    """
+    try:
+        with time_limit(deadline - time.time() if deadline else None):
+            return FAST_TIERS[tier](content, max_pages, max_chars, deadline)
+    except PDFExtractionTimeout:
+        raise
+    except TimeoutError:
+        raise PDFExtractionTimeout("PDF extraction exceeded its time budget") from None
+    except Exception:
+        # Whatever a fast tier fails on, the layout pass gets its own chance at the file
+        return None
+
+
+def text_quality_ok(text: str, pages: int) -> bool:
+    """Whether fast-tier text looks like a document's words rather than undecoded glyphs."""
+    stripped = text.strip()
+    if len(stripped) < PDF_FAST_MIN_CHARS_PER_PAGE * max(1, pages):
+        return False
+    return 1 - len(_UNPRINTABLE.findall(stripped)) / len(stripped) >= PDF_FAST_MIN_PRINTABLE
+
+
+def extract_pdf_tiered(
+    content: bytes,
+    max_pages: int = PDF_MAX_PAGES,
+    timeout: Optional[float] = None,
+    max_chars: Optional[int] = None,
+) -> Tuple[str, int, str]:
+    """Extract text in one process, trying the fast tiers before the layout pass.
+
+    Returns the text, the number of pages read and the tier that produced it.
+    ``timeout`` covers all the tiers together.
+    """
+    deadline = time.time() + timeout if timeout else None
+    for tier in PDF_FAST_TIERS:
+        result = extract_pdf_fast(tier, content, max_pages, max_chars, deadline)
+        if result is not None and text_quality_ok(*result):
+            return result[0], result[1], tier
+    texts, _ = extract_pdf_range(content, 0, max_pages, deadline, max_chars)
+    return "\n".join(text for text in texts if text), len(texts), LAYOUT
+
+
+def extraction_config() -> Tuple:
+    """The settings that change which text a PDF yields, for keying cached results."""
+    return PDF_MAX_PAGES, PDF_MAX_CHARS, tuple(PDF_FAST_TIERS), PDF_FAST_MIN_CHARS_PER_PAGE, PDF_FAST_MIN_PRINTABLE
+
+
+def _load_pdf_stack() -> int:
+    """Import pdfplumber (and pdfminer under it) in the calling worker."""
+    import pdfplumber  # noqa: F401
+
+    return os.getpid()
+
+
+# ============================================================================
+# EVENT LOOP SIDE
+# ============================================================================
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Return the shared extraction pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=max(1, PDF_WORKERS))
+    return _executor
+
+
+def _discard_executor(broken: ProcessPoolExecutor) -> None:
+    """Drop a pool whose worker died, so get_executor() builds a new one."""
+    global _executor
+    if _executor is broken:
+        _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def warm_up_executor() -> int:
+    """Spawn the pool workers and load the PDF stack in each of them.
+
+    Meant to run as a background task after startup; returns how many
+    distinct workers were warmed. Failures are ignored because the first
+    real extraction will simply do the same work.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    try:
+        pids = await asyncio.gather(*(
+            loop.run_in_executor(executor, _load_pdf_stack) for _ in range(max(1, PDF_WORKERS))
+        ))
+    except Exception:
+        return 0
+    return len(set(pids))
+
+
+class ExtractionProgress(Protocol):
+    def feed(self, chunk: str) -> bool:
+        """Consume the next chunk of text; return True when no more is needed."""
+
+
+def estimate_page_count(content: bytes) -> Optional[int]:
+    """Read the page count from the raw PDF bytes without parsing, if visible.
+
+    Not visible when the page tree sits in a compressed object stream.
+    """
+    return page_count(PAGE_COUNT_PATTERN.findall(content))
+
+
+def plan_page_ranges(pages: int, per_task: Optional[int] = None) -> List[Tuple[int, int]]:
+    """Split the first ``pages`` pages into consecutive ranges of ``per_task`` pages."""
+    per_task = max(1, per_task or PDF_PAGES_PER_TASK)
+    return [(start, min(start + per_task, pages)) for start in range(0, pages, per_task)]
+
+
+async def extract_pdf_text_async(content: bytes, progress: Optional[ExtractionProgress] = None) -> str:
+    """Extract PDF text in the process pool without blocking the event loop.
+
+    The fast tiers run first, each as one pool task. When none of them is
+    accepted, long documents are split into page ranges extracted by several
+    workers at once. Ranges are consumed in page order, and the rest are
+    cancelled as soon as PDF_MAX_CHARS is reached or ``progress`` reports
+    that it has seen enough.
+    """
+    start = time.perf_counter()
+    PDF_EXTRACTIONS_IN_FLIGHT.inc()
+    pages = 0
+    try:
+        # The workers enforce the deadline themselves, inside a slow page too
+        # (see time_limit), so a timed-out PDF does not keep its pool slot;
+        # the extra second covers handing the result back.
+        texts, pages = await asyncio.wait_for(
+            _extract_retrying(content, progress, time.time() + PDF_TIMEOUT_SECONDS),
+            timeout=PDF_TIMEOUT_SECONDS + 1,
+        )
+    except asyncio.TimeoutError:
+        raise PDFExtractionTimeout(f"PDF extraction exceeded {PDF_TIMEOUT_SECONDS:g}s") from None
+    finally:
+        PDF_EXTRACTIONS_IN_FLIGHT.dec()
+        PDF_EXTRACTION_SECONDS_TOTAL.inc(amount=time.perf_counter() - start)
+
+    PDF_PAGES_TOTAL.inc(amount=pages)
+    PDF_BYTES_TOTAL.inc(amount=len(content))
+    return "\n".join(text for text in texts if text)
+
+
+def _record_tier(tier: str, outcome: str, seconds: float) -> None:
+    PDF_TIER_TOTAL.inc(tier, outcome)
+    PDF_TIER_SECONDS.observe(seconds, tier)
+    record_stage(f"pdf_{tier}", seconds)
+
+
+async def _extract_retrying(content: bytes, progress: Optional[ExtractionProgress], deadline: float) -> Tuple[List[str], int]:
+    """_extract_tiers() on a fresh pool if a worker died (OOM kill, crash in the parser) under it.
+
+    Concurrent extractions share the broken pool and each retry once on the
+    replacement; a document that breaks the new pool too is rejected.
+    """
+    for _ in range(2):
+        executor = get_executor()
+        try:
+            return await _extract_tiers(content, progress, deadline, executor)
+        except BrokenProcessPool:
+            _discard_executor(executor)
+    raise PDFExtractionError("PDF extraction crashed its worker")
+
+
+async def _extract_tiers(
+    content: bytes,
+    progress: Optional[ExtractionProgress],
+    deadline: float,
+    executor: ProcessPoolExecutor,
+) -> Tuple[List[str], int]:
+    loop = asyncio.get_running_loop()
+    for tier in PDF_FAST_TIERS:
+        start = time.perf_counter()
+        outcome = ERROR
+        try:
+            # Under the same deadline as the layout pass, so a slow raw pass cannot hold its worker
+            result = await loop.run_in_executor(
+                executor, extract_pdf_fast, tier, content, PDF_MAX_PAGES, PDF_MAX_CHARS, deadline)
+            outcome = UNSUPPORTED if result is None else HIT if text_quality_ok(*result) else LOW_QUALITY
+        finally:
+            _record_tier(tier, outcome, time.perf_counter() - start)
+        if outcome == HIT:
+            return [result[0]], result[1]
+
+    start = time.perf_counter()
+    outcome = ERROR
+    try:
+        texts, pages = await _extract_ranges(content, progress, deadline, executor)
+        outcome = HIT
+    finally:
+        _record_tier(LAYOUT, outcome, time.perf_counter() - start)
+    return texts, pages
+
+
+async def _extract_ranges(
+    content: bytes,
+    progress: Optional[ExtractionProgress],
+    deadline: float,
+    executor: ProcessPoolExecutor,
+) -> Tuple[List[str], int]:
+    loop = asyncio.get_running_loop()
+
+    def submit(first: int, last: int, max_chars: int) -> "asyncio.Future":
+        return loop.run_in_executor(executor, extract_pdf_range, content, first, last, deadline, max_chars)
+
+    # Neither the probe of an unknown-length document nor the fallback range may pass the page cap
+    first_range = (0, min(PDF_PAGES_PER_TASK, PDF_MAX_PAGES))
+    estimate = estimate_page_count(content)
+    if estimate is None:
+        # Unknown length: the first range reports the real page count
+        first = submit(*first_range, PDF_MAX_CHARS)
+        _, total = await first
+        ranges = plan_page_ranges(min(total, PDF_MAX_PAGES))
+        futures = [first] + [submit(a, b, PDF_MAX_CHARS) for a, b in ranges[1:]]
+    else:
+        ranges = plan_page_ranges(min(estimate, PDF_MAX_PAGES)) or [first_range]
+        futures = [submit(a, b, PDF_MAX_CHARS) for a, b in ranges]
+
+    texts: List[str] = []
+    chars = 0
+    try:
+        for i, future in enumerate(futures):
+            chunk, _ = await future
+            texts.extend(chunk)
+            chars += sum(len(text) for text in chunk)
+            remaining = i + 1 < len(futures)
+            if chars >= PDF_MAX_CHARS:
+                if remaining:
+                    PDF_EARLY_STOPS_TOTAL.inc("char_budget")
+                break
+            if progress is not None and progress.feed("\n".join(text for text in chunk if text)):
+                if remaining:
+                    PDF_EARLY_STOPS_TOTAL.inc("signal")
+                break
+    finally:
+        # Ranges not yet started never run; running ones finish and are dropped
+        for future in futures:
+            future.cancel()
+    return texts, len(texts)
@@ -0,0 +1,204 @@
+"""Per-candidate evaluation history in compact columns, with vectorized aggregates.
+
+Every evaluated answer becomes one fixed-size row: a 64-bit hash of the
+candidate ID, the time, relevance and confidence in tenths, one bit per
+STAR component found and one bit per missing-point code. The columns are
+NumPy arrays, so a candidate's summary or trend is a few passes over
+contiguous memory rather than a walk over per-evaluation dicts.
+
+With EVALUATION_HISTORY_PATH set, rows are appended to a file of records
+that every worker writes to and reads new rows back from before answering.
+"""
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from scoring import MISSING_POINT_CODES, STAR_KEYWORDS, AnswerFeatures, missing_point_codes, relevance_score
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Append-only record file shared by all workers; unset keeps history in memory
+EVALUATION_HISTORY_PATH = os.environ.get("EVALUATION_HISTORY_PATH") or None
+
+ROW = np.dtype([
+    ("candidate", "<u8"),
+    ("time", "<u4"),
+    ("relevance", "u1"),   # tenths, 0-100
+    ("confidence", "<u2"),  # tenths, 0-1000
+    ("star", "u1"),        # bit i set: STAR_COMPONENTS[i] present
+    ("missing", "u1"),     # bit i set: MISSING_POINT_CODES[i] suggested
+])
+
+STAR_COMPONENTS = tuple(STAR_KEYWORDS)
+# Indexed by a star bitmask: three or more components is what the scorer calls STAR structure
+STRUCTURED = np.array([bin(mask).count("1") >= 3 for mask in range(1 << len(STAR_COMPONENTS))])
+
+BUCKET_SECONDS = {"day": 86400, "week": 7 * 86400}
+# Day 0 (1970-01-01) was a Thursday; shifting by 3 days starts weeks on Monday
+BUCKET_OFFSET_SECONDS = {"day": 0, "week": 3 * 86400}
+
+
+def candidate_key(candidate_id: str) -> int:
+    """Stable 64-bit key for a candidate ID, the same in every worker."""
+    return int.from_bytes(hashlib.blake2b(candidate_id.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def encode_evaluation(features: AnswerFeatures, result: Dict[str, Any]) -> Tuple[int, int, int, int]:
+    """Return the (relevance, confidence, star, missing) columns of one scored answer."""
+    star = sum(1 << i for i, component in enumerate(STAR_COMPONENTS) if features.star_hits.get(component))
+    codes = missing_point_codes(features, relevance_score(features), result["structure_star"])
+    missing = sum(1 << MISSING_POINT_CODES.index(code) for code in codes)
+    return round(result["relevance"] * 10), round(result["confidence"] * 10), star, missing
+
+
+def _percentiles(values: np.ndarray, upper: int, points: Sequence[int]) -> List[float]:
+    """Nearest-rank percentiles of small non-negative integers via a histogram, without sorting."""
+    cumulative = np.cumsum(np.bincount(values, minlength=upper + 1))
+    ranks = np.ceil(np.asarray(points) / 100 * len(values)).clip(min=1)
+    return np.searchsorted(cumulative, ranks).tolist()
+
+
+def _bit_rates(masks: np.ndarray, names: Sequence[str]) -> Dict[str, float]:
+    """Fraction of rows with each bit set, from one bincount over the masks."""
+    counts = np.bincount(masks, minlength=1 << len(names))
+    bits = (np.arange(len(counts))[:, None] >> np.arange(len(names))) & 1
+    return dict(zip(names, (counts @ bits / len(masks)).tolist()))
+
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+class EvaluationHistory:
+    """Columns of evaluation rows, grown by doubling; optionally backed by a record file."""
+
+    def __init__(self, path: Optional[str] = EVALUATION_HISTORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._size = 0
+        self._columns: Dict[str, np.ndarray] = {name: np.zeros(1024, dtype=ROW[name]) for name in ROW.names}
+        # Relevance histogram of every row, kept up to date so ranks need no full pass
+        self._relevance_counts = np.zeros(101, dtype=np.int64)
+        # Bytes of the record file already loaded into the columns
+        self._loaded = 0
+        self._file = open(path, "ab", buffering=0) if path else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return self._size
+
+    def record(self, candidate_id: str, evaluations: Sequence[Tuple[AnswerFeatures, Dict[str, Any]]],
+               now: Optional[float] = None) -> None:
+        """Add one row per (features, score_features() result) pair."""
+        rows = np.zeros(len(evaluations), dtype=ROW)
+        rows["candidate"] = candidate_key(candidate_id)
+        rows["time"] = int(time.time() if now is None else now)
+        encoded = [encode_evaluation(features, result) for features, result in evaluations]
+        for name, values in zip(("relevance", "confidence", "star", "missing"), zip(*encoded)):
+            rows[name] = values
+        with self._lock:
+            if self._file is not None:
+                # One unbuffered append per call, so rows from concurrent workers never interleave
+                self._file.write(rows.tobytes())
+            else:
+                self._append(rows)
+
+    def summary(self, candidate_id: str) -> Optional[Dict[str, Any]]:
+        """Score distributions, STAR coverage and common suggestions; None without history."""
+        with self._lock:
+            self._refresh()
+            columns = {name: column[:self._size] for name, column in self._columns.items()}
+            overall = self._relevance_counts.copy()
+        mask = columns["candidate"] == candidate_key(candidate_id)
+        count = int(np.count_nonzero(mask))
+        if not count:
+            return None
+
+        relevance = columns["relevance"][mask]
+        confidence = columns["confidence"][mask]
+        star = columns["star"][mask]
+        components = _bit_rates(star, STAR_COMPONENTS)
+        median = _percentiles(relevance, 100, [50])[0]
+
+        def distribution(values: np.ndarray, upper: int) -> Dict[str, float]:
+            p10, p50, p90 = _percentiles(values, upper, [10, 50, 90])
+            return {"mean": round(float(values.mean()) / 10, 1), "p10": p10 / 10, "p50": p50 / 10, "p90": p90 / 10}
+
+        star_counts = np.bincount(star, minlength=len(STRUCTURED))
+        return {
+            "evaluations": count,
+            "relevance": distribution(relevance, 100),
+            "confidence": distribution(confidence, 1000),
+            "star_rate": round(float(star_counts[STRUCTURED].sum()) / count, 3),
+            "star_components": {name: round(rate, 3) for name, rate in components.items()},
+            "weakest_star_component": min(STAR_COMPONENTS, key=components.__getitem__),
+            "missing_points": {
+                code: round(rate, 3) for code, rate in _bit_rates(columns["missing"][mask], MISSING_POINT_CODES).items()
+            },
+            # Share of all recorded answers, every candidate's, scoring at or below this median
+            "relevance_percentile_rank": round(100 * float(overall[:median + 1].sum()) / int(overall.sum()), 1),
+        }
+
+    def trend(self, candidate_id: str, bucket: str = "day") -> List[Dict[str, Any]]:
+        """Per-period averages of a candidate's answers, oldest period first."""
+        width, offset = BUCKET_SECONDS[bucket], BUCKET_OFFSET_SECONDS[bucket]
+        with self._lock:
+            self._refresh()
+            columns = {name: column[:self._size] for name, column in self._columns.items()}
+        mask = columns["candidate"] == candidate_key(candidate_id)
+        periods = (columns["time"][mask].astype(np.int64) + offset) // width
+        if not len(periods):
+            return []
+
+        starts, index = np.unique(periods, return_inverse=True)
+        counts = np.bincount(index)
+        relevance = np.bincount(index, weights=columns["relevance"][mask]) / counts / 10
+        confidence = np.bincount(index, weights=columns["confidence"][mask]) / counts / 10
+        star_rate = np.bincount(index, weights=STRUCTURED[columns["star"][mask]]) / counts
+        return [
+            {
+                "start": time.strftime("%Y-%m-%d", time.gmtime(int(start) * width - offset)),
+                "evaluations": int(count),
+                "average_relevance": round(float(rel), 1),
+                "average_confidence": round(float(conf), 1),
+                "star_rate": round(float(rate), 3),
+            }
+            for start, count, rel, conf, rate in zip(starts, counts, relevance, confidence, star_rate)
+        ]
+
+    def _append(self, rows: np.ndarray) -> None:
+        needed = self._size + len(rows)
+        capacity = len(self._columns["candidate"])
+        if needed > capacity:
+            while capacity < needed:
+                capacity *= 2
+            for name, column in self._columns.items():
+                grown = np.zeros(capacity, dtype=column.dtype)
+                grown[:self._size] = column[:self._size]
+                self._columns[name] = grown
+        for name in ROW.names:
+            self._columns[name][self._size:needed] = rows[name]
+        self._relevance_counts += np.bincount(rows["relevance"], minlength=101)
+        self._size = needed
+
+    def _refresh(self) -> None:
+        """Load whole rows appended to the record file since the last call."""
+        if self.path is None:
+            return
+        count = (os.path.getsize(self.path) - self._loaded) // ROW.itemsize
+        if count <= 0:
+            return
+        rows = np.fromfile(self.path, dtype=ROW, count=count, offset=self._loaded)
+        self._append(rows)
+        self._loaded += count * ROW.itemsize
+
+
+evaluation_history = EvaluationHistory()
@@ -0,0 +1,280 @@
+"""Background resume analysis jobs, fetched by polling or Server-Sent Events."""
+import asyncio
+import contextvars
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from extraction import PDF_WORKERS
+from metrics import JOB_QUEUE_DEPTH, JOBS_TOTAL
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Jobs analyzed at once; like bulk uploads, enough to keep every pool worker busy
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", str(max(2, 2 * PDF_WORKERS))))
+# Jobs accepted but not yet started; each holds its upload in memory
+JOB_QUEUE_SIZE = int(os.environ.get("JOB_QUEUE_SIZE", "64"))
+# How long a finished job's result can still be fetched
+JOB_RESULT_TTL_SECONDS = float(os.environ.get("JOB_RESULT_TTL_SECONDS", "600"))
+# Path of a SQLite file where every worker records job status; unset keeps jobs per process
+JOB_DB = os.environ.get("JOB_DB") or None
+# Comment lines sent on idle event streams so proxies keep them open
+JOB_EVENTS_KEEPALIVE_SECONDS = 15.0
+# How often an event stream re-reads a job another worker is running
+JOB_EVENTS_POLL_SECONDS = 0.25
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class JobFailed(Exception):
+    """Raised by a job handler to fail the job with a client-facing ``detail``."""
+
+    def __init__(self, detail: str):
+        super().__init__(detail)
+        self.detail = detail
+
+
+class QueueFull(Exception):
+    """The job queue is at JOB_QUEUE_SIZE."""
+
+
+# ============================================================================
+# JOBS
+# ============================================================================
+
+class Job:
+    """One queued analysis. Waiters are woken on every status change."""
+
+    def __init__(self, job_id: str, args: Tuple):
+        self.id = job_id
+        self.status = QUEUED
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.args: Optional[Tuple] = args
+        self.changed = asyncio.Event()
+        # Loaded from the job store: run by another worker, so changes are polled for
+        self.remote = False
+
+    @classmethod
+    def from_snapshot(cls, data: Dict[str, Any]) -> "Job":
+        job = cls(data["job_id"], ())
+        job.status, job.result, job.error = data["status"], data.get("result"), data.get("error")
+        job.args = None
+        job.remote = True
+        return job
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def snapshot(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"job_id": self.id, "status": self.status}
+        if self.result is not None:
+            data["result"] = self.result
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+    def _set(self, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        self.status, self.result, self.error = status, result, error
+        # Wake everyone waiting on this change and start a fresh event for the next one
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+
+class SQLiteJobStore:
+    """Job snapshots in a SQLite file in WAL mode, so any worker can answer for any job."""
+
+    # Expired rows are swept once every this many writes.
+    _SWEEP_INTERVAL = 200
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL)")
+
+    def save(self, snapshot: Dict[str, Any], expires: float) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO jobs (id, data, expires) VALUES (?, ?, ?)",
+                (snapshot["job_id"], json.dumps(snapshot), expires)
+            )
+            self._writes += 1
+            if self._writes % self._SWEEP_INTERVAL == 0:
+                self._db.execute("DELETE FROM jobs WHERE expires <= ?", (time.time(),))
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data FROM jobs WHERE id = ? AND expires > ?", (job_id, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+def create_job_store() -> Optional[SQLiteJobStore]:
+    """The shared store selected by JOB_DB, or None to keep jobs in this process."""
+    return SQLiteJobStore(JOB_DB) if JOB_DB else None
+
+
+class JobQueue:
+    """A bounded queue of jobs run by a fixed set of worker tasks.
+
+    Jobs run in the process that accepted the upload. With a ``store``
+    every status change is also written there, so a client polling any
+    worker sees the job. Jobs are dropped ``ttl`` seconds after their last
+    change.
+    """
+
+    def __init__(self, handler: Callable[..., Awaitable[Dict[str, Any]]], workers: int = JOB_WORKERS,
+                 queue_size: int = JOB_QUEUE_SIZE, ttl: float = JOB_RESULT_TTL_SECONDS,
+                 store: Optional[SQLiteJobStore] = None):
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.ttl = ttl
+        self.store = store
+        self.jobs: Dict[str, Job] = {}
+        # Jobs finish in time order, so expiry is a FIFO of (expires, job_id)
+        self._expiry: Deque[Tuple[float, str]] = deque()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self) -> None:
+        """Start the workers on the running event loop (no-op if already running there).
+
+        The app starts them from its lifespan. The worker tasks get an empty
+        context either way, so per-request context (such as Server-Timing
+        stages) of whoever started them never leaks into the jobs.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [contextvars.Context().run(loop.create_task, self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        # Jobs still queued will never run here; fail them so pollers stop waiting
+        while self._queue is not None and not self._queue.empty():
+            job = self._queue.get_nowait()
+            job._set(FAILED, error="Server shutting down")
+            job.args = None
+            await self._save(job)
+        self._tasks = []
+        self._queue = None
+        self._loop = None
+
+    async def submit(self, *args) -> Job:
+        """Queue ``handler(*args)`` and return its job, or raise QueueFull."""
+        self.start()
+        self._sweep()
+        job = Job(secrets.token_urlsafe(16), args)
+        if self._queue.full():
+            JOBS_TOTAL.inc("rejected")
+            raise QueueFull()
+        self.jobs[job.id] = job
+        # Recorded before it can start, so other workers know the job as soon as its ID is returned
+        await self._save(job)
+        self._queue.put_nowait(job)
+        JOB_QUEUE_DEPTH.set(value=self._queue.qsize())
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """A job of this worker, or one another worker recorded in the store."""
+        self._sweep()
+        job = self.jobs.get(job_id)
+        if job is None and self.store is not None:
+            data = await asyncio.to_thread(self.store.load, job_id)
+            if data is not None:
+                job = Job.from_snapshot(data)
+        return job
+
+    async def events(self, job: Job, keepalive: float = JOB_EVENTS_KEEPALIVE_SECONDS) -> AsyncIterator[str]:
+        """Server-Sent Events: the job's snapshot now and after each change, until it finishes."""
+        while True:
+            # Take the event before reading the status so no change is missed
+            changed = job.changed
+            yield f"event: {job.status}\ndata: {json.dumps(job.snapshot(), separators=(',', ':'))}\n\n"
+            if job.finished:
+                return
+            if job.remote:
+                while True:
+                    fresh = await self._poll_change(job, keepalive)
+                    if fresh is None:
+                        return
+                    if fresh is not job:
+                        job = fresh
+                        break
+                    yield ": keep-alive\n\n"
+                continue
+            while not changed.is_set():
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+
+    async def _poll_change(self, job: Job, keepalive: float) -> Optional[Job]:
+        """Re-read a remote job until its status changes; ``job`` itself after ``keepalive``, None once expired."""
+        deadline = time.monotonic() + keepalive
+        while time.monotonic() < deadline:
+            await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+            data = await asyncio.to_thread(self.store.load, job.id)
+            if data is None:
+                return None
+            if data["status"] != job.status:
+                return Job.from_snapshot(data)
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        self._sweep()
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for job in self.jobs.values():
+            counts[job.status] += 1
+        return counts
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            JOB_QUEUE_DEPTH.set(value=self._queue.qsize())
+            job._set(RUNNING)
+            try:
+                await self._save(job)
+                job._set(DONE, result=await self.handler(*job.args))
+            except JobFailed as e:
+                job._set(FAILED, error=e.detail)
+            except asyncio.CancelledError:
+                job._set(FAILED, error="Server shutting down")
+                raise
+            except Exception as e:
+                job._set(FAILED, error=f"Error processing file: {str(e)}")
+            finally:
+                # The upload bytes are no longer needed once the job has run
+                job.args = None
+                JOBS_TOTAL.inc(job.status)
+                self._expiry.append((time.time() + self.ttl, job.id))
+                await self._save(job)
+
+    async def _save(self, job: Job) -> None:
+        if self.store is not None:
+            await asyncio.to_thread(self.store.save, job.snapshot(), time.time() + self.ttl)
+
+    def _sweep(self) -> None:
+        now = time.time()
+        while self._expiry and self._expiry[0][0] <= now:
+            self.jobs.pop(self._expiry.popleft()[1], None)
@@ -1,19 +1,90 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, UploadFile, File, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional
-import pdfplumber
-import io
-import re
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, ConfigDict, ValidationError
+from typing import Dict, List, Optional
+import asyncio
+import os
+
+from admission import ADMISSION_RETRY_AFTER_SECONDS, AdmissionMiddleware, default_budgets
+from analysis import ANALYZER_VERSION, AnalysisProgress, analyze_text
+from cache import analysis_cache, config_namespace, content_key, normalize_text
+from extraction import (
+    PDF_WARMUP,
+    PDF_WORKERS,
+    PDFExtractionError,
+    PDFExtractionTimeout,
+    extract_pdf_text_async,
+    extraction_config,
+    shutdown_executor,
+    warm_up_executor,
+)
+from history import evaluation_history
+from jobs import JobFailed, JobQueue, QueueFull, create_job_store
+from metrics import UPLOAD_STAGE_SECONDS, MetricsMiddleware, registry as metrics_registry
+from profiling import ServerTimingMiddleware, stage
+from questions import question_key, render_questions, select_questions
+from scoring import LiveAnswer, extract_features, extract_features_batch, prepare_skills, score_features
+from serialization import FAST_JSON, JSONBytesResponse, batch_evaluation_json, evaluation_json
+from sessions import new_session_id, session_store
+from uploads import (
+    MAX_BULK_UPLOAD_BYTES,
+    UploadLimitMiddleware,
+    UploadLoader,
+    iter_upload_sources,
+    read_upload,
+)
+
+
+# Files of one bulk upload processed at once; enough to keep every pool worker busy
+BULK_CONCURRENCY = max(2, 2 * PDF_WORKERS)
+
+QUESTIONS_CACHE_MAX_AGE = int(os.environ.get("QUESTIONS_CACHE_MAX_AGE", "3600"))
+
+# Live scoring pushes at most one update per window, covering every edit in it
+LIVE_SCORE_DEBOUNCE_SECONDS = float(os.environ.get("LIVE_SCORE_DEBOUNCE_SECONDS", "0.15"))
+LIVE_ANSWER_MAX_CHARS = int(os.environ.get("LIVE_ANSWER_MAX_CHARS", "20000"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # pdfplumber is only imported inside pool workers; warming them in the
+    # background keeps it off the startup path without a cold first upload.
+    warmup = asyncio.create_task(warm_up_executor()) if PDF_WARMUP else None
+    upload_jobs.start()
+    yield
+    if warmup is not None:
+        warmup.cancel()
+    await upload_jobs.stop()
+    shutdown_executor()
 
 
 app = FastAPI(
     title="InterviewCoachAI - FastAPI AI microservice",
     description="AI-powered interview coaching platform backend",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
+)
+
+# Bound upload bodies before the multipart parser buffers them
+app.add_middleware(UploadLimitMiddleware, paths=["/upload-resume"])
+app.add_middleware(UploadLimitMiddleware, paths=["/upload-resumes"], max_body=MAX_BULK_UPLOAD_BYTES)
+
+# Separate concurrency budgets so bursts of uploads cannot starve scoring;
+# health and metrics stay outside every budget
+admission_budgets = default_budgets()
+app.add_middleware(
+    AdmissionMiddleware,
+    budgets=admission_budgets,
+    routes={
+        "upload": ["/upload-resume", "/upload-resumes"],
+        "scoring": ["/analyze-resume", "/generate-questions", "/evaluate-answer", "/evaluate-answers", "/sessions", "/candidates"],
+    },
 )
 
-# Add CORS middleware
+# Outside admission and the upload limits, so preflights never take a slot and
+# 503/413 rejections still carry Access-Control-Allow-Origin for the browser
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -35,8 +106,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Readable by the frontend: when to retry a 503, and where an async job lives
+    expose_headers=["Retry-After", "Location"],
 )
 
+# Outside admission so time spent queued is reported and 503s get the header too
+app.add_middleware(ServerTimingMiddleware)
+
+# Outermost, so rejected uploads and errors are counted too
+app.add_middleware(MetricsMiddleware)
+
 # ============================================================================
 # REQUEST SCHEMAS
 # ============================================================================
@@ -67,10 +146,45 @@ class ResumeAnalysisResponse(BaseModel):
     )
 
 
+class BulkResumeResult(BaseModel):
+    filename: Optional[str] = Field(None, description="Uploaded file or zip member name")
+    skills: Optional[List[str]] = Field(None, description="Extracted technical skills")
+    experience_level: Optional[str] = Field(None, description="Inferred experience level")
+    error: Optional[str] = Field(None, description="Why this file could not be analyzed")
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "filename": "jane_doe.pdf",
+                "skills": ["python", "sql", "docker"],
+                "experience_level": "senior"
+            }
+        }
+    )
+
+
+class JobResponse(BaseModel):
+    job_id: str = Field(..., description="ID to poll at /jobs/{job_id}")
+    status: str = Field(..., description="queued, running, done or failed")
+    result: Optional[ResumeAnalysisResponse] = Field(None, description="Analysis, once the job is done")
+    error: Optional[str] = Field(None, description="Why the job failed")
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "job_id": "Zk3q9w1kT0u8b2XyVQ4r5A",
+                "status": "done",
+                "result": {"skills": ["python", "sql", "docker"], "experience_level": "senior"}
+            }
+        }
+    )
+
+
 class QuestionGenerationRequest(BaseModel):
     skills: List[str] = Field(default_factory=list, description="Skills from resume")
     experience_level: str = Field(..., description="Experience level")
     role: str = Field(..., description="Target job role")
+    seed: Optional[int] = Field(None, description="Optional seed for a different but reproducible question mix")
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -117,6 +231,7 @@ class AnswerEvaluationRequest(BaseModel):
     answer: str = Field(..., min_length=1, description="Candidate's answer")
     resume_skills: List[str] = Field(default_factory=list, description="Skills from resume")
     role: Optional[str] = Field(None, description="Target role for context")
+    candidate_id: Optional[str] = Field(None, max_length=128, description="Adds the evaluation to this candidate's history")
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -150,153 +265,312 @@ class AnswerEvaluationResponse(BaseModel):
     )
 
 
+class AnswerItem(BaseModel):
+    question: str = Field(..., min_length=1, description="Interview question")
+    answer: str = Field(..., min_length=1, description="Candidate's answer")
+
+
+class BatchEvaluationRequest(BaseModel):
+    answers: List[AnswerItem] = Field(..., min_length=1, max_length=50, description="Question/answer pairs to evaluate")
+    resume_skills: List[str] = Field(default_factory=list, description="Skills from resume, shared by all answers")
+    role: Optional[str] = Field(None, description="Target role for context")
+    candidate_id: Optional[str] = Field(None, max_length=128, description="Adds the evaluations to this candidate's history")
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "answers": [
+                    {"question": "Describe a time you optimized performance.", "answer": "I optimized a Python backend..."},
+                    {"question": "How do you handle technical debt?", "answer": "Our team tracks debt in the backlog..."}
+                ],
+                "resume_skills": ["python", "sql"],
+                "role": "software engineer"
+            }
+        }
+    )
+
+
+class BatchEvaluationResponse(BaseModel):
+    results: List[AnswerEvaluationResponse] = Field(default_factory=list, description="Per-answer evaluations, in request order")
+    average_relevance: float = Field(..., ge=0, le=10, description="Mean relevance across answers")
+    average_confidence: float = Field(..., ge=0, le=100, description="Mean confidence across answers")
+    star_count: int = Field(..., ge=0, description="Answers with STAR structure detected")
+
+
+class SessionCreateRequest(BaseModel):
+    skills: List[str] = Field(default_factory=list, description="Skills from resume analysis")
+    experience_level: str = Field(..., description="Experience level from resume analysis")
+    role: str = Field(..., description="Target job role")
+    seed: Optional[int] = Field(None, description="Optional seed for a different but reproducible question mix")
+    candidate_id: Optional[str] = Field(None, max_length=128, description="Adds the session's evaluations to this candidate's history")
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "skills": ["python", "sql", "docker"],
+                "experience_level": "senior",
+                "role": "software engineer"
+            }
+        }
+    )
+
+
+class SessionAnswerRequest(BaseModel):
+    question_id: int = Field(..., description="ID of the session question being answered")
+    answer: str = Field(..., min_length=1, description="Candidate's answer")
+
+
+class SessionEvaluation(BaseModel):
+    question_id: int = Field(..., description="Question ID")
+    evaluation: AnswerEvaluationResponse
+
+
+class SessionResponse(BaseModel):
+    session_id: str = Field(..., description="Opaque session ID for follow-up calls")
+    role: str = Field(..., description="Target job role")
+    experience_level: str = Field(..., description="Experience level")
+    questions: List[InterviewQuestion] = Field(default_factory=list, description="Questions for this interview")
+    evaluations: List[SessionEvaluation] = Field(default_factory=list, description="Evaluations of submitted answers")
+
+
+class ScoreDistribution(BaseModel):
+    mean: float = Field(..., description="Average score")
+    p10: float = Field(..., description="10th percentile")
+    p50: float = Field(..., description="Median")
+    p90: float = Field(..., description="90th percentile")
+
+
+class HistorySummaryResponse(BaseModel):
+    candidate_id: str = Field(..., description="Candidate the history belongs to")
+    evaluations: int = Field(..., description="Answers recorded")
+    relevance: ScoreDistribution = Field(..., description="Relevance scores (0-10)")
+    confidence: ScoreDistribution = Field(..., description="Confidence scores (0-100)")
+    star_rate: float = Field(..., description="Share of answers with STAR structure")
+    star_components: Dict[str, float] = Field(..., description="Share of answers containing each STAR component")
+    weakest_star_component: str = Field(..., description="STAR component found least often")
+    missing_points: Dict[str, float] = Field(..., description="Share of answers given each suggestion (star, relevance, detail, metrics)")
+    relevance_percentile_rank: float = Field(..., description="Percent of all recorded answers scoring at or below this candidate's median relevance")
+
+
+class TrendPoint(BaseModel):
+    start: str = Field(..., description="First day of the period (UTC, YYYY-MM-DD)")
+    evaluations: int = Field(..., description="Answers recorded in the period")
+    average_relevance: float = Field(..., description="Mean relevance in the period")
+    average_confidence: float = Field(..., description="Mean confidence in the period")
+    star_rate: float = Field(..., description="Share of the period's answers with STAR structure")
+
+
+class HistoryTrendResponse(BaseModel):
+    candidate_id: str = Field(..., description="Candidate the history belongs to")
+    bucket: str = Field(..., description="Period length: day or week")
+    points: List[TrendPoint] = Field(default_factory=list, description="One entry per period with answers, oldest first")
+
+
+class LiveAnswerStart(BaseModel):
+    question: str = Field("", description="Interview question being answered")
+    resume_skills: List[str] = Field(default_factory=list, description="Skills from resume")
+
+
+class LiveAnswerEdit(BaseModel):
+    position: Optional[int] = Field(None, ge=0, description="Where the edit starts; omitted to append")
+    delete: int = Field(0, ge=0, description="Characters removed at position")
+    insert: str = Field("", description="Text inserted at position")
+    text: Optional[str] = Field(None, description="Replaces the whole answer instead of editing it")
+
+
 # ============================================================================
 # ENDPOINTS
 # ============================================================================
 
-@app.post("/upload-resume", response_model=ResumeAnalysisResponse)
-async def upload_resume(file: UploadFile = File(...)) -> ResumeAnalysisResponse:
-    """Upload a PDF or text file and extract resume text, then analyze it."""
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="No file provided")
+async def analyze_upload_content(content: bytes, kind: str) -> ResumeAnalysisResponse:
+    """Extract and analyze an already-read upload, raising HTTPException on bad files."""
+    # Repeat uploads of the same file skip extraction entirely
+    upload_key = content_key(config_namespace("upload", ANALYZER_VERSION, extraction_config()), content)
+    cached = await analysis_cache.aget(upload_key)
+    if cached is not None:
+        return ResumeAnalysisResponse(**cached)
     
     try:
-        content = await file.read()
-        text = ""
-        
-        # Handle PDF files
-        if file.filename.lower().endswith(".pdf"):
-            with pdfplumber.open(io.BytesIO(content)) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
+        # Handle PDF files (parsed in the extraction process pool)
+        if kind == "pdf":
+            with stage("pdf_parse", UPLOAD_STAGE_SECONDS):
+                text = await extract_pdf_text_async(content, AnalysisProgress())
         # Handle text files
-        elif file.filename.lower().endswith((".txt", ".text")):
-            text = content.decode("utf-8")
         else:
-            raise HTTPException(status_code=400, detail="Only PDF and TXT files are supported")
-        
-        if not text or len(text.strip()) == 0:
-            raise HTTPException(status_code=400, detail="Could not extract text from file")
-        
-        # Analyze the extracted text
-        req = ResumeAnalysisRequest(text=text)
-        return await analyze_resume(req)
-    
-    except pdfplumber.exceptions.PDFException:
+            text = content.decode("utf-8")
+    except PDFExtractionError:
         raise HTTPException(status_code=400, detail="Invalid or corrupted PDF file")
+    except PDFExtractionTimeout:
+        raise HTTPException(status_code=422, detail="PDF took too long to process")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Text files must be UTF-8 encoded")
+    
+    if not text or len(text.strip()) == 0:
+        raise HTTPException(status_code=400, detail="Could not extract text from file")
+    
+    # Analyze the extracted text
+    req = ResumeAnalysisRequest(text=text)
+    with stage("analyze", UPLOAD_STAGE_SECONDS):
+        result = await analyze_resume(req)
+    await analysis_cache.aset(upload_key, result.model_dump())
+    return result
+
+
+async def _run_upload_job(content: bytes, kind: str) -> dict:
+    try:
+        result = await analyze_upload_content(content, kind)
+    except HTTPException as e:
+        raise JobFailed(str(e.detail))
+    return result.model_dump()
+
+
+upload_jobs = JobQueue(_run_upload_job, store=create_job_store())
+
+
+@app.post(
+    "/upload-resume",
+    response_model=ResumeAnalysisResponse,
+    responses={202: {"model": JobResponse, "description": "Job accepted (mode=async)"}},
+)
+async def upload_resume(
+    file: UploadFile = File(...),
+    mode: str = Query("sync", pattern="^(sync|async)$", description="async returns a job ID instead of waiting"),
+) -> ResumeAnalysisResponse:
+    """Upload a PDF or text file and extract resume text, then analyze it.
+
+    With ``mode=async`` the file is queued and a job is returned at once;
+    fetch the result from /jobs/{job_id} or stream it from /jobs/{job_id}/events.
+    """
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="No file provided")
+    
+    try:
+        # Stream the upload in chunks; the type is sniffed from its first bytes
+        with stage("read", UPLOAD_STAGE_SECONDS):
+            content, kind = await read_upload(file)
+        if mode == "async":
+            try:
+                job = await upload_jobs.submit(content, kind)
+            except QueueFull:
+                raise HTTPException(status_code=503, detail="Job queue is full, retry shortly",
+                                    headers={"Retry-After": str(ADMISSION_RETRY_AFTER_SECONDS)})
+            return JSONResponse(status_code=202, content=job.snapshot(), headers={"Location": f"/jobs/{job.id}"})
+        return await analyze_upload_content(content, kind)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
 
+async def _bulk_result_line(filename: str, load: UploadLoader) -> str:
+    try:
+        content, kind = await load()
+        result = await analyze_upload_content(content, kind)
+        line = BulkResumeResult(filename=filename, **result.model_dump())
+    except HTTPException as e:
+        line = BulkResumeResult(filename=filename, error=str(e.detail))
+    except Exception as e:
+        line = BulkResumeResult(filename=filename, error=f"Error processing file: {str(e)}")
+    return line.model_dump_json(exclude_none=True) + "\n"
+
+
+@app.post("/upload-resumes")
+async def upload_resumes(files: List[UploadFile] = File(...)) -> StreamingResponse:
+    """Analyze many PDF/TXT resumes (or zip archives of them), streaming NDJSON.
+
+    Each line is a BulkResumeResult, written as soon as that file finishes, so
+    lines arrive in completion order rather than upload order.
+    """
+    async def stream():
+        pending = set()
+        try:
+            try:
+                async for filename, load in iter_upload_sources(files):
+                    if len(pending) >= BULK_CONCURRENCY:
+                        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            yield task.result()
+                    pending.add(asyncio.create_task(_bulk_result_line(filename, load)))
+            except HTTPException as e:
+                yield BulkResumeResult(error=str(e.detail)).model_dump_json(exclude_none=True) + "\n"
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            # The client went away mid-stream: nobody will read the remaining lines
+            for task in pending:
+                task.cancel()
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+async def _get_job(job_id: str):
+    job = await upload_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str) -> JobResponse:
+    """Current status of an async upload, with its analysis once done."""
+    return JobResponse(**(await _get_job(job_id)).snapshot())
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str) -> StreamingResponse:
+    """Server-Sent Events for an async upload: one event per status change, ending when it finishes."""
+    job = await _get_job(job_id)
+    return StreamingResponse(
+        upload_jobs.events(job),
+        media_type="text/event-stream",
+        # Reverse proxies must not buffer the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/analyze-resume", response_model=ResumeAnalysisResponse)
 async def analyze_resume(req: ResumeAnalysisRequest) -> ResumeAnalysisResponse:
     if not req.text or len(req.text.strip()) == 0:
         raise HTTPException(status_code=400, detail="Resume text cannot be empty")
     
-    text_lower = req.text.lower()
-    
-    skill_keywords = {
-        "python": ["python", "django", "flask", "fastapi", "pandas", "numpy"],
-        "javascript": ["javascript", "js", "node", "react", "vue", "angular"],
-        "sql": ["sql", "mysql", "postgresql", "sqlite", "oracle"],
-        "docker": ["docker", "kubernetes", "k8s", "container"],
-        "aws": ["aws", "ec2", "s3", "lambda", "cloudformation"],
-        "git": ["git", "github", "gitlab", "bitbucket"],
-        "linux": ["linux", "ubuntu", "centos", "bash", "shell"],
-        "api": ["api", "rest", "graphql", "json", "http"],
-        "testing": ["pytest", "unittest", "jest", "selenium", "cypress"],
-        "ci/cd": ["jenkins", "github actions", "gitlab ci", "travis", "circleci"]
-    }
-    
-    detected_skills = []
-    for skill, keywords in skill_keywords.items():
-        if any(kw in text_lower for kw in keywords):
-            detected_skills.append(skill)
-    
-    experience_score = 0
+    text_key = content_key(config_namespace("text", ANALYZER_VERSION), normalize_text(req.text).encode("utf-8"))
+    cached = await analysis_cache.aget(text_key)
+    if cached is not None:
+        return ResumeAnalysisResponse(**cached)
     
-    senior_keywords = ["senior", "lead", "principal", "architect", "manager", "director"]
-    if any(kw in text_lower for kw in senior_keywords):
-        experience_score += 3
-    
-    years_match = re.search(r'(\d+)\+?\s*years?', text_lower)
-    if years_match:
-        years = int(years_match.group(1))
-        if years >= 7:
-            experience_score += 3
-        elif years >= 4:
-            experience_score += 2
-        elif years >= 2:
-            experience_score += 1
-    
-    advanced_skills = ["architect", "distributed", "microservices", "scalability"]
-    if any(kw in text_lower for kw in advanced_skills):
-        experience_score += 2
-    
-    if experience_score >= 5:
-        level = "senior"
-    elif experience_score >= 3:
-        level = "mid"
-    else:
-        level = "junior"
-    
-    return ResumeAnalysisResponse(skills=detected_skills, experience_level=level)
+    detected_skills, level = analyze_text(req.text)
+    result = ResumeAnalysisResponse(skills=detected_skills, experience_level=level)
+    await analysis_cache.aset(text_key, result.model_dump())
+    return result
+
+
+def _questions_response(request: Request, skills: List[str], experience_level: str, role: str, seed: Optional[int]) -> Response:
+    """Serve memoized questions with ETag/Cache-Control, answering 304 on a match."""
+    body, etag = render_questions(*question_key(skills, experience_level, role, seed))
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={QUESTIONS_CACHE_MAX_AGE}"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @app.post("/generate-questions", response_model=QuestionGenerationResponse)
-async def generate_questions(req: QuestionGenerationRequest) -> QuestionGenerationResponse:
-    questions_pool = []
-    
-    behavioral = [
-        "Tell me about a time you solved a difficult problem.",
-        "Describe a situation where you had to learn something new quickly.",
-        "Tell me about a time you received critical feedback and how you handled it.",
-        "Describe a project where you had to work with a difficult team member.",
-        "Tell me about a time you had to make a tough decision under pressure."
-    ]
-    questions_pool.extend(behavioral)
-    
-    skill_questions = {
-        "python": ["How do you handle memory management in Python?", "Explain Python's GIL and when it matters.", "How do you optimize Python code performance?"],
-        "javascript": ["Explain event loop and asynchronous programming in JavaScript.", "How do you handle state management in a React application?", "Describe closures and their practical uses."],
-        "sql": ["How do you optimize slow database queries?", "Explain database normalization and when to denormalize.", "How do you handle database migrations in production?"],
-        "docker": ["How do you secure Docker containers in production?", "Explain Docker networking and container communication.", "How do you optimize Docker image size?"],
-        "aws": ["How do you design for high availability on AWS?", "Explain AWS security best practices.", "How do you optimize AWS costs?"],
-        "api": ["How do you design RESTful APIs?", "Explain API versioning strategies.", "How do you handle API rate limiting?"],
-        "testing": ["How do you approach testing in your development process?", "Explain the difference between unit and integration tests.", "How do you test asynchronous code?"]
-    }
-    
-    for skill in req.skills:
-        if skill in skill_questions:
-            questions_pool.extend(skill_questions[skill][:2])
-    
-    if req.experience_level == "junior":
-        questions_pool.extend(["What is your favorite programming language and why?", "How do you stay updated with technology trends?", "Describe your debugging process."])
-    elif req.experience_level == "mid":
-        questions_pool.extend(["How do you approach code reviews?", "Describe your experience with agile development.", "How do you handle technical debt?"])
-    elif req.experience_level == "senior":
-        questions_pool.extend(["How do you mentor junior developers?", "Describe your experience leading technical projects.", "How do you make architectural decisions?"])
-    
-    role_questions = {
-        "software engineer": ["How do you ensure code quality?", "Describe your experience with version control.", "How do you handle production incidents?"],
-        "data scientist": ["How do you approach feature engineering?", "Explain model validation techniques.", "How do you communicate technical findings to non-technical stakeholders?"],
-        "devops engineer": ["How do you implement CI/CD pipelines?", "Describe your experience with infrastructure as code.", "How do you monitor system performance?"],
-        "frontend developer": ["How do you optimize web application performance?", "Describe your experience with responsive design.", "How do you handle browser compatibility?"],
-        "backend developer": ["How do you design scalable systems?", "Describe your experience with databases.", "How do you handle concurrent requests?"]
-    }
-    
-    role_lower = req.role.lower() if req.role else ""
-    for role, q_list in role_questions.items():
-        if role in role_lower:
-            questions_pool.extend(q_list[:2])
-    
-    questions_pool = list(set(questions_pool))
-    selected = questions_pool[:5]
-    questions = [InterviewQuestion(id=i+1, question=q) for i, q in enumerate(selected)]
-    
-    return QuestionGenerationResponse(questions=questions)
+async def generate_questions(req: QuestionGenerationRequest, request: Request) -> Response:
+    return _questions_response(request, req.skills, req.experience_level, req.role, req.seed)
+
+
+@app.get("/generate-questions", response_model=QuestionGenerationResponse)
+async def generate_questions_get(
+    request: Request,
+    experience_level: str,
+    role: str,
+    skills: List[str] = Query(default_factory=list),
+    seed: Optional[int] = None
+) -> Response:
+    """Cacheable variant of POST /generate-questions for browsers and CDNs."""
+    return _questions_response(request, skills, experience_level, role, seed)
 
 
 @app.post("/evaluate-answer", response_model=AnswerEvaluationResponse)
@@ -304,83 +578,260 @@ def evaluate_answer(req: AnswerEvaluationRequest) -> AnswerEvaluationResponse:
     if not req.answer or len(req.answer.strip()) == 0:
         raise HTTPException(status_code=400, detail="Answer cannot be empty")
     
-    answer_lower = req.answer.lower()
-    
-    relevance = 2.0
-    for skill in (req.resume_skills or []):
-        if skill.lower() in answer_lower:
-            relevance += 2.0
-    
-    word_count = len(req.answer.split())
-    if word_count > 150:
-        relevance += 3.5
-    elif word_count > 100:
-        relevance += 2.5
-    elif word_count > 60:
-        relevance += 1.5
-    elif word_count < 20:
-        relevance -= 1.0
-    
-    if re.search(r'\d+\%|\d+x|decreased|increased|improved', answer_lower):
-        relevance += 1.5
-    
-    relevance = max(0, min(10.0, relevance))
-    
-    star_keywords = {
-        "situation": ["situation", "context", "background", "team", "company", "project", "faced"],
-        "task": ["task", "challenge", "problem", "goal", "asked", "responsibility", "needed"],
-        "action": ["action", "i did", "i led", "i implemented", "i developed", "i wrote", "i created"],
-        "result": ["result", "outcome", "impact", "improved", "achieved", "metrics", "delivered"]
+    with stage("score"):
+        features = extract_features(req.answer, prepare_skills(req.resume_skills), req.question)
+        result = score_features(features)
+    if req.candidate_id:
+        evaluation_history.record(req.candidate_id, [(features, result)])
+    if FAST_JSON:
+        with stage("serialize"):
+            return JSONBytesResponse(evaluation_json(result))
+    return AnswerEvaluationResponse(**result)
+
+
+@app.post("/evaluate-answers", response_model=BatchEvaluationResponse)
+def evaluate_answers(req: BatchEvaluationRequest) -> BatchEvaluationResponse:
+    """Evaluate every answer of an interview session in one request."""
+    for i, item in enumerate(req.answers):
+        if not item.answer.strip():
+            raise HTTPException(status_code=400, detail=f"Answer {i + 1} cannot be empty")
+    
+    # Shared context is prepared once and every answer is scored in one vectorized pass
+    skills = prepare_skills(req.resume_skills)
+    with stage("score"):
+        features = extract_features_batch([item.answer for item in req.answers], [item.question for item in req.answers], skills)
+        results = [score_features(f) for f in features]
+    if req.candidate_id:
+        evaluation_history.record(req.candidate_id, list(zip(features, results)))
+    
+    count = len(results)
+    summary = {
+        "average_relevance": round(sum(r["relevance"] for r in results) / count, 1),
+        "average_confidence": round(sum(r["confidence"] for r in results) / count, 1),
+        "star_count": sum(1 for r in results if r["structure_star"]),
     }
+    if FAST_JSON:
+        with stage("serialize"):
+            return JSONBytesResponse(batch_evaluation_json(results, summary))
+    return BatchEvaluationResponse(results=[AnswerEvaluationResponse(**r) for r in results], **summary)
+
+
+def _session_response(session: dict) -> SessionResponse:
+    return SessionResponse(
+        session_id=session["id"],
+        role=session["role"],
+        experience_level=session["experience_level"],
+        questions=session["questions"],
+        evaluations=[
+            SessionEvaluation(question_id=int(qid), evaluation=evaluation)
+            for qid, evaluation in session["evaluations"].items()
+        ]
+    )
+
+
+def _get_session(session_id: str) -> dict:
+    session = session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    return session
+
+
+@app.post("/sessions", response_model=SessionResponse, status_code=201)
+def create_session(req: SessionCreateRequest) -> SessionResponse:
+    """Start an interview from a resume analysis; later calls only send the session ID."""
+    selected = select_questions(*question_key(req.skills, req.experience_level, req.role, req.seed))
+    session = {
+        "id": new_session_id(),
+        "role": req.role,
+        "experience_level": req.experience_level,
+        # Stored already prepared so answers are scored without redoing this work
+        "skills": prepare_skills(req.skills),
+        "candidate_id": req.candidate_id,
+        "questions": [{"id": i + 1, "question": q} for i, q in enumerate(selected)],
+        "evaluations": {},
+    }
+    session_store.create(session)
+    return _session_response(session)
+
+
+@app.get("/sessions/{session_id}", response_model=SessionResponse)
+def get_session(session_id: str) -> SessionResponse:
+    return _session_response(_get_session(session_id))
+
+
+@app.get("/sessions/{session_id}/next-question", response_model=InterviewQuestion, responses={204: {"description": "All questions answered"}})
+def next_question(session_id: str):
+    """Return the first unanswered question, or 204 once every question is answered."""
+    session = _get_session(session_id)
+    for question in session["questions"]:
+        if str(question["id"]) not in session["evaluations"]:
+            return InterviewQuestion(**question)
+    return Response(status_code=204)
+
+
+def _session_question(session: dict, question_id: int) -> dict:
+    """The session's question ``question_id``, raising 404 if absent and 409 if already answered."""
+    question = next((q for q in session["questions"] if q["id"] == question_id), None)
+    if question is None:
+        raise HTTPException(status_code=404, detail=f"Question {question_id} is not part of this session")
+    if str(question_id) in session["evaluations"]:
+        raise HTTPException(status_code=409, detail=f"Question {question_id} was already answered")
+    return question
+
+
+@app.post("/sessions/{session_id}/answers", response_model=AnswerEvaluationResponse)
+def submit_session_answer(session_id: str, req: SessionAnswerRequest) -> AnswerEvaluationResponse:
+    if not req.answer.strip():
+        raise HTTPException(status_code=400, detail="Answer cannot be empty")
     
-    detected_components = []
-    for component, keywords in star_keywords.items():
-        if any(kw in answer_lower for kw in keywords):
-            detected_components.append(component)
-    
-    structure_star = len(detected_components) >= 3
-    
-    missing_points = []
-    
-    if not structure_star:
-        missing = []
-        for component, keywords in star_keywords.items():
-            if not any(kw in answer_lower for kw in keywords):
-                missing.append(component.upper())
-        if missing:
-            missing_points.append(f"Add missing STAR components: {', '.join(missing)}")
-    
-    if relevance < 4.0:
-        missing_points.append("Mention more relevant technical skills or specific projects")
-    
-    if word_count < 60:
-        missing_points.append("Provide more detail. Aim for 80+ words to show depth")
-    
-    if not re.search(r'\d+\%|\d+x|decreased|increased|improved', answer_lower):
-        missing_points.append("Quantify impact with metrics (e.g., '40% faster', '2x improvement')")
-    
-    confidence = 45.0
-    confidence += min(30.0, (word_count / 5))
-    if structure_star:
-        confidence += 20.0
-    if any(kw in answer_lower for kw in ["we", "team", "collaborated", "led"]):
-        confidence += 5.0
-    if re.search(r'\d+\%|\d+x', answer_lower):
-        confidence += 5.0
+    session = session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    question = _session_question(session, req.question_id)
     
-    confidence = max(0, min(100.0, confidence))
+    # Scored outside the store's write transaction, so answers to other
+    # sessions (and, with SQLite, other workers) are not serialized behind it
+    with stage("score"):
+        features = extract_features(req.answer, session["skills"], question["question"])
+        evaluation = score_features(features)
     
-    improved = "**Situation:** Start with context: 'At [Company], I was part of a team where...' **Task:** Explain the challenge: 'We faced [specific problem]...' **Action:** Describe what YOU did (use 'I'): 'I led the effort to [action]...' **Result:** End with impact: 'This resulted in [metric], improving [outcome] by X%.' \n\nExample: 'At TechCorp, our API response times were slow. I optimized the database queries, added caching, and implemented connection pooling. This reduced P99 latency by 60% and improved user satisfaction scores by 25%.'"
+    def record(session: dict) -> Optional[str]:
+        # Only the checks and the append run under the lock; questions never change
+        _session_question(session, req.question_id)
+        session["evaluations"][str(req.question_id)] = evaluation
+        return session.get("candidate_id")
     
-    return AnswerEvaluationResponse(
-        relevance=round(relevance, 1),
-        structure_star=structure_star,
-        missing_points=missing_points,
-        improved_answer=improved,
-        confidence=round(confidence, 1)
-    )
+    try:
+        candidate_id = session_store.update(session_id, record)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    if candidate_id:
+        evaluation_history.record(candidate_id, [(features, evaluation)])
+    if FAST_JSON:
+        return JSONBytesResponse(evaluation_json(evaluation))
+    return AnswerEvaluationResponse(**evaluation)
+
+
+@app.get("/candidates/{candidate_id}/history", response_model=HistorySummaryResponse)
+def candidate_history(candidate_id: str) -> HistorySummaryResponse:
+    """Score percentiles, STAR coverage and common suggestions over a candidate's recorded answers."""
+    summary = evaluation_history.summary(candidate_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="No evaluations recorded for this candidate")
+    return HistorySummaryResponse(candidate_id=candidate_id, **summary)
+
+
+@app.get("/candidates/{candidate_id}/history/trend", response_model=HistoryTrendResponse)
+def candidate_history_trend(
+    candidate_id: str,
+    bucket: str = Query("day", pattern="^(day|week)$", description="Period to average over"),
+) -> HistoryTrendResponse:
+    """Average scores per day or week, to show a candidate's progress."""
+    return HistoryTrendResponse(candidate_id=candidate_id, bucket=bucket, points=evaluation_history.trend(candidate_id, bucket))
+
+
+def _live_scores(live: LiveAnswer) -> dict:
+    features = live.features()
+    scores = score_features(features)
+    del scores["improved_answer"]
+    return {
+        "type": "scores",
+        "version": live.version,
+        "word_count": features.word_count,
+        "star_components": features.star_components,
+        **scores,
+    }
+
+
+@app.websocket("/ws/evaluate-answer")
+async def live_evaluate_answer(websocket: WebSocket):
+    """Score an answer live while it is typed.
+
+    The first message is a LiveAnswerStart, every later one a LiveAnswerEdit.
+    Each edit updates the scores in time proportional to its size; they are
+    pushed at most once per LIVE_SCORE_DEBOUNCE_SECONDS with the ``version``
+    (number of edits applied) they reflect. Bad messages get an error
+    message and leave the answer unchanged.
+    """
+    await websocket.accept()
+    send_lock = asyncio.Lock()
+    changed = asyncio.Event()
+
+    async def send(message: dict) -> None:
+        async with send_lock:
+            await websocket.send_json(message)
+
+    async def push_scores(live: LiveAnswer) -> None:
+        while True:
+            await changed.wait()
+            await asyncio.sleep(LIVE_SCORE_DEBOUNCE_SECONDS)
+            changed.clear()
+            await send(_live_scores(live))
+
+    try:
+        try:
+            start = LiveAnswerStart.model_validate_json(await websocket.receive_text())
+        except ValidationError:
+            await websocket.close(code=1003, reason="First message must be {question, resume_skills}")
+            return
+        live = LiveAnswer(prepare_skills(start.resume_skills), start.question)
+        await send(_live_scores(live))
+        pusher = asyncio.create_task(push_scores(live))
+        try:
+            while True:
+                message = await websocket.receive_text()
+                try:
+                    edit = LiveAnswerEdit.model_validate_json(message)
+                    if edit.text is not None:
+                        length = len(edit.text)
+                    else:
+                        length = len(live.text) - edit.delete + len(edit.insert)
+                    if length > LIVE_ANSWER_MAX_CHARS:
+                        raise ValueError(f"Answer is limited to {LIVE_ANSWER_MAX_CHARS} characters")
+                    if edit.text is not None:
+                        live.replace(edit.text)
+                    else:
+                        position = len(live.text) if edit.position is None else edit.position
+                        live.edit(position, edit.delete, edit.insert)
+                except ValidationError as e:
+                    await send({"type": "error", "detail": e.errors()[0]["msg"]})
+                    continue
+                except ValueError as e:
+                    await send({"type": "error", "detail": str(e)})
+                    continue
+                changed.set()
+        finally:
+            pusher.cancel()
+    except WebSocketDisconnect:
+        pass
 
 
 @app.get("/health")
 async def health_check():
-    return {"status": "ok", "service": "InterviewCoachAI FastAPI"}
\ No newline at end of file
+    return {"status": "ok", "service": "InterviewCoachAI FastAPI"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition of request, upload-stage and cache metrics."""
+    stats = analysis_cache.stats()
+    lines = [
+        "# HELP analysis_cache_lookups_total Resume analysis cache lookups by outcome.",
+        "# TYPE analysis_cache_lookups_total counter",
+        f'analysis_cache_lookups_total{{result="hit"}} {stats["hits"]}',
+        f'analysis_cache_lookups_total{{result="disk_hit"}} {stats["disk_hits"]}',
+        f'analysis_cache_lookups_total{{result="miss"}} {stats["misses"]}',
+        "# HELP analysis_cache_entries Entries held in the in-memory analysis cache.",
+        "# TYPE analysis_cache_entries gauge",
+        f'analysis_cache_entries {stats["entries"]}',
+    ]
+    return PlainTextResponse(
+        metrics_registry.render() + "\n".join(lines) + "\n",
+        media_type="text/plain; version=0.0.4"
+    )
+
+
+@app.get("/cache-stats")
+async def cache_stats():
+    """Hit/miss counters and occupancy of the resume analysis cache."""
+    return {"analysis": analysis_cache.stats()}
@@ -0,0 +1,255 @@
+"""Minimal in-process metrics rendered in the Prometheus text format.
+
+Updates are a dict lookup and an addition under a lock, cheap enough to
+leave on for every request in production.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from starlette.routing import Match
+
+
+LabelValues = Tuple[str, ...]
+
+# Request latencies from a cached /health to a slow PDF parse.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def count(self, *labels: str) -> int:
+        entry = self._values.get(labels)
+        return entry[2] if entry else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._values.items())
+        lines = []
+        names = self.label_names + ("le",)
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(names, labels + (le,))} {cumulative}")
+            suffix = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{suffix} {_format_value(total)}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# ============================================================================
+# SERVICE METRICS
+# ============================================================================
+
+registry = Registry()
+
+REQUESTS_TOTAL = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route, method and status code.", ["method", "route", "status"]))
+REQUEST_ERRORS_TOTAL = registry.register(Counter(
+    "http_request_errors_total", "Requests that raised or returned a 5xx status.", ["method", "route"]))
+REQUEST_SECONDS = registry.register(Histogram(
+    "http_request_duration_seconds", "Request latency by route.", ["method", "route"]))
+REQUESTS_IN_FLIGHT = registry.register(Gauge(
+    "http_requests_in_flight", "Requests currently being handled."))
+
+UPLOAD_STAGE_SECONDS = registry.register(Histogram(
+    "resume_upload_stage_seconds", "Time spent in each resume upload stage (read, pdf_parse, analyze).", ["stage"]))
+PDF_PAGES_TOTAL = registry.register(Counter(
+    "pdf_extracted_pages_total", "PDF pages extracted; rate() gives pages/sec."))
+PDF_BYTES_TOTAL = registry.register(Counter(
+    "pdf_extracted_bytes_total", "PDF bytes parsed; rate() gives bytes/sec."))
+PDF_EXTRACTION_SECONDS_TOTAL = registry.register(Counter(
+    "pdf_extraction_seconds_total", "Wall time spent waiting on PDF extraction."))
+PDF_EARLY_STOPS_TOTAL = registry.register(Counter(
+    "pdf_extractions_stopped_early_total", "PDF extractions that skipped remaining pages.", ["reason"]))
+PDF_EXTRACTIONS_IN_FLIGHT = registry.register(Gauge(
+    "pdf_extractions_in_flight", "PDF documents submitted to the extraction pool and not yet finished."))
+PDF_TIER_TOTAL = registry.register(Counter(
+    "pdf_extraction_tier_total",
+    "PDF extraction tier attempts by outcome (hit, low_quality, unsupported, error); hits over all gives the hit rate.",
+    ["tier", "outcome"]))
+PDF_TIER_SECONDS = registry.register(Histogram(
+    "pdf_extraction_tier_seconds", "Time spent in each PDF extraction tier (stream, layout).", ["tier"]))
+
+ADMISSION_ACTIVE = registry.register(Gauge(
+    "admission_active_requests", "Requests running under each admission budget.", ["budget"]))
+ADMISSION_QUEUE_DEPTH = registry.register(Gauge(
+    "admission_queue_depth", "Requests waiting for a slot in each admission budget.", ["budget"]))
+ADMISSION_REJECTIONS_TOTAL = registry.register(Counter(
+    "admission_rejections_total", "Requests turned away with 503, by budget and reason (queue_full, timeout).",
+    ["budget", "reason"]))
+
+JOB_QUEUE_DEPTH = registry.register(Gauge(
+    "resume_job_queue_depth", "Async resume analysis jobs accepted and not yet started."))
+JOBS_TOTAL = registry.register(Counter(
+    "resume_jobs_total", "Async resume analysis jobs by outcome (done, failed, rejected).", ["status"]))
+
+PROFILES_TOTAL = registry.register(Counter(
+    "request_profiles_total", "Requests profiled and written to PROFILE_DIR."))
+
+
+# ============================================================================
+# MIDDLEWARE
+# ============================================================================
+
+def _match_route(scope):
+    """The route the app in ``scope`` would pick for it, as Starlette's router does."""
+    router = getattr(scope.get("app"), "router", None)
+    partial = None
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route
+        # A wrong method still names the route; the app answers 405 for it
+        if match == Match.PARTIAL and partial is None:
+            partial = route
+    return partial
+
+
+class MetricsMiddleware:
+    """Record request count, latency and errors per route template, plus in-flight requests.
+
+    Routes are labelled by their template ("/sessions/{session_id}") rather
+    than the raw path so label cardinality stays bounded. Requests answered
+    before routing (admission 503s, oversized upload 413s) are matched
+    against the app's routes afterwards, so they carry their route too.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException:
+            status = 500
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route") or _match_route(scope)
+            path = getattr(route, "path", None) or "unmatched"
+            REQUESTS_TOTAL.inc(method, path, str(status))
+            REQUEST_SECONDS.observe(elapsed, method, path)
+            if status >= 500:
+                REQUEST_ERRORS_TOTAL.inc(method, path)
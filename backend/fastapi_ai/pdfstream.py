@@ -0,0 +1,217 @@
+"""Raw PDF text from content stream operators, without layout analysis.
+
+The analyzer only needs the words of a resume, not their positions, so
+this reads the strings shown by Tj, TJ, ' and " in every content stream
+and skips everything pdfplumber does to place characters on a page.
+FlateDecode streams are inflated with zlib. Strings are decoded as
+Windows-1252, which is what simple fonts with standard encodings use;
+composite (CID) fonts and custom encodings come out as control characters
+or nonsense, so callers check the result and fall back to full extraction.
+Objects redefined by incremental updates are read from their last
+definition, in the place of their first.
+"""
+import re
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+
+class UnsupportedPDF(Exception):
+    """The document needs more than the raw pass can do (encryption, other stream filters)."""
+
+
+_STREAM_START = re.compile(rb"\bstream\r?\n")
+_FLATE = re.compile(rb"/Filter\s*(?:/FlateDecode|\[\s*/FlateDecode\s*\])")
+_ANY_FILTER = re.compile(rb"/Filter\b")
+_OBJECT_STREAM = re.compile(rb"/Type\s*/ObjStm\b")
+# Object number in the "N G obj" header just before a stream's dictionary
+_OBJECT_NUMBER = re.compile(rb"(\d+)\s+\d+\s+$")
+# Streams that never hold page text: images, embedded fonts, ICC profiles, XMP, xref and object streams
+_NOT_CONTENT = re.compile(
+    rb"/Subtype\s*/(?:Image|Type1C|CIDFontType0C|OpenType|XML)\b|/Type\s*/(?:XRef|ObjStm|Metadata|EmbeddedFile)\b"
+    rb"|/Length[123]\b|/(?:FunctionType|ShadingType|PatternType|N)\s"
+)
+
+_TOKEN = re.compile(rb"""
+    \((?:[^()\\]|\\.|\((?:[^()\\]|\\.)*\))*\)   # literal string (one level of nested parentheses)
+  | <[0-9A-Fa-f\s]*>                            # hex string
+  | [\[\]]                                      # TJ array brackets
+  | -?(?:\d+\.?\d*|\.\d+)                       # number
+  | [A-Za-z'"*]+                                # operator (or the letters of a /Name, ignored)
+""", re.X | re.S)
+_ESCAPE = re.compile(rb"\\([0-7]{1,3}|\r\n|.)", re.S)
+_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f", b"\r": b"", b"\n": b"", b"\r\n": b""}
+# /Count of the page tree root; inside an object stream in PDF 1.5+ files
+PAGE_COUNT_PATTERN = re.compile(rb"/Type\s*/Pages\b[^>]*?/Count\s+(\d+)|/Count\s+(\d+)[^>]*?/Type\s*/Pages\b")
+
+# Decoded stream bytes allowed per character of max_chars: content streams are mostly
+# operators and positions, but a deflate bomb must not inflate without bound
+DECODED_BYTES_PER_CHAR = 64
+
+# TJ adjustments (thousandths of an em) at least this far apart read as a word gap
+TJ_SPACE_ADJUSTMENT = 200
+# Operators that move to a new position or line; their text is kept apart
+_MOVES = frozenset([b"Td", b"TD", b"Tm", b"T*", b"ET"])
+_SHOW = frozenset([b"Tj", b"'", b'"'])
+
+
+def _unescape(match: "re.Match") -> bytes:
+    code = match.group(1)
+    if code[:1] in b"01234567":
+        return bytes([int(code, 8) & 0xFF])
+    # Escaped line breaks continue the string; any other escaped character stands for itself
+    return _ESCAPES.get(code, code)
+
+
+def _string(token: bytes) -> Optional[bytes]:
+    if token[:1] == b"(":
+        return _ESCAPE.sub(_unescape, token[1:-1])
+    if token[:1] == b"<":
+        digits = re.sub(rb"\s", b"", token[1:-1])
+        return bytes.fromhex((digits + b"0" * (len(digits) % 2)).decode())
+    return None
+
+
+def content_stream_text(data: bytes) -> str:
+    """Text shown by the operators of one decoded content stream."""
+    out: List[bytes] = []
+    operands: List[bytes] = []
+    array: Optional[List[bytes]] = None
+    in_image = False
+    for match in _TOKEN.finditer(data):
+        token = match.group()
+        if in_image:
+            # Inline image data runs from ID to EI and may look like anything
+            in_image = token != b"EI"
+            continue
+        first = token[:1]
+        if first in b"(<-." or first.isdigit():
+            (array if array is not None else operands).append(token)
+        elif token == b"[":
+            array = []
+        elif token == b"]":
+            if array is not None:
+                operands.append(b"[" + b"\0".join(array))
+            array = None
+        else:
+            if token in _SHOW and operands:
+                text = _string(operands[-1])
+                if text is not None:
+                    if token != b"Tj":
+                        out.append(b"\n")
+                    out.append(text)
+            elif token == b"TJ" and operands and operands[-1][:1] == b"[":
+                for item in operands[-1][1:].split(b"\0"):
+                    text = _string(item)
+                    if text is not None:
+                        out.append(text)
+                    elif item and float(item) <= -TJ_SPACE_ADJUSTMENT:
+                        out.append(b" ")
+            elif token in _MOVES:
+                out.append(b"\n")
+            elif token == b"ID":
+                in_image = True
+            operands = []
+    return b"".join(out).decode("cp1252", errors="replace")
+
+
+def page_count(counts: List[Tuple[bytes, bytes]]) -> Optional[int]:
+    """The largest /Count among PAGE_COUNT_PATTERN matches: the page tree root's."""
+    return max(int(a or b) for a, b in counts) if counts else None
+
+
+def extract_stream_text(
+    content: bytes,
+    max_chars: Optional[int] = None,
+    deadline: Optional[float] = None,
+) -> Tuple[str, Optional[int]]:
+    """Text of every content stream in a PDF, in file order, and the page count if found.
+
+    Stops once ``max_chars`` characters are read. Raises UnsupportedPDF for
+    encrypted documents, for streams whose filter is not FlateDecode (skipping
+    those could silently drop text) and when streams decode to more than
+    ``DECODED_BYTES_PER_CHAR`` bytes per character of ``max_chars``.
+    ``deadline`` is a time.time() value checked between streams; passing it
+    raises TimeoutError.
+    """
+    if b"/Encrypt" in content:
+        raise UnsupportedPDF("encrypted")
+    pages = page_count(PAGE_COUNT_PATTERN.findall(content))
+    budget = max_chars * DECODED_BYTES_PER_CHAR if max_chars else None
+    texts: List[str] = []
+    chars = 0
+    for header, keyword, start, end in _stream_spans(content):
+        if deadline and time.time() > deadline:
+            raise TimeoutError("stream extraction exceeded its time budget")
+        dictionary = content[header:keyword]
+        object_stream = pages is None and _OBJECT_STREAM.search(dictionary)
+        if not object_stream and _NOT_CONTENT.search(dictionary):
+            continue
+        data = _decode(dictionary, content[start:end], budget)
+        if budget is not None:
+            budget -= len(data)
+        if object_stream:
+            pages = page_count(PAGE_COUNT_PATTERN.findall(data))
+            continue
+        if b"BT" not in data:
+            continue
+        text = content_stream_text(data)
+        texts.append(text)
+        chars += len(text)
+        if max_chars and chars >= max_chars:
+            break
+    return "\n".join(texts), pages
+
+
+def _stream_spans(content: bytes) -> List[Tuple[int, int, int, int]]:
+    """Offsets of every stream's dictionary, stream keyword, data and end, in file order.
+
+    An object number defined again by an incremental update keeps the
+    position of its first definition but takes the offsets of its last.
+    """
+    spans: List[Tuple[int, int, int, int]] = []
+    # Index in ``spans`` of each object number seen
+    slots: Dict[bytes, int] = {}
+    pos = 0
+    while True:
+        start = _STREAM_START.search(content, pos)
+        if start is None:
+            break
+        end = content.find(b"endstream", start.end())
+        if end < 0:
+            break
+        pos = end + len(b"endstream")
+        # The stream's dictionary sits between its "N G obj" header and the stream keyword
+        header = content.rfind(b"obj", 0, start.start())
+        if header < 0:
+            continue
+        span = (header, start.start(), start.end(), end)
+        number = _OBJECT_NUMBER.search(content, max(0, header - 24), header)
+        if number is None:
+            spans.append(span)
+        elif number.group(1) in slots:
+            spans[slots[number.group(1)]] = span
+        else:
+            slots[number.group(1)] = len(spans)
+            spans.append(span)
+    return spans
+
+
+def _decode(dictionary: bytes, data: bytes, budget: Optional[int] = None) -> bytes:
+    """Decode one stream, raising UnsupportedPDF if it comes to more than ``budget`` bytes."""
+    if _FLATE.search(dictionary):
+        if b"/DecodeParms" in dictionary:
+            raise UnsupportedPDF("predictor")
+        try:
+            if budget is None:
+                data = zlib.decompressobj().decompress(data)
+            else:
+                # One byte past the budget is enough to know it was exceeded
+                data = zlib.decompressobj().decompress(data, budget + 1)
+        except zlib.error:
+            raise UnsupportedPDF("corrupt stream") from None
+    elif _ANY_FILTER.search(dictionary):
+        raise UnsupportedPDF("filter")
+    if budget is not None and len(data) > budget:
+        raise UnsupportedPDF("decoded streams over the size budget")
+    return data
@@ -0,0 +1,184 @@
+"""Per-request stage timings (Server-Timing) and an opt-in sampling profiler.
+
+Code wraps the expensive parts of a request in ``stage(name)``; the
+ServerTimingMiddleware reports them, plus the total, in a Server-Timing
+header that browser dev tools and most proxies can show. Selected requests
+are also profiled by a background thread that samples every thread's
+stack and writes collapsed stacks (one "frame;frame;frame count" line per
+stack) that flamegraph.pl or speedscope can open.
+"""
+import contextvars
+import hmac
+import os
+import random
+import re
+import secrets
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from metrics import Histogram, PROFILES_TOTAL
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Requests sending "X-Profile: <token>" are profiled; unset disables the header
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN") or None
+# Fraction of all requests profiled at random (0 disables sampling)
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "interviewcoach-profiles"))
+PROFILE_INTERVAL_SECONDS = float(os.environ.get("PROFILE_INTERVAL_SECONDS", "0.005"))
+
+PROFILE_HEADER = b"x-profile"
+
+# Leaf frames of threads that are blocked rather than working (idle pool threads sit in _worker)
+IDLE_FRAMES = frozenset(["wait", "select", "poll", "_worker"])
+
+
+# ============================================================================
+# STAGE TIMINGS
+# ============================================================================
+
+# Stage durations of the current request, shared with tasks and threads it starts
+_stages: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar("request_stages", default=None)
+
+
+def record_stage(name: str, seconds: float) -> None:
+    """Add ``seconds`` to stage ``name`` of the current request, if one is being timed."""
+    stages = _stages.get()
+    if stages is not None:
+        stages[name] = stages.get(name, 0.0) + seconds
+
+
+@contextmanager
+def stage(name: str, histogram: Optional[Histogram] = None) -> Iterator[None]:
+    """Time a block as a Server-Timing stage, also observing ``histogram`` labelled ``name``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        record_stage(name, elapsed)
+        if histogram is not None:
+            histogram.observe(elapsed, name)
+
+
+def server_timing(stages: Dict[str, float], total: float, profile_id: Optional[str] = None) -> str:
+    entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in stages.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    if profile_id is not None:
+        entries.append(f'profile;desc="{profile_id}"')
+    return ", ".join(entries)
+
+
+# ============================================================================
+# SAMPLING PROFILER
+# ============================================================================
+
+class SamplingProfiler:
+    """Sample the stacks of every other thread at a fixed interval while running.
+
+    The event loop thread is shared, so a profile also shows other requests
+    handled at the same time. PDF extraction runs in pool processes and
+    only appears as the loop waiting; its time is in the pdf_parse stage.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own or frame.f_code.co_name in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if ident not in names:
+                    names.update((thread.ident, thread.name) for thread in threading.enumerate())
+                stack.append(names.get(ident, str(ident)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def _should_profile(scope) -> bool:
+    if PROFILE_TOKEN is not None:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return hmac.compare_digest(value, PROFILE_TOKEN.encode())
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def _profile_id(scope) -> str:
+    path = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+    return f"{int(time.time() * 1000)}-{scope['method'].lower()}-{path[:60]}-{secrets.token_hex(3)}"
+
+
+# ============================================================================
+# MIDDLEWARE
+# ============================================================================
+
+class ServerTimingMiddleware:
+    """Add a Server-Timing header to every HTTP response and profile selected requests.
+
+    Stages finished before the response starts are reported, so streamed
+    responses only show the work done before their first byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stages: Dict[str, float] = {}
+        token = _stages.set(stages)
+        profiler = None
+        profile_id = None
+        if (PROFILE_TOKEN is not None or PROFILE_SAMPLE_RATE > 0) and _should_profile(scope):
+            profiler = SamplingProfiler()
+            profile_id = _profile_id(scope)
+            profiler.start()
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                header = server_timing(stages, time.perf_counter() - start, profile_id)
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _stages.reset(token)
+            if profiler is not None:
+                profiler.stop()
+                os.makedirs(PROFILE_DIR, exist_ok=True)
+                profiler.write(os.path.join(PROFILE_DIR, profile_id + ".folded"))
+                PROFILES_TOTAL.inc()
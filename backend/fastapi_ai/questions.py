@@ -0,0 +1,201 @@
+"""Interview question bank and deterministic question selection."""
+import hashlib
+import json
+import os
+import random
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+QUESTION_BANK_PATH = os.environ.get(
+    "QUESTION_BANK_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "questions.json")
+)
+
+QUESTIONS_PER_INTERVIEW = 5
+
+CATEGORIES = ("role", "skill", "level", "behavioral")
+# Extra score for each request tag (role, skill, level) a question also carries
+TAG_BOOST = 1.0
+
+
+# ============================================================================
+# QUESTION BANK
+# ============================================================================
+
+class QuestionBank:
+    """Questions tagged by role, skill and level, with inverted indexes.
+
+    Every question has a category (role, skill, level or behavioral) and
+    tags such as "role:data scientist" or "skill:python". Postings map a
+    (category, tag) pair to an array of question IDs ordered by weight, so
+    top-k retrieval only touches questions that can match the request.
+    """
+
+    def __init__(self, questions: Sequence[dict], role_aliases: Optional[Dict[str, str]] = None):
+        self.texts: List[str] = []
+        weights: List[float] = []
+        postings: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        roles = set()
+
+        for qid, entry in enumerate(questions):
+            category = entry.get("category", "behavioral")
+            if category not in CATEGORIES:
+                raise ValueError(f"Question {qid}: unknown category {category!r}")
+            tags = frozenset(
+                [f"role:{r.lower()}" for r in entry.get("roles", [])]
+                + [f"skill:{s.lower()}" for s in entry.get("skills", [])]
+                + [f"level:{lv.lower()}" for lv in entry.get("levels", [])]
+            )
+            self.texts.append(entry["question"])
+            weights.append(float(entry.get("weight", 1.0)))
+            roles.update(r.lower() for r in entry.get("roles", []))
+            postings[(category, "*")].append(qid)
+            for tag in tags:
+                postings[(category, tag)].append(qid)
+
+        self.weights = np.asarray(weights, dtype=np.float64)
+        # Heaviest first, bank order breaking ties
+        self.postings: Dict[Tuple[str, str], np.ndarray] = {
+            key: np.asarray(sorted(ids, key=lambda qid: (-weights[qid], qid)), dtype=np.int64)
+            for key, ids in postings.items()
+        }
+        self._masks: Dict[Tuple[str, str], np.ndarray] = {}
+        self.role_names: Dict[str, str] = {role: role for role in roles}
+        self.role_names.update({alias.lower(): role.lower() for alias, role in (role_aliases or {}).items()})
+        self._longest_role = max((len(name.split()) for name in self.role_names), default=0)
+
+    @classmethod
+    def load(cls, path: str) -> "QuestionBank":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["questions"], data.get("role_aliases"))
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def resolve_role(self, role: str) -> Optional[str]:
+        """Map a free-text role ("Senior SWE", "Data Science") to a bank role.
+
+        The whole string is tried first, then its word n-grams from longest
+        to shortest, each a dict lookup.
+        """
+        words = role.lower().replace("/", " ").split()
+        for size in range(min(len(words), self._longest_role), 0, -1):
+            for start in range(len(words) - size + 1):
+                name = self.role_names.get(" ".join(words[start:start + size]))
+                if name is not None:
+                    return name
+        return None
+
+    def top_k(self, category: str, tag: str, boost_tags: Iterable[str], k: int) -> List[int]:
+        """Return up to ``k`` question IDs of ``category`` carrying ``tag``, best first.
+
+        A question scores its weight plus TAG_BOOST for every boost tag it
+        carries. Questions without any boost tag rank by weight alone, so the
+        heaviest ``k`` of them (the head of the posting) plus the boosted
+        ones are the only candidates that can reach the top ``k``. Those are
+        counted and ranked with array operations rather than per question.
+        """
+        primary = self.postings.get((category, tag))
+        if primary is None:
+            return []
+        boosts = [self.postings[(category, t)] for t in boost_tags if t != tag and (category, t) in self.postings]
+        boosted = np.concatenate(boosts) if boosts else primary[:0]
+        if tag != "*":
+            boosted = boosted[self._members(category, tag)[boosted]]
+        counts = np.bincount(boosted, minlength=len(self.texts))
+        candidates = np.union1d(boosted, primary[:k])
+        scores = self.weights[candidates] + TAG_BOOST * counts[candidates]
+        return candidates[np.lexsort((candidates, -scores))[:k]].tolist()
+
+    def _members(self, category: str, tag: str) -> np.ndarray:
+        """Boolean mask over all question IDs of those in a posting, built on first use."""
+        mask = self._masks.get((category, tag))
+        if mask is None:
+            mask = np.zeros(len(self.texts), dtype=bool)
+            mask[self.postings[(category, tag)]] = True
+            self._masks[(category, tag)] = mask
+        return mask
+
+
+QUESTION_BANK = QuestionBank.load(QUESTION_BANK_PATH)
+
+
+# ============================================================================
+# SELECTION
+# ============================================================================
+
+def question_key(skills: Sequence[str], experience_level: str, role: Optional[str], seed: Optional[int]) -> Tuple:
+    """Normalize request fields into the memoization key for select_questions()."""
+    return (
+        tuple(sorted({skill.lower() for skill in skills})),
+        experience_level.strip().lower(),
+        (role or "").strip().lower(),
+        seed,
+    )
+
+
+def _interleave(lists: Sequence[List[int]]) -> List[int]:
+    merged: List[int] = []
+    for i in range(max((len(ids) for ids in lists), default=0)):
+        merged.extend(ids[i] for ids in lists if i < len(ids))
+    return merged
+
+
+@lru_cache(maxsize=4096)
+def select_questions(skills: Tuple[str, ...], experience_level: str, role: str, seed: Optional[int]) -> Tuple[str, ...]:
+    """Pick interview questions deterministically for a key from question_key().
+
+    Candidates are grouped from most to least specific (role, skills, level,
+    behavioral), each group retrieved best-first from the bank's indexes,
+    and taken round-robin so every interview mixes categories. The result
+    depends only on the arguments, never on hash randomization, so every
+    worker returns the same questions. A ``seed`` reorders a wider pool of
+    candidates inside each group for variety while staying reproducible.
+    """
+    bank = QUESTION_BANK
+    k = QUESTIONS_PER_INTERVIEW if seed is None else 2 * QUESTIONS_PER_INTERVIEW
+    bank_role = bank.resolve_role(role)
+    role_tags = [f"role:{bank_role}"] if bank_role else []
+    skill_tags = [f"skill:{skill}" for skill in skills]
+    level_tags = [f"level:{experience_level}"]
+    request_tags = role_tags + skill_tags + level_tags
+
+    groups = [
+        _interleave([bank.top_k("role", tag, request_tags, k) for tag in role_tags]),
+        _interleave([bank.top_k("skill", tag, request_tags, k) for tag in skill_tags]),
+        bank.top_k("level", level_tags[0], request_tags, k),
+        bank.top_k("behavioral", "*", request_tags, k),
+    ]
+
+    if seed is not None:
+        rng = random.Random(seed)
+        for group in groups:
+            rng.shuffle(group)
+
+    selected: Dict[str, None] = {}
+    depth = max(len(group) for group in groups)
+    for i in range(depth):
+        for group in groups:
+            if i < len(group):
+                selected.setdefault(bank.texts[group[i]])
+        if len(selected) >= QUESTIONS_PER_INTERVIEW:
+            break
+    return tuple(selected)[:QUESTIONS_PER_INTERVIEW]
+
+
+@lru_cache(maxsize=4096)
+def render_questions(skills: Tuple[str, ...], experience_level: str, role: str, seed: Optional[int]) -> Tuple[bytes, str]:
+    """Return the serialized QuestionGenerationResponse body and its ETag."""
+    selected = select_questions(skills, experience_level, role, seed)
+    payload = {"questions": [{"id": i + 1, "question": q} for i, q in enumerate(selected)]}
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return body, etag
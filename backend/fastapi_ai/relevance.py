@@ -0,0 +1,193 @@
+"""TF-IDF topical similarity between answers, interview questions and skills.
+
+The vocabulary and IDF weights come from the question bank and the skill
+taxonomy and are built once at import. Vectorizing a batch of texts is a
+single scatter into a NumPy array, and similarities are row-wise dot
+products of L2-normalized vectors, so scoring many answers is one call.
+"""
+import math
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from analysis import SKILL_KEYWORDS
+from questions import QUESTION_BANK
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+")
+
+STOPWORDS = frozenset(
+    "a about an and are as at be by can did do does for from had has have how i if in into is it its me "
+    "my of on or our so than that the their them then there these they this to was we were what when "
+    "where which while who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords, with a trailing plural "s" dropped."""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class TfidfEngine:
+    """Sublinear TF-IDF vectors over a fixed vocabulary, compared by cosine similarity.
+
+    Terms outside the vocabulary cannot match anything, but they still
+    count towards a text's norm (at the highest IDF), so padding an answer
+    with unrelated words lowers its similarity instead of being ignored.
+    """
+
+    def __init__(self, documents: Sequence[str], skill_documents: Dict[str, str]):
+        tokenized = [set(tokenize(doc)) for doc in list(documents) + list(skill_documents.values())]
+        vocabulary = sorted(set().union(*tokenized))
+        self.vocabulary: Dict[str, int] = {term: i for i, term in enumerate(vocabulary)}
+
+        doc_freq = np.zeros(len(vocabulary), dtype=np.float32)
+        for terms in tokenized:
+            doc_freq[[self.vocabulary[t] for t in terms]] += 1
+        n_docs = len(tokenized)
+        self.idf = (np.log((1 + n_docs) / (1 + doc_freq)) + 1).astype(np.float32)
+        self.oov_idf = float(math.log(1 + n_docs) + 1)
+
+        self.skill_index: Dict[str, int] = {skill: i for i, skill in enumerate(skill_documents)}
+        self.skill_matrix = self.vectorize(list(skill_documents.values()))
+
+        # Questions and skill sets repeat across requests; answers never do
+        self._question_vector = lru_cache(maxsize=4096)(lambda text: self.vectorize([text])[0])
+        self._skill_profile = lru_cache(maxsize=1024)(self._build_skill_profile)
+
+    def vectorize(self, texts: Sequence[str]) -> np.ndarray:
+        """Return an L2-normalized (len(texts), vocabulary) TF-IDF matrix."""
+        rows: List[int] = []
+        cols: List[int] = []
+        counts: List[int] = []
+        oov_sq = np.zeros(len(texts), dtype=np.float32)
+        for row, text in enumerate(texts):
+            term_counts: Dict[str, int] = {}
+            for token in tokenize(text):
+                term_counts[token] = term_counts.get(token, 0) + 1
+            for term, count in term_counts.items():
+                col = self.vocabulary.get(term)
+                if col is None:
+                    oov_sq[row] += ((1 + math.log(count)) * self.oov_idf) ** 2
+                else:
+                    rows.append(row)
+                    cols.append(col)
+                    counts.append(count)
+
+        matrix = np.zeros((len(texts), len(self.vocabulary)), dtype=np.float32)
+        if rows:
+            cols_arr = np.asarray(cols)
+            matrix[np.asarray(rows), cols_arr] = (1 + np.log(np.asarray(counts, dtype=np.float32))) * self.idf[cols_arr]
+        norms = np.sqrt((matrix * matrix).sum(axis=1) + oov_sq)
+        norms[norms == 0] = 1.0
+        return matrix / norms[:, None]
+
+    def similarity(self, texts: Sequence[str], others: Sequence[str]) -> np.ndarray:
+        """Cosine similarity of each text with the text at the same position in ``others``."""
+        if not texts:
+            return np.zeros(0, dtype=np.float32)
+        return (self.vectorize(texts) * self.vectorize(others)).sum(axis=1)
+
+    def skill_profile(self, skills: Iterable[str]) -> np.ndarray:
+        """Normalized sum of the taxonomy vectors of ``skills``; unknown skills are vectorized as text."""
+        return self._skill_profile(tuple(sorted(set(skills))))
+
+    def _build_skill_profile(self, skills: Tuple[str, ...]) -> np.ndarray:
+        known = [self.skill_index[s] for s in skills if s in self.skill_index]
+        unknown = [s for s in skills if s not in self.skill_index]
+        profile = self.skill_matrix[known].sum(axis=0)
+        if unknown:
+            profile = profile + self.vectorize(unknown).sum(axis=0)
+        norm = float(np.linalg.norm(profile))
+        return profile / norm if norm else profile
+
+    def score_batch(self, answers: Sequence[str], questions: Sequence[str], skills: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (answer-question, answer-skills) cosine similarities for a batch of answers."""
+        if not answers:
+            empty = np.zeros(0, dtype=np.float32)
+            return empty, empty
+        answer_matrix = self.vectorize(answers)
+        question_matrix = np.stack([self._question_vector(q) for q in questions])
+        question_sim = (answer_matrix * question_matrix).sum(axis=1)
+        skill_sim = answer_matrix @ self.skill_profile(skills)
+        return question_sim, skill_sim
+
+
+class IncrementalSimilarity:
+    """Question and skill similarity of a text that changes a few terms at a time.
+
+    Keeps the text's term counts, squared norm and dot products with the
+    question vector and skill profile, so an edit costs time in the terms
+    it adds and removes instead of re-vectorizing the whole text. Matches
+    TfidfEngine.score_batch() up to float rounding.
+    """
+
+    def __init__(self, engine: TfidfEngine, question: str, skills: Sequence[str]):
+        self.engine = engine
+        self.question_vector = engine._question_vector(question)
+        self.profile = engine.skill_profile(skills)
+        self.counts: Dict[str, int] = {}
+        self._norm_sq = 0.0
+        self._question_dot = 0.0
+        self._skill_dot = 0.0
+
+    def update(self, removed: Iterable[str], added: Iterable[str]) -> None:
+        """Apply the tokens (from tokenize()) an edit removed and added."""
+        changes: Dict[str, int] = {}
+        for token in removed:
+            changes[token] = changes.get(token, 0) - 1
+        for token in added:
+            changes[token] = changes.get(token, 0) + 1
+
+        engine = self.engine
+        for term, diff in changes.items():
+            if not diff:
+                continue
+            old = self.counts.get(term, 0)
+            new = old + diff
+            col = engine.vocabulary.get(term)
+            idf = engine.oov_idf if col is None else float(engine.idf[col])
+            delta = ((1 + math.log(new)) * idf if new else 0.0) - ((1 + math.log(old)) * idf if old else 0.0)
+            self._norm_sq += delta * (2 * ((1 + math.log(old)) * idf if old else 0.0) + delta)
+            if col is not None:
+                self._question_dot += delta * float(self.question_vector[col])
+                self._skill_dot += delta * float(self.profile[col])
+            if new:
+                self.counts[term] = new
+            else:
+                del self.counts[term]
+        if not self.counts:
+            # Drop accumulated rounding error once the text is empty again
+            self._norm_sq = self._question_dot = self._skill_dot = 0.0
+
+    def similarities(self) -> Tuple[float, float]:
+        """Return (text-question, text-skills) cosine similarity."""
+        if self._norm_sq <= 1e-12:
+            return 0.0, 0.0
+        norm = math.sqrt(self._norm_sq)
+        return self._question_dot / norm, self._skill_dot / norm
+
+
+def _build_engine() -> TfidfEngine:
+    bank = QUESTION_BANK
+    # A skill's document is its name, its resume keywords and its questions
+    skill_documents = {
+        skill: " ".join([
+            skill, *keywords,
+            *(bank.texts[qid] for qid in bank.postings.get(("skill", f"skill:{skill}"), [])),
+        ])
+        for skill, keywords in SKILL_KEYWORDS.items()
+    }
+    return TfidfEngine(bank.texts, skill_documents)
+
+
+ENGINE = _build_engine()
@@ -0,0 +1,377 @@
+"""Interview answer scoring shared by the single and batch evaluation endpoints.
+
+Scoring is split in two: extract_features() makes one scan over the answer
+and returns an AnswerFeatures record, and the score functions below derive
+relevance, STAR structure, missing points and confidence from that record
+alone. Topical similarity to the question and resume skills comes from the
+TF-IDF engine in relevance.py, computed for a whole batch of answers at once.
+"""
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, List, Sequence, Tuple
+
+from analysis import KeywordMatcher
+from relevance import ENGINE, TOKEN_PATTERN, IncrementalSimilarity, tokenize
+
+
+# ============================================================================
+# SCORING TABLES
+# ============================================================================
+
+METRIC_WORDS: List[str] = ["decreased", "increased", "improved"]
+NUMERIC_METRICS_REGEX = r'\d+[%x]'
+
+STAR_KEYWORDS: Dict[str, List[str]] = {
+    "situation": ["situation", "context", "background", "team", "company", "project", "faced"],
+    "task": ["task", "challenge", "problem", "goal", "asked", "responsibility", "needed"],
+    "action": ["action", "i did", "i led", "i implemented", "i developed", "i wrote", "i created"],
+    "result": ["result", "outcome", "impact", "improved", "achieved", "metrics", "delivered"]
+}
+
+COLLABORATION_KEYWORDS: List[str] = ["we", "team", "collaborated", "led"]
+
+METRIC_TAG = "__metric__"
+NUMERIC_METRIC_TAG = "__numeric_metric__"
+COLLABORATION_TAG = "__collaboration__"
+
+ANSWER_MATCHER = KeywordMatcher(
+    {**STAR_KEYWORDS, METRIC_TAG: METRIC_WORDS, COLLABORATION_TAG: COLLABORATION_KEYWORDS},
+    patterns={NUMERIC_METRIC_TAG: NUMERIC_METRICS_REGEX},
+    plurals=True,
+)
+
+# Relevance points for topical overlap with the question, and for overlap
+# with the resume skills when none is named outright. Cosine similarities
+# at or above the saturation value earn the full weight.
+QUESTION_WEIGHT = 2.0
+QUESTION_SIMILARITY_SATURATION = 0.3
+SKILL_WEIGHT = 1.0
+SKILL_SIMILARITY_SATURATION = 0.25
+
+IMPROVED_ANSWER = "**Situation:** Start with context: 'At [Company], I was part of a team where...' **Task:** Explain the challenge: 'We faced [specific problem]...' **Action:** Describe what YOU did (use 'I'): 'I led the effort to [action]...' **Result:** End with impact: 'This resulted in [metric], improving [outcome] by X%.' \n\nExample: 'At TechCorp, our API response times were slow. I optimized the database queries, added caching, and implemented connection pooling. This reduced P99 latency by 60% and improved user satisfaction scores by 25%.'"
+
+
+def prepare_skills(resume_skills: Sequence[str]) -> List[str]:
+    """Lowercase resume skills once so they can be reused across answers."""
+    return [skill.lower() for skill in (resume_skills or [])]
+
+
+# ============================================================================
+# FEATURE EXTRACTION
+# ============================================================================
+
+@dataclass
+class AnswerFeatures:
+    """Everything the scorer needs to know about one answer."""
+    word_count: int = 0
+    metric_hits: int = 0
+    numeric_metric_hits: int = 0
+    star_hits: Dict[str, int] = field(default_factory=dict)
+    skill_hits: int = 0
+    collaboration_hits: int = 0
+    question_similarity: float = 0.0
+    skill_similarity: float = 0.0
+
+    @property
+    def star_components(self) -> List[str]:
+        return [component for component in STAR_KEYWORDS if self.star_hits.get(component)]
+
+    @property
+    def has_metrics(self) -> bool:
+        return self.metric_hits > 0 or self.numeric_metric_hits > 0
+
+
+def extract_features(answer: str, skills: Sequence[str], question: str = "") -> AnswerFeatures:
+    """Scan an answer once; ``skills`` must come from prepare_skills()."""
+    return extract_features_batch([answer], [question], skills)[0]
+
+
+def extract_features_batch(answers: Sequence[str], questions: Sequence[str], skills: Sequence[str]) -> List[AnswerFeatures]:
+    """Feature records for many answers, with TF-IDF similarities computed in one call."""
+    question_sims, skill_sims = ENGINE.score_batch(answers, questions, skills)
+    features = []
+    for answer, question_sim, skill_sim in zip(answers, question_sims.tolist(), skill_sims.tolist()):
+        answer_lower = answer.lower()
+        counts = ANSWER_MATCHER.count(answer_lower)
+        features.append(AnswerFeatures(
+            word_count=len(answer.split()),
+            metric_hits=counts[METRIC_TAG],
+            numeric_metric_hits=counts[NUMERIC_METRIC_TAG],
+            star_hits={component: counts[component] for component in STAR_KEYWORDS},
+            skill_hits=sum(1 for skill in skills if skill in answer_lower),
+            collaboration_hits=counts[COLLABORATION_TAG],
+            question_similarity=question_sim,
+            skill_similarity=skill_sim,
+        ))
+    return features
+
+
+# ============================================================================
+# SCORING
+# ============================================================================
+
+def relevance_score(features: AnswerFeatures) -> float:
+    relevance = 2.0 + 2.0 * features.skill_hits
+
+    word_count = features.word_count
+    if word_count > 150:
+        relevance += 3.5
+    elif word_count > 100:
+        relevance += 2.5
+    elif word_count > 60:
+        relevance += 1.5
+    elif word_count < 20:
+        relevance -= 1.0
+
+    if features.has_metrics:
+        relevance += 1.5
+
+    relevance += QUESTION_WEIGHT * min(1.0, features.question_similarity / QUESTION_SIMILARITY_SATURATION)
+    if not features.skill_hits:
+        relevance += SKILL_WEIGHT * min(1.0, features.skill_similarity / SKILL_SIMILARITY_SATURATION)
+
+    return max(0, min(10.0, relevance))
+
+
+def has_star_structure(features: AnswerFeatures) -> bool:
+    return len(features.star_components) >= 3
+
+
+# Stable codes for the suggestions below, in the order they are given
+MISSING_STAR = "star"
+MISSING_RELEVANCE = "relevance"
+MISSING_DETAIL = "detail"
+MISSING_METRICS = "metrics"
+MISSING_POINT_CODES = (MISSING_STAR, MISSING_RELEVANCE, MISSING_DETAIL, MISSING_METRICS)
+
+MISSING_POINT_TEXT: Dict[str, str] = {
+    MISSING_RELEVANCE: "Mention more relevant technical skills or specific projects",
+    MISSING_DETAIL: "Provide more detail. Aim for 80+ words to show depth",
+    MISSING_METRICS: "Quantify impact with metrics (e.g., '40% faster', '2x improvement')",
+}
+
+
+def missing_point_codes(features: AnswerFeatures, relevance: float, structure_star: bool) -> List[str]:
+    codes = []
+
+    # Without STAR structure at most two components are present, so some are missing
+    if not structure_star:
+        codes.append(MISSING_STAR)
+
+    if relevance < 4.0:
+        codes.append(MISSING_RELEVANCE)
+
+    if features.word_count < 60:
+        codes.append(MISSING_DETAIL)
+
+    if not features.has_metrics:
+        codes.append(MISSING_METRICS)
+
+    return codes
+
+
+def missing_points_for(features: AnswerFeatures, relevance: float, structure_star: bool) -> List[str]:
+    missing_points = []
+    for code in missing_point_codes(features, relevance, structure_star):
+        if code == MISSING_STAR:
+            missing = [component.upper() for component in STAR_KEYWORDS if not features.star_hits.get(component)]
+            missing_points.append(f"Add missing STAR components: {', '.join(missing)}")
+        else:
+            missing_points.append(MISSING_POINT_TEXT[code])
+    return missing_points
+
+
+def confidence_score(features: AnswerFeatures, structure_star: bool) -> float:
+    confidence = 45.0
+    confidence += min(30.0, (features.word_count / 5))
+    if structure_star:
+        confidence += 20.0
+    if features.collaboration_hits:
+        confidence += 5.0
+    if features.numeric_metric_hits:
+        confidence += 5.0
+
+    return max(0, min(100.0, confidence))
+
+
+def score_features(features: AnswerFeatures) -> Dict[str, Any]:
+    """Derive the fields of an AnswerEvaluationResponse from a feature record."""
+    relevance = relevance_score(features)
+    structure_star = has_star_structure(features)
+    return {
+        "relevance": round(relevance, 1),
+        "structure_star": structure_star,
+        "missing_points": missing_points_for(features, relevance, structure_star),
+        "improved_answer": IMPROVED_ANSWER,
+        "confidence": round(confidence_score(features, structure_star), 1),
+    }
+
+
+def score_answer(answer: str, skills: Sequence[str], question: str = "") -> Dict[str, Any]:
+    """Score one answer against skills already passed through prepare_skills()."""
+    return score_features(extract_features(answer, skills, question))
+
+
+def score_answers(answers: Sequence[str], questions: Sequence[str], skills: Sequence[str]) -> List[Dict[str, Any]]:
+    """Score many answers to their questions with one vectorized similarity pass."""
+    return [score_features(features) for features in extract_features_batch(answers, questions, skills)]
+
+
+# ============================================================================
+# INCREMENTAL FEATURES
+# ============================================================================
+
+def _widen(text: str, start: int, end: int, inside: Callable[[str], bool]) -> Tuple[int, int]:
+    """Grow [start, end) outwards over characters for which ``inside`` holds."""
+    while start > 0 and inside(text[start - 1]):
+        start -= 1
+    while end < len(text) and inside(text[end]):
+        end += 1
+    return start, end
+
+
+def _is_token_char(char: str) -> bool:
+    return TOKEN_PATTERN.fullmatch(char) is not None
+
+
+def _occurrences(text: str, needle: str) -> int:
+    """Occurrences of ``needle`` in ``text``, overlapping ones included."""
+    count, i = 0, text.find(needle)
+    while i != -1:
+        count += 1
+        i = text.find(needle, i + 1)
+    return count
+
+
+class LiveAnswer:
+    """An answer being typed, with its AnswerFeatures kept current edit by edit.
+
+    Each edit only rescans the text around it: words and TF-IDF terms are
+    re-tokenized from the edited word outwards, skill substrings are
+    searched within a skill's length of the edit, and keyword hits are
+    rescanned from just before the edit until the scan meets a hit it had
+    already found. The features always equal extract_features() on the
+    current text (similarities up to float rounding).
+    """
+
+    def __init__(self, skills: Sequence[str], question: str = ""):
+        self.skills = list(skills)
+        self.text = ""
+        self.version = 0
+        self._lower = ""
+        # False once lowercasing changed the text's length; positions then
+        # differ between the two and every edit rescans the whole answer.
+        self._aligned = True
+        self._word_count = 0
+        self._hits: Counter = Counter()
+        self._matches: List[Tuple[int, int, FrozenSet[str]]] = []
+        self._skill_counts: Dict[str, int] = dict.fromkeys(skill for skill in self.skills if skill)
+        self._similarity = IncrementalSimilarity(ENGINE, question, self.skills)
+        self._reset_counts()
+
+    def edit(self, position: int, delete: int, insert: str) -> None:
+        """Replace ``delete`` characters at ``position`` with ``insert``."""
+        if position < 0 or delete < 0 or position + delete > len(self.text):
+            raise ValueError("Edit is outside the answer")
+        self.version += 1
+        text = self.text[:position] + insert + self.text[position + delete:]
+        insert_lower = insert.lower()
+        if not self._aligned or len(insert_lower) != len(insert):
+            self._rebuild(text)
+            return
+        lower = self._lower[:position] + insert_lower + self._lower[position + delete:]
+        self._apply(self._lower, lower, position, position + delete, position + len(insert))
+        self.text, self._lower = text, lower
+
+    def replace(self, text: str) -> None:
+        """Replace the whole answer, rescanning it once."""
+        self.version += 1
+        self._rebuild(text)
+
+    def features(self) -> AnswerFeatures:
+        question_similarity, skill_similarity = self._similarity.similarities()
+        return AnswerFeatures(
+            word_count=self._word_count,
+            metric_hits=self._hits[METRIC_TAG],
+            numeric_metric_hits=self._hits[NUMERIC_METRIC_TAG],
+            star_hits={component: self._hits[component] for component in STAR_KEYWORDS},
+            skill_hits=sum(1 for skill in self.skills if not skill or self._skill_counts[skill]),
+            collaboration_hits=self._hits[COLLABORATION_TAG],
+            question_similarity=question_similarity,
+            skill_similarity=skill_similarity,
+        )
+
+    def _reset_counts(self) -> None:
+        self._word_count = 0
+        self._hits = Counter()
+        self._matches = []
+        for skill in self._skill_counts:
+            self._skill_counts[skill] = 0
+
+    def _rebuild(self, text: str) -> None:
+        lower = text.lower()
+        self._reset_counts()
+        self._similarity.update(tokenize(self._lower), ())
+        self._apply("", lower, 0, 0, len(lower))
+        self.text, self._lower = text, lower
+        self._aligned = len(lower) == len(text)
+
+    def _apply(self, old: str, new: str, start: int, old_end: int, new_end: int) -> None:
+        """Update every count for ``old[start:old_end]`` becoming ``new[start:new_end]``."""
+        shift = new_end - old_end
+
+        # Words and terms: re-tokenize the edit grown to the nearest separators
+        # on both sides, which are the same characters before and after it
+        lo, hi = _widen(old, start, old_end, lambda char: not char.isspace())
+        self._word_count += len(new[lo:hi + shift].split()) - len(old[lo:hi].split())
+        lo, hi = _widen(old, start, old_end, _is_token_char)
+        self._similarity.update(tokenize(old[lo:hi]), tokenize(new[lo:hi + shift]))
+
+        # Skills: only occurrences starting within a skill's length of the edit can change
+        for skill in self._skill_counts:
+            lo = max(0, start - len(skill) + 1)
+            self._skill_counts[skill] += (
+                _occurrences(new[lo:new_end + len(skill) - 1], skill)
+                - _occurrences(old[lo:old_end + len(skill) - 1], skill)
+            )
+
+        self._rescan_matches(new, start, old_end, new_end)
+
+    def _rescan_matches(self, new: str, start: int, old_end: int, new_end: int) -> None:
+        matches = self._matches
+        shift = new_end - old_end
+
+        # Restart far enough back that no keyword reaching into the edit is
+        # missed; an unbounded numeric pattern is covered by also backing
+        # over the digit run it would start in.
+        restart = max(0, start - ANSWER_MATCHER.longest_keyword - 1)
+        while restart > 0 and new[restart - 1].isdecimal():
+            restart -= 1
+        first = bisect_left(matches, (restart,))
+        if first > 0 and matches[first - 1][1] > restart:
+            first -= 1
+        scan_from = min(restart, matches[first][0]) if first < len(matches) else restart
+
+        # Once the new scan yields a hit the old scan also found past the
+        # edit, both continue over identical text, so the rest is reused.
+        reuse = bisect_left(matches, (old_end,))
+        found = []
+        for hit in ANSWER_MATCHER.matches(new, scan_from):
+            hit_start, hit_end, tags = hit
+            if hit_start >= new_end:
+                while reuse < len(matches) and matches[reuse][0] < hit_start - shift:
+                    reuse += 1
+                if reuse < len(matches) and matches[reuse] == (hit_start - shift, hit_end - shift, tags):
+                    break
+            found.append(hit)
+        else:
+            reuse = len(matches)
+
+        for _, _, tags in matches[first:reuse]:
+            self._hits.subtract(tags)
+        for _, _, tags in found:
+            self._hits.update(tags)
+        tail = matches[reuse:] if not shift else [(s + shift, e + shift, tags) for s, e, tags in matches[reuse:]]
+        self._matches = matches[:first] + found + tail
+
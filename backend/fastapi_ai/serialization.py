@@ -0,0 +1,52 @@
+"""Fast JSON bodies for high-volume responses the server builds itself.
+
+Response models still document the endpoints, but with FAST_JSON on the
+handlers return ready-made bytes: FastAPI skips re-validating data that
+the scoring code produced, orjson does the encoding when installed, and
+the constant improved-answer text is encoded once at import.
+"""
+import json
+import os
+from typing import Any, Dict, Iterable
+
+from fastapi.responses import Response
+
+from scoring import IMPROVED_ANSWER
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+FAST_JSON = os.environ.get("FAST_JSON", "0").lower() in ("1", "true", "yes")
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode ``obj`` as compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+_IMPROVED_ANSWER_FIELD = b',"improved_answer":' + dumps(IMPROVED_ANSWER) + b"}"
+
+
+def evaluation_json(result: Dict[str, Any]) -> bytes:
+    """Encode a score_answer() result, splicing in the pre-encoded improved answer."""
+    rest = {key: value for key, value in result.items() if key != "improved_answer"}
+    return dumps(rest)[:-1] + _IMPROVED_ANSWER_FIELD
+
+
+def batch_evaluation_json(results: Iterable[Dict[str, Any]], summary: Dict[str, Any]) -> bytes:
+    """Encode a BatchEvaluationResponse body from score_answer() results and aggregates."""
+    return b'{"results":[' + b",".join(evaluation_json(r) for r in results) + b"]," + dumps(summary)[1:]
+
+
+class JSONBytesResponse(Response):
+    """A response whose body is already encoded JSON."""
+
+    media_type = "application/json"
+
+    def render(self, content: bytes) -> bytes:
+        return content
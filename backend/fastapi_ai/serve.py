@@ -0,0 +1,83 @@
+"""Production launcher: N uvicorn workers sharing caches and sessions.
+
+Usage:
+    python serve.py                          # one worker per available core
+    python serve.py --workers 4 --port 8000 --state-dir /var/lib/interviewcoach
+
+Every worker is a separate process, so per-process state would be split
+N ways. Unless already configured, the launcher points ANALYSIS_CACHE_DB
+and SESSION_DB at SQLite files in ``--state-dir`` so all workers read
+and write the same resume analyses and sessions, puts the evaluation
+history record file and async job status there too, and divides the cores between the
+workers' PDF extraction pools.
+
+Signals (handled by the uvicorn supervisor):
+    SIGHUP            restart workers one by one to pick up new code or config
+    SIGTTIN / SIGTTOU add / remove a worker
+    SIGINT / SIGTERM  stop accepting connections and drain in-flight requests
+"""
+import argparse
+import os
+import sys
+import tempfile
+from typing import Dict
+
+import uvicorn
+
+
+def available_cores() -> int:
+    """Cores this process may run on, honouring CPU affinity (e.g. containers with cpusets)."""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+
+def worker_environment(workers: int, state_dir: str, cores: int) -> Dict[str, str]:
+    """Environment defaults shared by all workers; explicit settings win."""
+    defaults = {
+        # Each worker has its own extraction pool; without this N workers
+        # would each start one process per core.
+        "PDF_WORKERS": str(max(1, cores // workers)),
+    }
+    if workers > 1:
+        defaults["ANALYSIS_CACHE_DB"] = os.path.join(state_dir, "analysis-cache.sqlite3")
+        defaults["SESSION_DB"] = os.path.join(state_dir, "sessions.sqlite3")
+        defaults["EVALUATION_HISTORY_PATH"] = os.path.join(state_dir, "evaluation-history.bin")
+        defaults["JOB_DB"] = os.path.join(state_dir, "jobs.sqlite3")
+    return {name: value for name, value in defaults.items() if not os.environ.get(name)}
+
+
+def main(argv=None) -> int:
+    cores = available_cores()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", cores)),
+                        help="worker processes (default: available cores, or WEB_CONCURRENCY)")
+    parser.add_argument("--state-dir", default=os.environ.get("STATE_DIR", os.path.join(tempfile.gettempdir(), "interviewcoach")),
+                        help="directory for the shared SQLite cache and session files")
+    parser.add_argument("--graceful-timeout", type=float, default=30,
+                        help="seconds a stopping worker may spend draining requests")
+    args = parser.parse_args(argv)
+
+    workers = max(1, args.workers)
+    os.makedirs(args.state_dir, exist_ok=True)
+    env = worker_environment(workers, args.state_dir, cores)
+    os.environ.update(env)
+    for name, value in sorted(env.items()):
+        print(f"{name}={value}")
+
+    # Workers import main:app from this directory whatever the caller's cwd
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        timeout_graceful_shutdown=int(args.graceful_timeout),
+        proxy_headers=True,
+    )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""Server-side interview session storage with TTL eviction."""
+import copy
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+SESSION_TTL_SECONDS = float(os.environ.get("SESSION_TTL_SECONDS", str(2 * 3600)))
+SESSION_MAX_ENTRIES = int(os.environ.get("SESSION_MAX_ENTRIES", "10000"))
+# Path of a SQLite file shared by all workers; unset keeps sessions in memory.
+SESSION_DB = os.environ.get("SESSION_DB") or None
+
+Session = Dict[str, Any]
+
+
+def new_session_id() -> str:
+    return secrets.token_urlsafe(16)
+
+
+class MemorySessionStore:
+    """Sessions in a per-process dict; expiry slides forward on every access.
+
+    Callers get and give copies, as with SQLiteSessionStore, so a session is
+    only ever changed through update() under the lock.
+    """
+
+    def __init__(self, ttl: float = SESSION_TTL_SECONDS, max_entries: int = SESSION_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, session: Session) -> None:
+        with self._lock:
+            self._sessions[session["id"]] = (copy.deepcopy(session), time.time() + self.ttl)
+            while len(self._sessions) > self.max_entries:
+                self._sessions.popitem(last=False)
+
+    def get(self, session_id: str) -> Optional[Session]:
+        with self._lock:
+            return copy.deepcopy(self._touch(session_id))
+
+    def update(self, session_id: str, mutate: Callable[[Session], Any]) -> Any:
+        """Apply ``mutate`` to a session atomically and return its result.
+
+        Raises KeyError when the session does not exist or has expired.
+        """
+        with self._lock:
+            session = self._touch(session_id)
+            if session is None:
+                raise KeyError(session_id)
+            return mutate(session)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _touch(self, session_id: str) -> Optional[Session]:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        session, expires = entry
+        now = time.time()
+        if expires <= now:
+            del self._sessions[session_id]
+            return None
+        self._sessions[session_id] = (session, now + self.ttl)
+        self._sessions.move_to_end(session_id)
+        return session
+
+
+class SQLiteSessionStore:
+    """Sessions in a SQLite file in WAL mode so several workers can share them."""
+
+    # Expired rows are swept once every this many session creations.
+    _SWEEP_INTERVAL = 200
+
+    def __init__(self, path: str, ttl: float = SESSION_TTL_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._created = 0
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL)"
+        )
+
+    def create(self, session: Session) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO sessions (id, data, expires) VALUES (?, ?, ?)",
+                (session["id"], json.dumps(session), time.time() + self.ttl)
+            )
+            self._created += 1
+            if self._created % self._SWEEP_INTERVAL == 0:
+                self._db.execute("DELETE FROM sessions WHERE expires <= ?", (time.time(),))
+
+    def get(self, session_id: str) -> Optional[Session]:
+        with self._lock:
+            now = time.time()
+            row = self._db.execute(
+                "SELECT data FROM sessions WHERE id = ? AND expires > ?", (session_id, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE sessions SET expires = ? WHERE id = ?", (now + self.ttl, session_id))
+            return json.loads(row[0])
+
+    def update(self, session_id: str, mutate: Callable[[Session], Any]) -> Any:
+        """Apply ``mutate`` inside a write transaction and return its result.
+
+        BEGIN IMMEDIATE takes the write lock up front, so concurrent updates
+        from other workers are serialized instead of overwriting each other.
+        Raises KeyError when the session does not exist or has expired.
+        """
+        with self._lock:
+            now = time.time()
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT data FROM sessions WHERE id = ? AND expires > ?", (session_id, now)
+                ).fetchone()
+                if row is None:
+                    raise KeyError(session_id)
+                session = json.loads(row[0])
+                result = mutate(session)
+                self._db.execute(
+                    "UPDATE sessions SET data = ?, expires = ? WHERE id = ?",
+                    (json.dumps(session), now + self.ttl, session_id)
+                )
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            return result
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+
+def create_session_store():
+    """Build the store selected by SESSION_DB."""
+    if SESSION_DB:
+        return SQLiteSessionStore(SESSION_DB)
+    return MemorySessionStore()
+
+
+session_store = create_session_store()
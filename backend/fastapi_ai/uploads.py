@@ -0,0 +1,146 @@
+"""Bounded, streaming handling of resume uploads."""
+import asyncio
+import os
+import zipfile
+from typing import AsyncIterator, Awaitable, Callable, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+from extraction import sniff_file_type
+
+
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Allowance for multipart boundaries and part headers around the file itself.
+MULTIPART_OVERHEAD_BYTES = 16 * 1024
+
+MAX_BULK_UPLOAD_BYTES = int(os.environ.get("MAX_BULK_UPLOAD_BYTES", str(200 * 1024 * 1024)))
+BULK_MAX_FILES = int(os.environ.get("BULK_MAX_FILES", "500"))
+ZIP_MAGIC = b"PK\x03\x04"
+
+# A zero-argument coroutine function returning (content, kind) like read_upload().
+UploadLoader = Callable[[], Awaitable[Tuple[bytes, str]]]
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large (limit {MAX_UPLOAD_BYTES} bytes)"
+    )
+
+
+async def read_upload(file: UploadFile, limit: Optional[int] = None) -> Tuple[bytes, str]:
+    """Read an upload in chunks, sniffing its type before the rest is read.
+
+    Returns the raw bytes and the detected type ("pdf" or "txt"). Raises 400
+    for unsupported content and 413 as soon as ``limit`` (default
+    ``MAX_UPLOAD_BYTES``) is exceeded. The bytes are the bytearray they were
+    read into, not a copy, so an upload at the limit is held once.
+    """
+    limit = MAX_UPLOAD_BYTES if limit is None else limit
+    head = await file.read(UPLOAD_CHUNK_SIZE)
+    kind = sniff_file_type(head)
+    if kind is None:
+        raise HTTPException(status_code=400, detail="Only PDF and TXT files are supported")
+
+    # One growing buffer rather than a list of chunks joined at the end; it is
+    # returned as is, since hashing, decoding and pickling to the PDF pool all
+    # take a bytearray as they take bytes
+    buffer = bytearray(head)
+    while True:
+        if len(buffer) > limit:
+            raise _too_large()
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer += chunk
+    return buffer, kind
+
+
+def _zip_loader(archive: zipfile.ZipFile, info: zipfile.ZipInfo) -> UploadLoader:
+    async def load() -> Tuple[bytes, str]:
+        # The declared size is checked before decompressing anything.
+        if info.file_size > MAX_UPLOAD_BYTES:
+            raise _too_large()
+        # Inflating a member is CPU-bound; keep it off the event loop
+        content = await asyncio.to_thread(archive.read, info)
+        kind = sniff_file_type(content[:UPLOAD_CHUNK_SIZE])
+        if kind is None:
+            raise HTTPException(status_code=400, detail="Only PDF and TXT files are supported")
+        return content, kind
+    return load
+
+
+async def iter_upload_sources(files: List[UploadFile]) -> AsyncIterator[Tuple[str, UploadLoader]]:
+    """Yield (filename, loader) for every resume in a bulk upload.
+
+    Zip archives are expanded into their members; other parts go through
+    read_upload(). Loaders are lazy so only files being processed are held
+    in memory. Stops with a 400 after ``BULK_MAX_FILES`` resumes.
+    """
+    count = 0
+    for file in files:
+        head = await file.read(len(ZIP_MAGIC))
+        await file.seek(0)
+        if head == ZIP_MAGIC:
+            try:
+                archive = zipfile.ZipFile(file.file)
+            except zipfile.BadZipFile:
+                raise HTTPException(status_code=400, detail=f"{file.filename}: invalid zip archive")
+            members = [(info.filename, _zip_loader(archive, info)) for info in archive.infolist() if not info.is_dir()]
+        else:
+            members = [(file.filename or "", lambda file=file: read_upload(file))]
+
+        for name, loader in members:
+            count += 1
+            if count > BULK_MAX_FILES:
+                raise HTTPException(status_code=400, detail=f"Too many files (limit {BULK_MAX_FILES})")
+            yield name, loader
+
+
+class UploadLimitMiddleware:
+    """Reject oversized upload bodies before they are buffered or spooled.
+
+    Requests announcing a too-large Content-Length get a 413 without their
+    body being read; chunked bodies are counted as they arrive and cut off
+    once they pass the limit.
+    """
+
+    def __init__(self, app, paths: Iterable[str], max_body: int = MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.max_body = max_body
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None:
+            try:
+                declared = int(content_length)
+            except ValueError:
+                declared = -1
+            if declared < 0:
+                response = JSONResponse(status_code=400, content={"detail": "Invalid Content-Length header"})
+                await response(scope, receive, send)
+                return
+            if declared > self.max_body:
+                response = JSONResponse(status_code=413, content={"detail": _too_large().detail})
+                await response(scope, receive, send)
+                return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body:
+                    raise _too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
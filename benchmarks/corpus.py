@@ -0,0 +1,132 @@
+"""Deterministic synthetic resumes and interview answers for benchmarks.
+
+Everything is derived from an integer seed, so a given (seed, size) always
+yields byte-identical documents and benchmark runs stay comparable.
+"""
+import random
+import sys
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend" / "fastapi_ai"))
+
+from analysis import ADVANCED_SKILLS, SENIOR_KEYWORDS, SKILL_KEYWORDS
+from scoring import COLLABORATION_KEYWORDS, STAR_KEYWORDS
+
+
+LINES_PER_PAGE = 45
+
+FILLER_WORDS = (
+    "built designed maintained owned shipped migrated reviewed planned scaled tuned "
+    "service platform pipeline feature customer release system module workflow dashboard "
+    "reliable internal external weekly quarterly cross-functional production legacy new "
+    "with for across using into over the a of and to in on"
+).split()
+
+TITLES = ["Software Engineer", "Data Scientist", "Backend Developer", "Frontend Developer", "DevOps Engineer"]
+
+SKILL_WORDS = sorted({kw for keywords in SKILL_KEYWORDS.values() for kw in keywords})
+LEVEL_WORDS = sorted(set(SENIOR_KEYWORDS) | set(ADVANCED_SKILLS))
+ANSWER_WORDS = sorted({kw for keywords in STAR_KEYWORDS.values() for kw in keywords} | set(COLLABORATION_KEYWORDS))
+METRIC_PHRASES = ["by 40%", "3x faster", "improved", "decreased", "increased 25%"]
+
+
+def _sentence(rng: random.Random, length: int, special: List[str], ratio: float) -> str:
+    words = [rng.choice(special) if rng.random() < ratio else rng.choice(FILLER_WORDS) for _ in range(length)]
+    return " ".join(words).capitalize() + "."
+
+
+def resume_pages(seed: int, pages: int) -> List[List[str]]:
+    """Return a resume as pages of text lines."""
+    rng = random.Random(f"resume-{seed}-{pages}")
+    header = [
+        f"Candidate {seed}",
+        f"{rng.choice(['Senior', 'Lead', '', ''])} {rng.choice(TITLES)}".strip(),
+        f"{rng.randint(1, 15)}+ years experience",
+        "Skills: " + ", ".join(rng.sample(SKILL_WORDS, 6)),
+    ]
+    result = []
+    for page in range(pages):
+        lines = list(header) if page == 0 else []
+        while len(lines) < LINES_PER_PAGE:
+            special = LEVEL_WORDS if rng.random() < 0.1 else SKILL_WORDS
+            lines.append(_sentence(rng, rng.randint(8, 16), special, 0.15))
+        result.append(lines)
+    return result
+
+
+def resume_text(seed: int, pages: int) -> str:
+    return "\n".join(line for page in resume_pages(seed, pages) for line in page)
+
+
+def answer_text(seed: int, words: int) -> str:
+    """Return an interview answer of roughly ``words`` words."""
+    rng = random.Random(f"answer-{seed}-{words}")
+    sentences = []
+    count = 0
+    while count < words:
+        length = min(rng.randint(8, 18), words - count)
+        sentence = _sentence(rng, length, ANSWER_WORDS, 0.12)
+        if rng.random() < 0.2:
+            sentence = sentence[:-1] + " " + rng.choice(METRIC_PHRASES) + "."
+        sentences.append(sentence)
+        count += length
+    return " ".join(sentences)
+
+
+def _pdf_escape(line: str) -> bytes:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)").encode("latin-1", "replace")
+
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """Build a valid text PDF with one content stream per page."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b"",
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        ops = [b"BT /F1 10 Tf 12 TL 50 760 Td"]
+        ops += [b"(" + _pdf_escape(line) + b") Tj T*" for line in lines]
+        ops.append(b"ET")
+        stream = b"\n".join(ops)
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(kids) + b"] /Count %d >>" % len(pages)
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return out
+
+
+def resume_pdf(seed: int, pages: int) -> bytes:
+    return make_pdf(resume_pages(seed, pages))
+
+
+def question_bank(seed: int, size: int) -> List[dict]:
+    """Return ``size`` tagged question-bank entries in the data/questions.json format."""
+    rng = random.Random(f"bank-{seed}-{size}")
+    skills = sorted(SKILL_KEYWORDS)
+    roles = [title.lower() for title in TITLES]
+    levels = ["junior", "mid", "senior"]
+    entries = []
+    for i in range(size):
+        category = rng.choice(["behavioral", "skill", "skill", "level", "role"])
+        entry = {"question": f"Q{i}: " + _sentence(rng, rng.randint(6, 14), SKILL_WORDS, 0.2), "category": category}
+        if category == "skill" or rng.random() < 0.2:
+            entry["skills"] = rng.sample(skills, rng.randint(1, 2))
+        if category == "role" or rng.random() < 0.2:
+            entry["roles"] = [rng.choice(roles)]
+        if category == "level" or rng.random() < 0.2:
+            entry["levels"] = [rng.choice(levels)]
+        if rng.random() < 0.3:
+            entry["weight"] = round(rng.uniform(0.5, 2.0), 2)
+        entries.append(entry)
+    return entries
@@ -0,0 +1,199 @@
+"""Micro-benchmarks for the analysis, scoring, question and extraction paths.
+
+Usage:
+    python benchmarks/run_benchmarks.py                  # run and compare with the baseline
+    python benchmarks/run_benchmarks.py --save-baseline  # record this machine's baseline
+    python benchmarks/run_benchmarks.py --filter pdf --quick
+
+Exits with status 1 when any benchmark's p50 latency is slower than its
+baseline by more than --threshold. Baselines are machine-specific, so record
+one on the machine that will run the comparison.
+"""
+import argparse
+import json
+import math
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import corpus  # also puts backend/fastapi_ai on sys.path
+
+from analysis import analyze_text
+from extraction import extract_pdf_fast, extract_pdf_text
+from questions import QuestionBank, select_questions
+from scoring import prepare_skills, score_answer, score_answers
+
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+RESUME_PAGES = (1, 5, 20)
+ANSWER_WORDS = (20, 80, 300)
+QUESTION = "Tell me about a time you solved a difficult problem."
+BATCH_SIZE = 50
+LARGE_BANK_SIZE = 30000
+
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_samples) - 1, math.ceil(pct / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+def measure(fn: Callable[[int], object], min_time: float, min_iterations: int) -> Dict[str, float]:
+    """Call ``fn(i)`` until both budgets are spent; return throughput and latency percentiles."""
+    fn(-1)  # warm up imports, caches and the process pool
+    samples = []
+    started = time.perf_counter()
+    i = 0
+    while i < min_iterations or time.perf_counter() - started < min_time:
+        t0 = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - t0)
+        i += 1
+    samples.sort()
+    total = sum(samples)
+    return {
+        "iterations": len(samples),
+        "ops_per_sec": round(len(samples) / total, 2),
+        "p50_ms": round(percentile(samples, 50) * 1000, 4),
+        "p95_ms": round(percentile(samples, 95) * 1000, 4),
+        "p99_ms": round(percentile(samples, 99) * 1000, 4),
+    }
+
+
+# ============================================================================
+# BENCHMARKS
+# ============================================================================
+
+def function_benchmarks() -> Dict[str, Callable[[int], object]]:
+    benches: Dict[str, Callable[[int], object]] = {}
+    skills = prepare_skills(["python", "sql", "docker", "kubernetes"])
+
+    for pages in RESUME_PAGES:
+        text = corpus.resume_text(seed=pages, pages=pages)
+        benches[f"func.analyze_text.{pages}p"] = lambda i, text=text: analyze_text(text)
+
+        pdf = corpus.resume_pdf(seed=pages, pages=pages)
+        benches[f"func.extract_pdf_text.{pages}p"] = lambda i, pdf=pdf, pages=pages: extract_pdf_text(pdf, max_pages=pages)
+        benches[f"func.extract_pdf_stream.{pages}p"] = lambda i, pdf=pdf, pages=pages: extract_pdf_fast("stream", pdf, pages)
+
+    for words in ANSWER_WORDS:
+        answer = corpus.answer_text(seed=words, words=words)
+        benches[f"func.score_answer.{words}w"] = lambda i, answer=answer: score_answer(answer, skills, QUESTION)
+
+    answers = [corpus.answer_text(seed=i, words=120) for i in range(BATCH_SIZE)]
+    benches[f"func.score_answers.{BATCH_SIZE}x120w"] = lambda i: score_answers(answers, [QUESTION] * BATCH_SIZE, skills)
+
+    # Bypass the memoization so the selection itself is measured
+    uncached = select_questions.__wrapped__
+    benches["func.select_questions"] = lambda i: uncached(("docker", "python", "sql"), "mid", "backend developer", i)
+
+    large_bank = QuestionBank(corpus.question_bank(seed=1, size=LARGE_BANK_SIZE))
+    tags = ["role:backend developer", "skill:python", "skill:sql", "level:mid"]
+    benches[f"func.question_bank_top_k.{LARGE_BANK_SIZE // 1000}k"] = lambda i: large_bank.top_k("skill", "skill:python", tags, 5)
+    return benches
+
+
+def endpoint_benchmarks() -> Dict[str, Callable[[int], object]]:
+    from fastapi.testclient import TestClient
+    from main import app
+
+    client = TestClient(app)
+    benches: Dict[str, Callable[[int], object]] = {}
+
+    def checked(response):
+        if response.status_code != 200:
+            raise RuntimeError(f"{response.request.url}: HTTP {response.status_code} {response.text[:200]}")
+        return response
+
+    # Each iteration varies its payload so the analysis cache never answers
+    text = corpus.resume_text(seed=5, pages=5)
+    benches["http.analyze_resume.5p"] = lambda i: checked(
+        client.post("/analyze-resume", json={"text": f"{text}\n#{i}"}))
+
+    pdf = corpus.resume_pdf(seed=5, pages=5)
+    benches["http.upload_resume.pdf.5p"] = lambda i: checked(
+        client.post("/upload-resume", files={"file": ("r.pdf", pdf + b"%% %d\n" % i, "application/pdf")}))
+
+    answer = corpus.answer_text(seed=80, words=80)
+    benches["http.evaluate_answer.80w"] = lambda i: checked(client.post("/evaluate-answer", json={
+        "question": "Tell me about a time you improved performance.",
+        "answer": answer, "resume_skills": ["python", "sql"], "role": "software engineer"}))
+
+    benches["http.generate_questions"] = lambda i: checked(client.post("/generate-questions", json={
+        "skills": ["python", "sql", "docker"], "experience_level": "mid", "role": "backend developer", "seed": i}))
+    return benches
+
+
+# ============================================================================
+# BASELINES
+# ============================================================================
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """Return a message per benchmark whose p50 regressed past ``threshold``."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        ratio = result["p50_ms"] / base["p50_ms"] if base["p50_ms"] else 1.0
+        if ratio > 1 + threshold:
+            regressions.append(f"{name}: p50 {result['p50_ms']}ms vs baseline {base['p50_ms']}ms ({ratio:.2f}x)")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed p50 slowdown ratio (0.25 = 25%%)")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="shorter runs for smoke testing")
+    parser.add_argument("--skip-http", action="store_true", help="only run function-level benchmarks")
+    parser.add_argument("--output", type=Path, help="also write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    min_time, min_iterations = (0.05, 5) if args.quick else (0.5, 30)
+    benches = function_benchmarks()
+    if not args.skip_http:
+        benches.update(endpoint_benchmarks())
+
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"{'benchmark':<32} {'ops/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for name, fn in benches.items():
+        if args.filter not in name:
+            continue
+        result = results[name] = measure(fn, min_time, min_iterations)
+        print(f"{name:<32} {result['ops_per_sec']:>10} {result['p50_ms']:>10} {result['p95_ms']:>10} {result['p99_ms']:>10}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, sort_keys=True))
+
+    if args.save_baseline:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True))
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline first")
+        return 0
+
+    regressions = compare(results, json.loads(args.baseline.read_text()), args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) past {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\nNo regressions past {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Measure backend cold-start cost.
+
+Each run starts a fresh interpreter and times, in order: third-party
+framework imports, the service's own modules, importing ``main`` (which
+builds the app and registers routes), the first request, and the first
+and second in-process PDF extraction. It also reports whether the PDF
+stack was loaded before any PDF was seen.
+
+Usage:
+    python scripts/measure_startup.py            # median of 5 runs
+    python scripts/measure_startup.py --runs 11 --json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).parent.parent / 'backend' / 'fastapi_ai'
+BENCHMARKS = Path(__file__).parent.parent / 'benchmarks'
+
+PHASES = ['framework_imports', 'service_modules', 'main_and_app', 'first_request', 'first_pdf', 'second_pdf']
+
+PROBE = r'''
+import json, sys, time
+sys.path[:0] = [{backend!r}, {benchmarks!r}]
+t0 = time.perf_counter()
+import fastapi, pydantic, starlette
+t1 = time.perf_counter()
+import analysis, cache, extraction, metrics, questions, scoring, sessions, uploads
+t2 = time.perf_counter()
+import main
+t3 = time.perf_counter()
+pdf_loaded = "pdfplumber" in sys.modules
+from fastapi.testclient import TestClient
+client = TestClient(main.app)
+t4 = time.perf_counter()
+client.get("/health")
+t5 = time.perf_counter()
+import corpus
+pdf = corpus.resume_pdf(1, 1)
+t6 = time.perf_counter()
+extraction.extract_pdf_pages(pdf)
+t7 = time.perf_counter()
+extraction.extract_pdf_pages(pdf)
+t8 = time.perf_counter()
+print(json.dumps({{
+    "framework_imports": t1 - t0, "service_modules": t2 - t1, "main_and_app": t3 - t2,
+    "first_request": t5 - t4, "first_pdf": t7 - t6, "second_pdf": t8 - t7,
+    "pdf_stack_loaded_at_import": pdf_loaded,
+}}))
+'''
+
+
+def run_once() -> dict:
+    code = PROBE.format(backend=str(BACKEND), benchmarks=str(BENCHMARKS))
+    # PDF_WARMUP=0 so no background task skews the foreground timings
+    env = {'PDF_WARMUP': '0', 'ANALYSIS_CACHE_DB': '', 'SESSION_DB': ''}
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                         env={**os.environ, **env}, cwd=str(BACKEND))
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters to start')
+    parser.add_argument('--json', action='store_true', help='print the medians as JSON')
+    args = parser.parse_args(argv)
+
+    runs = [run_once() for _ in range(max(1, args.runs))]
+    medians = {phase: statistics.median(run[phase] for run in runs) * 1000 for phase in PHASES}
+    loaded = any(run['pdf_stack_loaded_at_import'] for run in runs)
+
+    if args.json:
+        print(json.dumps({'median_ms': medians, 'pdf_stack_loaded_at_import': loaded}, indent=2))
+        return 0
+
+    print(f"Median of {len(runs)} cold starts:")
+    for phase in PHASES:
+        print(f"  {phase:<20} {medians[phase]:>9.1f} ms")
+    startup = medians['framework_imports'] + medians['service_modules'] + medians['main_and_app']
+    print(f"  {'import to app ready':<20} {startup:>9.1f} ms")
+    print(f"  pdfplumber loaded at import: {'yes' if loaded else 'no'}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
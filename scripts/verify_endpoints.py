@@ -1,5 +1,37 @@
+"""Verify the API endpoints, or load-test them.
+
+Usage:
+    python scripts/verify_endpoints.py                       # one pass over every endpoint
+    python scripts/verify_endpoints.py --load --concurrency 32 --duration 30
+    python scripts/verify_endpoints.py --load --rate 50 --mix text=5,pdf=3,session=2
+
+Load mode replays the analyze -> generate -> evaluate flow from many
+asyncio tasks against a running uvicorn and reports throughput,
+p50/p95/p99 latency and error rates per endpoint.
+
+Without --rate the test is closed loop: --concurrency workers each start
+their next flow when the last one ends, so a slow server also slows the
+offered load. With --rate it is open loop: flows start on a fixed schedule
+however many are still running, and each flow's latency is also reported
+from its scheduled start ("flow <scenario>" rows), so time spent queued
+behind a slow server counts instead of being omitted.
+"""
+import argparse
+import asyncio
+import itertools
 import json
+import random
+import sys
+import time
 import urllib.request
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'benchmarks'))
+
+import corpus  # also puts backend/fastapi_ai on sys.path
+from run_benchmarks import percentile
 
 BASE = 'http://localhost:8000'
 
@@ -10,7 +42,7 @@ def post(path, payload):
     with urllib.request.urlopen(req, timeout=5) as r:
         return r.status, r.read().decode()
 
-if __name__ == '__main__':
+def verify():
     try:
         s, h = post('/health', {})
     except Exception:
@@ -30,3 +62,211 @@ if __name__ == '__main__':
     eval_req = {'question':'Tell me about a time','answer':'I fixed a bug and improved latency by 40%','resume_skills':['python'],'role':'software engineer'}
     print('\nPOST /evaluate-answer')
     print(post('/evaluate-answer', eval_req))
+
+
+# ============================================================================
+# LOAD TEST
+# ============================================================================
+
+ROLES = ['software engineer', 'data scientist', 'backend developer', 'frontend developer', 'devops engineer']
+
+
+class LoadStats:
+    """Latency samples and error counts per endpoint."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.flows = 0
+        self.failed_flows = 0
+
+    def record(self, name: str, seconds: float, ok: bool) -> None:
+        self.latencies[name].append(seconds)
+        if not ok:
+            self.errors[name] += 1
+
+    def report(self, elapsed: float) -> str:
+        lines = [
+            f"{'endpoint':<28} {'requests':>9} {'req/s':>9} {'errors':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+        ]
+        for name in sorted(self.latencies):
+            samples = sorted(self.latencies[name])
+            count = len(samples)
+            lines.append(
+                f"{name:<28} {count:>9} {count / elapsed:>9.1f} {self.errors[name] / count:>8.1%} "
+                f"{percentile(samples, 50) * 1000:>9.1f} {percentile(samples, 95) * 1000:>9.1f} "
+                f"{percentile(samples, 99) * 1000:>9.1f}"
+            )
+        lines.append(
+            f"\n{self.flows} flows in {elapsed:.1f}s ({self.flows / elapsed:.1f} flows/s), "
+            f"{self.failed_flows} failed"
+        )
+        return "\n".join(lines)
+
+
+class LoadClient:
+    """Runs one scenario at a time against the API, timing every request."""
+
+    def __init__(self, http, stats: LoadStats, unique: bool):
+        self.http = http
+        self.stats = stats
+        self.unique = unique
+        self.counter = itertools.count()
+
+    async def call(self, name: str, method: str, path: str, **kwargs):
+        start = time.perf_counter()
+        ok = False
+        try:
+            response = await self.http.request(method, path, **kwargs)
+            ok = response.status_code < 400
+            return response if ok else None
+        except Exception:
+            return None
+        finally:
+            self.stats.record(name, time.perf_counter() - start, ok)
+
+    def resume(self, rng: random.Random) -> str:
+        text = corpus.resume_text(seed=rng.randint(0, 50), pages=rng.choice([1, 1, 2, 5]))
+        # A unique suffix defeats the analysis cache so every request does real work
+        return f"{text}\n#{next(self.counter)}" if self.unique else text
+
+    def resume_pdf(self, rng: random.Random) -> bytes:
+        pdf = corpus.resume_pdf(seed=rng.randint(0, 20), pages=rng.choice([1, 2, 5]))
+        return pdf + b"%% %d\n" % next(self.counter) if self.unique else pdf
+
+    async def analyze(self, rng):
+        response = await self.call('POST /analyze-resume', 'POST', '/analyze-resume', json={'text': self.resume(rng)})
+        return response.json() if response else None
+
+    async def upload(self, rng):
+        files = {'file': ('resume.pdf', self.resume_pdf(rng), 'application/pdf')}
+        response = await self.call('POST /upload-resume', 'POST', '/upload-resume', files=files)
+        return response.json() if response else None
+
+    async def generate_and_evaluate(self, rng, analysis) -> bool:
+        role = rng.choice(ROLES)
+        questions = await self.call('POST /generate-questions', 'POST', '/generate-questions', json={
+            'skills': analysis['skills'], 'experience_level': analysis['experience_level'], 'role': role})
+        if questions is None:
+            return False
+        for question in questions.json()['questions'][:rng.randint(1, 3)]:
+            evaluated = await self.call('POST /evaluate-answer', 'POST', '/evaluate-answer', json={
+                'question': question['question'],
+                'answer': corpus.answer_text(seed=rng.randint(0, 100), words=rng.choice([20, 80, 200])),
+                'resume_skills': analysis['skills'], 'role': role})
+            if evaluated is None:
+                return False
+        return True
+
+    async def flow_text(self, rng) -> bool:
+        analysis = await self.analyze(rng)
+        return analysis is not None and await self.generate_and_evaluate(rng, analysis)
+
+    async def flow_pdf(self, rng) -> bool:
+        analysis = await self.upload(rng)
+        return analysis is not None and await self.generate_and_evaluate(rng, analysis)
+
+    async def flow_session(self, rng) -> bool:
+        analysis = await self.analyze(rng)
+        if analysis is None:
+            return False
+        created = await self.call('POST /sessions', 'POST', '/sessions', json={
+            'skills': analysis['skills'], 'experience_level': analysis['experience_level'],
+            'role': rng.choice(ROLES)})
+        if created is None:
+            return False
+        session = created.json()
+        for question in session['questions'][:rng.randint(1, 3)]:
+            answered = await self.call('POST /sessions/{id}/answers', 'POST', f"/sessions/{session['session_id']}/answers", json={
+                'question_id': question['id'],
+                'answer': corpus.answer_text(seed=rng.randint(0, 100), words=rng.choice([20, 80, 200]))})
+            if answered is None:
+                return False
+        return True
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse 'text=6,pdf=2,session=2' into scenario weights."""
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in ('text', 'pdf', 'session'):
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}; use text, pdf or session")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+async def run_load(args) -> LoadStats:
+    import httpx
+
+    stats = LoadStats()
+    names, weights = zip(*args.mix.items())
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base, timeout=args.timeout, limits=limits) as http:
+        client = LoadClient(http, stats, args.unique_payloads)
+        deadline = time.perf_counter() + args.duration
+
+        async def one_flow(rng, scheduled: Optional[float] = None):
+            scenario = rng.choices(names, weights)[0]
+            ok = await getattr(client, f"flow_{scenario}")(rng)
+            stats.flows += 1
+            stats.failed_flows += 0 if ok else 1
+            if scheduled is not None:
+                stats.record(f"flow {scenario}", time.perf_counter() - scheduled, ok)
+
+        if args.rate > 0:
+            # Open loop: start flows on a fixed schedule whatever the latency, with no cap on
+            # flows in flight; requests beyond --concurrency connections wait for one inside
+            # httpx, which the timings include
+            rng = random.Random(args.seed)
+            tasks = set()
+            next_start = time.perf_counter()
+            while next_start < deadline:
+                await asyncio.sleep(max(0.0, next_start - time.perf_counter()))
+                task = asyncio.create_task(one_flow(random.Random(rng.random()), next_start))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                next_start += 1.0 / args.rate
+            if tasks:
+                await asyncio.wait(tasks)
+        else:
+            # Closed loop: each worker starts its next flow when the last one ends
+            async def worker(worker_id):
+                rng = random.Random(f"{args.seed}-{worker_id}")
+                while time.perf_counter() < deadline:
+                    await one_flow(rng)
+            await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+    return stats
+
+
+def main(argv=None) -> int:
+    global BASE
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base', default=BASE, help='API base URL')
+    parser.add_argument('--load', action='store_true', help='run the load test instead of a single verification pass')
+    parser.add_argument('--concurrency', type=int, default=16, help='flows in flight (closed loop) or HTTP connections (with --rate)')
+    parser.add_argument('--rate', type=float, default=0, help='flows started per second (0 = as fast as concurrency allows)')
+    parser.add_argument('--duration', type=float, default=20, help='seconds to keep starting flows')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('text=6,pdf=2,session=2'),
+                        help='scenario weights, e.g. text=6,pdf=2,session=2')
+    parser.add_argument('--timeout', type=float, default=30, help='per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=0, help='seed for payload selection')
+    parser.add_argument('--unique-payloads', action=argparse.BooleanOptionalAction, default=True,
+                        help='vary every resume so the server-side analysis cache cannot answer')
+    args = parser.parse_args(argv)
+    BASE = args.base.rstrip('/')
+
+    if not args.load:
+        verify()
+        return 0
+
+    print(f"Load test against {BASE}: concurrency={args.concurrency} rate={args.rate or 'max'} "
+          f"duration={args.duration}s mix={args.mix}")
+    start = time.perf_counter()
+    stats = asyncio.run(run_load(args))
+    print(stats.report(time.perf_counter() - start))
+    return 1 if stats.failed_flows else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+import corpus
+from run_benchmarks import compare, percentile
+
+
+def test_corpus_is_deterministic():
+    """Same seed and size always produce the same documents."""
+    assert corpus.resume_text(3, 2) == corpus.resume_text(3, 2)
+    assert corpus.resume_pdf(3, 2) == corpus.resume_pdf(3, 2)
+    assert corpus.answer_text(3, 80) == corpus.answer_text(3, 80)
+    assert corpus.resume_text(3, 2) != corpus.resume_text(4, 2)
+    assert len(corpus.answer_text(1, 120).split()) >= 120
+
+
+def test_corpus_pdf_pages_extract():
+    """Generated PDFs parse, one page per requested page."""
+    from extraction import extract_pdf_pages
+
+    text, pages = extract_pdf_pages(corpus.resume_pdf(1, 3))
+    assert pages == 3
+    assert text.startswith("Candidate 1")
+
+
+def test_compare_flags_regressions_past_threshold():
+    """Only p50 slowdowns beyond the threshold are reported."""
+    baseline = {"a": {"p50_ms": 1.0}, "b": {"p50_ms": 1.0}}
+    results = {"a": {"p50_ms": 1.2}, "b": {"p50_ms": 1.5}, "new": {"p50_ms": 9.0}}
+    regressions = compare(results, baseline, threshold=0.25)
+    assert len(regressions) == 1 and regressions[0].startswith("b:")
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0
+
+
+def test_load_mix_parsing():
+    """Scenario weights parse and unknown scenarios are rejected."""
+    import argparse
+    import pytest
+
+    sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+    from verify_endpoints import parse_mix
+
+    assert parse_mix("text=6,pdf=2,session") == {"text": 6.0, "pdf": 2.0, "session": 1.0}
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix("upload=1")
@@ -85,6 +85,707 @@ def test_analyze_resume_no_skills():
     assert data["skills"] == []  # Empty skills list
 
 
+def test_analyze_resume_word_boundaries():
+    """Test short keywords only match whole words ("js" is not in "json")."""
+    response = client.post(
+        "/analyze-resume",
+        json={"text": "Wrote JSON parsers and shell-free tooling in Rust."}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert "javascript" not in data["skills"]
+    assert data["skills"] == ["linux", "api"]
+
+
+def test_keyword_matcher_nested_keywords():
+    """Test multi-word keywords also report groups of the words inside them."""
+    from analysis import KeywordMatcher
+
+    matcher = KeywordMatcher({"git": ["git", "github"], "ci/cd": ["github actions"]})
+    assert matcher.find("ci with github actions") == {"git", "ci/cd"}
+    assert matcher.find("gitops and githubber") == set()
+
+
+def test_analyze_resume_keeps_baseline_detections():
+    """Test plurals, version suffixes and word stems are found as the substring scan found them."""
+    from analysis import analyze_text
+
+    assert analyze_text("Wrote python3 services")[0] == ["python"]
+    assert analyze_text("Ran containers behind internal APIs")[0] == ["docker", "api"]
+    assert analyze_text("Showed leadership")[1] == "mid"
+    # Senior and advanced through "architected" / "architecture", as the substring scan scored it
+    assert analyze_text("Architected the platform architecture over 5 years")[1] == "senior"
+    assert analyze_text("Senior engineer who architected distributed systems")[1] == "senior"
+
+
+# ============================================================================
+# RESUME UPLOAD TESTS
+# ============================================================================
+
+def make_pdf(pages):
+    """Build a minimal PDF with one text line per page."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = b"BT /F1 12 Tf 72 720 Td (" + text.encode("latin-1") + b") Tj ET"
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects)))
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(kids) + b"] /Count %d >>" % len(pages)
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return out
+
+
+def test_upload_resume_pdf():
+    """Test PDF upload is parsed and analyzed."""
+    pdf = make_pdf(["Senior engineer, 8 years", "Python Docker Kubernetes"])
+    response = client.post("/upload-resume", files={"file": ("resume.pdf", pdf, "application/pdf")})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["skills"] == ["python", "docker"]
+    assert data["experience_level"] == "senior"
+
+
+def test_upload_resume_txt():
+    """Test plain text upload."""
+    response = client.post(
+        "/upload-resume",
+        files={"file": ("resume.txt", b"Junior developer. SQL and Git.", "text/plain")}
+    )
+    assert response.status_code == 200
+    assert response.json()["skills"] == ["sql", "git"]
+
+
+def test_upload_resume_corrupted_pdf():
+    """Test unreadable PDFs are rejected with 400."""
+    response = client.post(
+        "/upload-resume",
+        files={"file": ("resume.pdf", b"%PDF-1.4 garbage", "application/pdf")}
+    )
+    assert response.status_code == 400
+
+
+def test_upload_resume_rejects_binary_by_content():
+    """Test file type is sniffed from content, not trusted from the suffix."""
+    response = client.post(
+        "/upload-resume",
+        files={"file": ("resume.txt", b"PK\x03\x04\x14\x00\x00\x00docx", "text/plain")}
+    )
+    assert response.status_code == 400
+    assert "PDF and TXT" in response.json()["detail"]
+
+
+def test_read_upload_returns_its_buffer_uncopied():
+    """Test the upload is handed on in the buffer it was read into, and still extracts."""
+    import asyncio
+    import io
+    import extraction
+    from fastapi import UploadFile
+    from uploads import read_upload
+
+    pdf = make_pdf(["Buffered resume: Python"])
+    content, kind = asyncio.run(read_upload(UploadFile(io.BytesIO(pdf))))
+    assert isinstance(content, bytearray) and content == pdf and kind == "pdf"
+    try:
+        assert "Buffered resume" in asyncio.run(extraction.extract_pdf_text_async(content))
+    finally:
+        extraction.shutdown_executor()
+
+
+def test_upload_resume_too_large(monkeypatch):
+    """Test uploads over the byte limit are rejected with 413."""
+    import uploads
+
+    monkeypatch.setattr(uploads, "MAX_UPLOAD_BYTES", 100 * 1024)
+    response = client.post(
+        "/upload-resume",
+        files={"file": ("resume.txt", b"python " * 30000, "text/plain")}
+    )
+    assert response.status_code == 413
+
+
+def test_upload_limit_middleware_checks_content_length():
+    """Test oversized bodies are refused from the Content-Length header alone."""
+    response = client.post(
+        "/upload-resume",
+        content=b"x" * 64,
+        headers={"Content-Type": "multipart/form-data; boundary=x", "Content-Length": str(10 ** 9)}
+    )
+    assert response.status_code == 413
+
+
+def test_upload_limit_middleware_rejects_malformed_content_length():
+    """Test a Content-Length that is not a non-negative integer is a 400, not a server error."""
+    for value in ("ten", "-5"):
+        response = client.post(
+            "/upload-resume",
+            content=b"x" * 64,
+            headers={"Content-Type": "multipart/form-data; boundary=x", "Content-Length": value}
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid Content-Length header"
+
+
+def test_extract_pdf_text_page_cap():
+    """Test extraction stops at the page cap."""
+    from extraction import extract_pdf_text
+
+    pdf = make_pdf(["first page", "second page", "third page"])
+    text = extract_pdf_text(pdf, max_pages=2)
+    assert "second page" in text
+    assert "third page" not in text
+
+
+@pytest.mark.parametrize("known_length", [True, False])
+def test_extract_pdf_page_ranges_match_serial(monkeypatch, known_length):
+    """Test range-parallel extraction joins pages in order, with or without a visible page count."""
+    import asyncio
+    import extraction
+
+    pdf = make_pdf([f"page {i}" for i in range(5)])
+    monkeypatch.setattr(extraction, "PDF_PAGES_PER_TASK", 2)
+    if not known_length:
+        monkeypatch.setattr(extraction, "estimate_page_count", lambda content: None)
+    try:
+        text = asyncio.run(extraction.extract_pdf_text_async(pdf))
+    finally:
+        extraction.shutdown_executor()
+    assert text == extraction.extract_pdf_text(pdf)
+    assert text.splitlines() == [f"page {i}" for i in range(5)]
+
+
+def test_extract_pdf_unknown_length_respects_page_cap(monkeypatch):
+    """Test the first range of a PDF with a hidden page count stops at PDF_MAX_PAGES."""
+    import asyncio
+    import extraction
+
+    monkeypatch.setattr(extraction, "PDF_FAST_TIERS", [])
+    monkeypatch.setattr(extraction, "PDF_MAX_PAGES", 2)
+    monkeypatch.setattr(extraction, "PDF_PAGES_PER_TASK", 4)
+    pdf = make_pdf([f"page {i}" for i in range(5)])
+    try:
+        monkeypatch.setattr(extraction, "estimate_page_count", lambda content: None)
+        assert asyncio.run(extraction.extract_pdf_text_async(pdf)).splitlines() == ["page 0", "page 1"]
+        monkeypatch.setattr(extraction, "estimate_page_count", lambda content: 0)
+        assert asyncio.run(extraction.extract_pdf_text_async(pdf)).splitlines() == ["page 0", "page 1"]
+    finally:
+        extraction.shutdown_executor()
+
+
+def test_extract_pdf_stops_early(monkeypatch):
+    """Test extraction skips remaining ranges past the char budget or once analysis is final."""
+    import asyncio
+    import extraction
+    from analysis import AnalysisProgress
+
+    monkeypatch.setattr(extraction, "PDF_PAGES_PER_TASK", 1)
+    monkeypatch.setattr(extraction, "PDF_MAX_CHARS", 12)
+    pdf = make_pdf(["first page!!", "second page", "third page"])
+    try:
+        assert asyncio.run(extraction.extract_pdf_text_async(pdf)) == "first page!!"
+
+        monkeypatch.setattr(extraction, "PDF_MAX_CHARS", 100000)
+        progress = AnalysisProgress()
+        monkeypatch.setattr(type(progress), "complete", property(lambda self: True))
+        assert asyncio.run(extraction.extract_pdf_text_async(pdf, progress)) == "first page!!"
+    finally:
+        extraction.shutdown_executor()
+
+
+def test_pdf_stream_text_reads_operators():
+    """Test the raw pass reads Tj/TJ strings from plain and deflated streams and skips images."""
+    import zlib
+    from pdfstream import UnsupportedPDF, content_stream_text, extract_stream_text
+
+    ops = b"BT /F1 12 Tf [(Py)-20(thon)-400(Docker)] TJ 0 -14 Td (C++ \\(3 yrs\\)\\040ok) Tj <20414253> Tj ET"
+    assert content_stream_text(ops).split() == ["Python", "Docker", "C++", "(3", "yrs)", "ok", "ABS"]
+
+    data = zlib.compress(ops)
+    pdf = (b"%%PDF-1.5\n1 0 obj\n<< /Type /Pages /Kids [2 0 R] /Count 1 >>\nendobj\n"
+           b"3 0 obj\n<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream\nendobj\n"
+           b"4 0 obj\n<< /Subtype /Image /Filter /DCTDecode /Length 6 >>\nstream\n\xff\xd8 BT \nendstream\nendobj\n"
+           % (len(data), data))
+    text, pages = extract_stream_text(pdf)
+    assert text.split()[:2] == ["Python", "Docker"] and pages == 1
+    with pytest.raises(UnsupportedPDF):
+        extract_stream_text(pdf.replace(b"/FlateDecode", b"/LZWDecode"))
+
+
+def test_pdf_stream_text_limits_and_incremental_updates():
+    """Test redefined objects are read from their last revision and decoding is bounded."""
+    import zlib
+    from pdfstream import UnsupportedPDF, extract_stream_text
+
+    def stream(number, ops):
+        return b"%d 0 obj\n<< /Length %d >>\nstream\n%s\nendstream\nendobj\n" % (number, len(ops), ops)
+
+    pages = b"%PDF-1.4\n1 0 obj\n<< /Type /Pages /Count 2 >>\nendobj\n"
+    pdf = pages + stream(3, b"BT (Java) Tj ET") + stream(4, b"BT (Docker) Tj ET") + stream(3, b"BT (Python) Tj ET")
+    assert extract_stream_text(pdf)[0].split() == ["Python", "Docker"]
+
+    bomb = zlib.compress(b"BT " + b"0" * 10 ** 6 + b" ET")
+    flate = b"3 0 obj\n<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream\nendobj\n" % (len(bomb), bomb)
+    assert extract_stream_text(pages + flate)[1] == 2
+    with pytest.raises(UnsupportedPDF):
+        extract_stream_text(pages + flate, max_chars=1000)
+    with pytest.raises(TimeoutError):
+        extract_stream_text(pdf, deadline=1.0)
+
+
+def test_pdf_tiers_fall_back_to_layout(monkeypatch):
+    """Test the stream tier serves text-rich PDFs and sparse ones fall back to pdfplumber."""
+    import asyncio
+    import extraction
+    from analysis import analyze_text
+    from metrics import PDF_TIER_TOTAL
+
+    rich = make_pdf(["Senior engineer with 9 years of Python, Docker and Kubernetes on AWS. " * 2] * 2)
+    sparse = make_pdf(["Python", "Docker"])
+    hits, fallbacks = PDF_TIER_TOTAL.value("stream", "hit"), PDF_TIER_TOTAL.value("layout", "hit")
+    try:
+        assert analyze_text(asyncio.run(extraction.extract_pdf_text_async(rich))) == analyze_text(
+            extraction.extract_pdf_text(rich))
+        asyncio.run(extraction.extract_pdf_text_async(sparse))
+    finally:
+        extraction.shutdown_executor()
+    assert PDF_TIER_TOTAL.value("stream", "hit") == hits + 1
+    assert PDF_TIER_TOTAL.value("layout", "hit") == fallbacks + 1
+
+    assert extraction.extract_pdf_tiered(rich)[1:] == (2, "stream")
+    monkeypatch.setattr(extraction, "PDF_FAST_TIERS", [])
+    assert extraction.extract_pdf_tiered(rich)[1:] == (2, "layout")
+
+
+def test_analysis_progress_completes_only_when_final():
+    """Test analysis is final only once every signal and a years mention were seen."""
+    from analysis import ADVANCED_SKILLS, SENIOR_KEYWORDS, SKILL_KEYWORDS, AnalysisProgress
+
+    progress = AnalysisProgress()
+    assert not progress.feed("Senior engineer, 8 years of Python")
+    everything = " ".join(kws[0] for kws in SKILL_KEYWORDS.values())
+    assert progress.feed(f"{everything} {SENIOR_KEYWORDS[0]} {ADVANCED_SKILLS[0]}")
+
+
+def test_upload_resumes_streams_ndjson():
+    """Test bulk upload streams one result line per file, zip members included."""
+    import io
+    import json
+    import zipfile
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("zipped/resume.txt", "Lead architect. Kubernetes, 9 years.")
+        zf.writestr("zipped/photo.png", b"\x89PNG\r\n\x1a\n\x00\x00")
+
+    response = client.post(
+        "/upload-resumes",
+        files=[
+            ("files", ("a.pdf", make_pdf(["Python and SQL, 2 years"]), "application/pdf")),
+            ("files", ("b.txt", b"Junior. Git and Bash.", "text/plain")),
+            ("files", ("batch.zip", archive.getvalue(), "application/zip")),
+        ]
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = {row["filename"]: row for row in map(json.loads, response.text.splitlines())}
+    assert set(lines) == {"a.pdf", "b.txt", "zipped/resume.txt", "zipped/photo.png"}
+    assert lines["a.pdf"]["skills"] == ["python", "sql"]
+    assert lines["b.txt"]["experience_level"] == "junior"
+    assert lines["zipped/resume.txt"]["experience_level"] == "senior"
+    assert "PDF and TXT" in lines["zipped/photo.png"]["error"]
+    assert "error" not in lines["a.pdf"]
+
+
+def test_upload_resumes_file_limit(monkeypatch):
+    """Test bulk uploads stop with an error line past the file limit."""
+    import json
+    import uploads
+
+    monkeypatch.setattr(uploads, "BULK_MAX_FILES", 1)
+    response = client.post(
+        "/upload-resumes",
+        files=[("files", ("a.txt", b"SQL", "text/plain")), ("files", ("b.txt", b"Git", "text/plain"))]
+    )
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert {"error": "Too many files (limit 1)"} in rows
+    assert sum(1 for row in rows if "filename" in row) == 1
+
+
+def test_upload_resumes_cancels_pending_files_on_disconnect(monkeypatch):
+    """Test files still being analyzed are cancelled when the NDJSON client goes away."""
+    import asyncio
+    import io
+    import main
+    from fastapi import UploadFile
+
+    cancelled = []
+
+    async def result_line(filename, load):
+        if filename != "fast.txt":
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.append(filename)
+                raise
+        return filename + "\n"
+
+    monkeypatch.setattr(main, "_bulk_result_line", result_line)
+    monkeypatch.setattr(main, "BULK_CONCURRENCY", 3)
+
+    async def disconnect_after_first_line():
+        files = [UploadFile(io.BytesIO(b"SQL"), filename=name) for name in ("slow1.txt", "fast.txt", "slow2.txt")]
+        body = (await main.upload_resumes(files)).body_iterator
+        assert await body.__anext__() == "fast.txt\n"
+        await body.aclose()
+        await asyncio.sleep(0)
+        # Checked before asyncio.run() cancels whatever is left on its own
+        assert sorted(cancelled) == ["slow1.txt", "slow2.txt"]
+
+    asyncio.run(disconnect_after_first_line())
+
+
+def test_upload_resume_async_job():
+    """Test async uploads return a job that can be polled and streamed as Server-Sent Events."""
+    import time
+
+    pdf = make_pdf(["Senior engineer, 8 years", "Python Docker Kubernetes"])
+    with TestClient(app) as live:
+        response = live.post("/upload-resume?mode=async", files={"file": ("resume.pdf", pdf, "application/pdf")})
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        assert response.headers["location"] == f"/jobs/{job_id}"
+
+        for _ in range(200):
+            job = live.get(f"/jobs/{job_id}").json()
+            if job["status"] in ("done", "failed"):
+                break
+            time.sleep(0.05)
+        assert job["status"] == "done"
+        assert job["result"] == {"skills": ["python", "docker"], "experience_level": "senior"}
+
+        bad = live.post("/upload-resume?mode=async", files={"file": ("r.pdf", b"%PDF-1.4 garbage", "application/pdf")})
+        events = live.get(f"/jobs/{bad.json()['job_id']}/events")
+        assert events.headers["content-type"].startswith("text/event-stream")
+        assert 'event: failed\ndata: {' in events.text
+        assert "Invalid or corrupted PDF file" in events.text
+
+    assert client.get("/jobs/unknown").status_code == 404
+
+
+def test_job_queue_bounds_and_expiry():
+    """Test the job queue rejects work past its size and drops results after the TTL."""
+    import asyncio
+    from jobs import JobQueue, QueueFull
+
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def handler(value):
+            await gate.wait()
+            return {"value": value}
+
+        queue = JobQueue(handler, workers=1, queue_size=1, ttl=0)
+        first = await queue.submit(1)
+        await asyncio.sleep(0)
+        second = await queue.submit(2)
+        with pytest.raises(QueueFull):
+            await queue.submit(3)
+        assert (first.status, second.status) == ("running", "queued")
+
+        gate.set()
+        events = [event async for event in queue.events(second)]
+        assert events[-1].startswith("event: done\n") and '"value":2' in events[-1]
+        assert await queue.get(first.id) is None
+        await queue.stop()
+
+    asyncio.run(scenario())
+
+
+def test_job_queue_shares_status_across_workers(tmp_path):
+    """Test a job accepted by one worker can be polled and streamed from another via the store."""
+    import asyncio
+    import profiling
+    from jobs import JobQueue, SQLiteJobStore
+
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def handler(value):
+            profiling.record_stage("job", 1.0)
+            await gate.wait()
+            return {"value": value}
+
+        path = str(tmp_path / "jobs.sqlite3")
+        accepting = JobQueue(handler, workers=1, store=SQLiteJobStore(path))
+        other = JobQueue(handler, workers=1, store=SQLiteJobStore(path))
+
+        # Submitted while a request's stages are being recorded; the job must not write into them
+        stages = {}
+        token = profiling._stages.set(stages)
+        job = await accepting.submit(7)
+        profiling._stages.reset(token)
+        await asyncio.sleep(0.05)
+
+        seen = await other.get(job.id)
+        assert seen.remote and seen.status == "running"
+        stream = other.events(seen)
+        assert (await stream.__anext__()).startswith("event: running\n")
+        gate.set()
+        assert '"value":7' in await stream.__anext__()
+        assert (await other.get(job.id)).status == "done"
+        assert stages == {}
+        await accepting.stop()
+
+    asyncio.run(scenario())
+
+
+def test_batch_cli_analyzes_directories_and_zips(tmp_path):
+    """Test the offline batch run reads folders, PDFs and zip members, and resumes."""
+    import json
+    import zipfile
+    import batch
+
+    resumes = tmp_path / "resumes"
+    resumes.mkdir()
+    (resumes / "a.txt").write_text("Senior Python developer with 7 years of AWS experience")
+    (resumes / "b.pdf").write_bytes(make_pdf(["Java developer using Docker"]))
+    (resumes / "c.bin").write_bytes(b"\x00\x01")
+    with zipfile.ZipFile(tmp_path / "more.zip", "w") as archive:
+        archive.writestr("d.txt", "React and SQL")
+    output = str(tmp_path / "results.jsonl")
+
+    progress = batch.run([str(resumes), str(tmp_path / "more.zip")], output, "jsonl", 1, 20, 30)
+    rows = {Path(row["source"]).name: row for row in map(json.loads, open(output))}
+    assert (progress.done, progress.errors) == (4, 1)
+    assert rows["a.txt"]["skills"] == ["python", "aws"] and rows["a.txt"]["experience_level"] == "senior"
+    assert "docker" in rows["b.pdf"]["skills"] and rows["b.pdf"]["pages"] == 1
+    assert rows["c.bin"]["error"] == "Only PDF and TXT files are supported"
+    assert "more.zip!d.txt" in rows
+
+    # A rerun only analyzes files missing from the output, even after a torn last line
+    (resumes / "e.txt").write_text("Go developer")
+    with open(output, "a") as f:
+        f.write('{"source": "trunc')
+    progress = batch.run([str(resumes), str(tmp_path / "more.zip")], output, "jsonl", 1, 20, 30)
+    assert (progress.done, progress.skipped) == (1, 4)
+    assert [json.loads(line)["source"] for line in open(output)][-1].endswith("e.txt")
+
+
+def test_batch_cli_turns_any_file_failure_into_a_row(tmp_path, monkeypatch):
+    """Test encrypted zip members and pages that hang become error rows instead of ending the run."""
+    import json
+    import time
+    import zipfile
+    import batch
+
+    archive = tmp_path / "locked.zip"
+    with zipfile.ZipFile(archive, "w") as z:
+        z.writestr("a.txt", "Python")
+    # Mark the member encrypted (general purpose flag bit 0) in both headers
+    data = archive.read_bytes()
+    data = data.replace(b"PK\x03\x04\x14\x00\x00\x00", b"PK\x03\x04\x14\x00\x01\x00")
+    archive.write_bytes(data.replace(b"PK\x01\x02\x14\x03\x14\x00\x00\x00", b"PK\x01\x02\x14\x03\x14\x00\x01\x00"))
+    output = str(tmp_path / "results.jsonl")
+    assert batch.run([str(archive)], output, "jsonl", 1, 20, 30).errors == 1
+    assert "encrypted" in json.loads(open(output).readline())["error"]
+
+    (tmp_path / "slow.pdf").write_bytes(make_pdf(["page"]))
+    monkeypatch.setattr(batch, "extract_pdf_tiered", lambda *args: time.sleep(5))
+    monkeypatch.setattr(batch, "TIMEOUT_GRACE_SECONDS", 0.1)
+    start = time.perf_counter()
+    row = batch.analyze_source((str(tmp_path / "slow.pdf"), str(tmp_path / "slow.pdf"), None), 0.1, 30)
+    assert row["error"] == "PDF took too long to process" and time.perf_counter() - start < 2
+
+
+def test_batch_cli_writes_csv(tmp_path):
+    """Test the batch CLI writes one CSV header and a row per file."""
+    import csv
+    import batch
+
+    (tmp_path / "a.txt").write_text("Python and Docker")
+    output = tmp_path / "results.csv"
+    assert batch.main([str(tmp_path / "a.txt"), "-o", str(output), "--workers", "1", "--quiet"]) == 0
+    assert batch.main([str(tmp_path / "a.txt"), "-o", str(output), "--workers", "1", "--quiet"]) == 0
+    rows = list(csv.DictReader(open(output)))
+    assert len(rows) == 1 and rows[0]["skills"] == "python docker"
+
+
+def test_pdf_stack_not_imported_at_startup():
+    """Test importing the app does not load pdfplumber."""
+    import subprocess
+
+    backend = str(Path(__file__).parent.parent / "backend" / "fastapi_ai")
+    code = "import sys, main; print('pdfplumber' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=backend, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+
+def test_pdf_pool_warm_up():
+    """Test warm-up spawns pool workers that have the PDF stack loaded."""
+    import asyncio
+    import extraction
+
+    try:
+        assert asyncio.run(extraction.warm_up_executor()) >= 1
+    finally:
+        extraction.shutdown_executor()
+
+
+def test_pdf_pool_recovers_from_a_killed_worker():
+    """Test a worker killed mid-run does not leave every later extraction failing."""
+    import asyncio
+    import os
+    import signal
+    import time
+    import extraction
+
+    pdf = make_pdf(["Recovered pool: Python and SQL"])
+    try:
+        asyncio.run(extraction.warm_up_executor())
+        for pid in list(extraction.get_executor()._processes):
+            os.kill(pid, signal.SIGKILL)
+        time.sleep(0.2)
+        assert "Recovered pool" in asyncio.run(extraction.extract_pdf_text_async(pdf))
+    finally:
+        extraction.shutdown_executor()
+
+
+def test_time_limit_interrupts_one_slow_call_and_nests():
+    """Test the worker-side limit stops work mid-call and an enclosing limit still fires."""
+    import time
+    from extraction import PDFExtractionTimeout, time_limit
+
+    with pytest.raises(PDFExtractionTimeout):
+        with time_limit(0.05):
+            time.sleep(2)
+    start = time.monotonic()
+    with pytest.raises(PDFExtractionTimeout):
+        with time_limit(0.2):
+            with time_limit(5):
+                time.sleep(2)
+    assert time.monotonic() - start < 1
+    with pytest.raises(PDFExtractionTimeout):
+        with time_limit(0.2):
+            with time_limit(0.05):
+                pass
+            time.sleep(2)
+
+
+# ============================================================================
+# ANALYSIS CACHE TESTS
+# ============================================================================
+
+def test_upload_resume_cache_skips_extraction(monkeypatch):
+    """Test re-uploading the same file is served from the cache."""
+    import main
+
+    pdf = make_pdf(["Cached resume: Python, AWS, 3 years"])
+    first = client.post("/upload-resume", files={"file": ("a.pdf", pdf, "application/pdf")})
+    assert first.status_code == 200
+
+    async def fail(content):
+        raise AssertionError("extraction should not run on a cache hit")
+
+    monkeypatch.setattr(main, "extract_pdf_text_async", fail)
+    hits = client.get("/cache-stats").json()["analysis"]["hits"]
+    second = client.post("/upload-resume", files={"file": ("b.pdf", pdf, "application/pdf")})
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert client.get("/cache-stats").json()["analysis"]["hits"] == hits + 1
+
+
+def test_upload_cache_keyed_by_analyzer_and_extraction_config(monkeypatch, tmp_path):
+    """Test results cached under another config are not served, and the disk tier is read off the loop."""
+    import cache
+    import extraction
+    import main
+
+    monkeypatch.setattr(main, "analysis_cache", cache.ResultCache(db_path=str(tmp_path / "cache.db")))
+    pdf = make_pdf(["Keyed resume: Python, Docker, 2 years"])
+    assert client.post("/upload-resume", files={"file": ("a.pdf", pdf, "application/pdf")}).status_code == 200
+
+    calls = []
+    real = main.extract_pdf_text_async
+
+    async def counting(content, progress=None):
+        calls.append(content)
+        return await real(content, progress)
+
+    monkeypatch.setattr(main, "extract_pdf_text_async", counting)
+    monkeypatch.setattr(extraction, "PDF_MAX_PAGES", extraction.PDF_MAX_PAGES + 1)
+    assert client.post("/upload-resume", files={"file": ("a.pdf", pdf, "application/pdf")}).status_code == 200
+    assert len(calls) == 1
+
+    text = {"text": "Keyed resume: Python, Docker, 2 years"}
+    assert client.post("/analyze-resume", json=text).status_code == 200
+    hits = main.analysis_cache.stats()["hits"]
+    monkeypatch.setattr(main, "ANALYZER_VERSION", main.ANALYZER_VERSION + 1)
+    assert client.post("/analyze-resume", json=text).status_code == 200
+    assert main.analysis_cache.stats()["hits"] == hits
+
+
+def test_result_cache_lru_ttl_and_memory_limits(monkeypatch):
+    """Test LRU order, byte ceiling and TTL expiry."""
+    import cache
+
+    c = cache.ResultCache(max_entries=2, max_bytes=1000, ttl=60)
+    c.set("a", {"v": 1})
+    c.set("b", {"v": 2})
+    assert c.get("a") == {"v": 1}
+    c.set("c", {"v": 3})  # evicts "b", the least recently used
+    assert c.get("b") is None
+    assert c.get("a") == {"v": 1}
+
+    c.set("big", "x" * 2000)  # larger than the whole cache, never stored
+    assert c.get("big") is None
+
+    now = cache.time.time()
+    monkeypatch.setattr(cache.time, "time", lambda: now + 61)
+    assert c.get("a") is None
+    assert c.stats()["evictions"] == 1
+
+
+def test_result_cache_disk_tier(tmp_path):
+    """Test entries survive in SQLite when memory is cold."""
+    from cache import ResultCache
+
+    db = str(tmp_path / "cache.db")
+    ResultCache(db_path=db).set("k", {"skills": ["sql"]})
+    fresh = ResultCache(db_path=db)
+    assert fresh.get("k") == {"skills": ["sql"]}
+    assert fresh.stats()["disk_hits"] == 1
+
+
+def test_launcher_shares_state_between_workers(tmp_path, monkeypatch):
+    """Test multi-worker launches default to shared SQLite files and split the PDF cores."""
+    from serve import worker_environment
+
+    for name in ("PDF_WORKERS", "ANALYSIS_CACHE_DB", "SESSION_DB", "EVALUATION_HISTORY_PATH"):
+        monkeypatch.delenv(name, raising=False)
+    env = worker_environment(workers=4, state_dir=str(tmp_path), cores=8)
+    assert env["PDF_WORKERS"] == "2"
+    assert env["ANALYSIS_CACHE_DB"].startswith(str(tmp_path))
+    assert env["SESSION_DB"].startswith(str(tmp_path))
+    assert env["EVALUATION_HISTORY_PATH"].startswith(str(tmp_path))
+    assert env["JOB_DB"].startswith(str(tmp_path))
+
+    assert "SESSION_DB" not in worker_environment(workers=1, state_dir=str(tmp_path), cores=8)
+    monkeypatch.setenv("SESSION_DB", "/data/sessions.db")
+    assert "SESSION_DB" not in worker_environment(workers=4, state_dir=str(tmp_path), cores=8)
+
+
 # ============================================================================
 # QUESTION GENERATION TESTS
 # ============================================================================
@@ -156,6 +857,85 @@ def test_generate_questions_response_schema():
         assert len(question["question"]) > 0
 
 
+def test_generate_questions_deterministic_with_etag():
+    """Test identical requests get identical questions and a stable ETag."""
+    body = {"role": "Backend Developer", "experience_level": "senior", "skills": ["sql", "python"]}
+    first = client.post("/generate-questions", json=body)
+    second = client.post("/generate-questions", json={**body, "skills": ["Python", "sql"]})
+    assert first.status_code == 200
+    assert first.json() == second.json()
+    assert first.headers["etag"] == second.headers["etag"]
+    assert "max-age" in first.headers["cache-control"]
+
+    questions = [q["question"] for q in first.json()["questions"]]
+    assert len(questions) == 5
+    assert len(set(questions)) == 5
+    assert questions[0] == "How do you design scalable systems?"  # role questions rank first
+
+
+def test_generate_questions_get_conditional():
+    """Test the GET variant matches POST and honors If-None-Match."""
+    params = {"role": "software engineer", "experience_level": "mid", "skills": ["docker", "api"]}
+    post = client.post("/generate-questions", json=params)
+    get = client.get("/generate-questions", params=params)
+    assert get.status_code == 200
+    assert get.json() == post.json()
+
+    cached = client.get("/generate-questions", params=params, headers={"If-None-Match": get.headers["etag"]})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+
+def test_generate_questions_seed_is_reproducible():
+    """Test a seed changes the mix but is stable for the same seed."""
+    body = {"role": "devops engineer", "experience_level": "junior", "skills": ["docker", "aws", "sql"]}
+    seeded = [client.post("/generate-questions", json={**body, "seed": 7}).json() for _ in range(2)]
+    assert seeded[0] == seeded[1]
+    unseeded = client.post("/generate-questions", json=body).json()
+    other_seeds = [client.post("/generate-questions", json={**body, "seed": s}).json() for s in range(1, 6)]
+    assert any(result != unseeded for result in other_seeds)
+
+
+def test_generate_questions_normalizes_experience_level():
+    """Test level case and padding do not change the questions or their ETag."""
+    body = {"role": "Backend Developer", "skills": ["sql"]}
+    plain = client.post("/generate-questions", json={**body, "experience_level": "senior"})
+    padded = client.post("/generate-questions", json={**body, "experience_level": " Senior ", "role": " backend developer"})
+    assert padded.json() == plain.json()
+    assert padded.headers["etag"] == plain.headers["etag"]
+
+
+def test_question_bank_resolves_role_aliases():
+    """Test free-text roles map to bank roles through aliases and word n-grams."""
+    from questions import QUESTION_BANK
+
+    assert QUESTION_BANK.resolve_role("SWE") == "software engineer"
+    assert QUESTION_BANK.resolve_role("Senior Data Scientist") == "data scientist"
+    assert QUESTION_BANK.resolve_role("Data Science") == "data scientist"
+    assert QUESTION_BANK.resolve_role("Project Manager") is None
+
+
+def test_question_bank_top_k_ranks_by_weight_and_tags(tmp_path):
+    """Test top-k retrieval from a bank file matches a brute-force ranking."""
+    import json
+    from questions import QuestionBank
+
+    entries = [
+        {"question": "plain", "category": "skill", "skills": ["sql"]},
+        {"question": "heavy", "category": "skill", "skills": ["sql"], "weight": 1.8},
+        {"question": "senior", "category": "skill", "skills": ["sql"], "levels": ["senior"]},
+        {"question": "senior python", "category": "skill", "skills": ["sql", "python"], "levels": ["senior"], "weight": 0.5},
+        {"question": "python only", "category": "skill", "skills": ["python"], "levels": ["senior"], "weight": 3},
+    ] + [{"question": f"filler {i}", "category": "skill", "skills": ["sql"], "weight": 0.1} for i in range(300)]
+    path = tmp_path / "bank.json"
+    path.write_text(json.dumps({"questions": entries, "role_aliases": {"dba": "database engineer"}}))
+    bank = QuestionBank.load(str(path))
+
+    top = bank.top_k("skill", "skill:sql", ["skill:sql", "skill:python", "level:senior"], 4)
+    assert [bank.texts[qid] for qid in top] == ["senior python", "senior", "heavy", "plain"]
+    assert bank.top_k("role", "role:database engineer", [], 3) == []
+
+
 # ============================================================================
 # ANSWER EVALUATION TESTS
 # ============================================================================
@@ -317,6 +1097,487 @@ def test_evaluate_answer_complex_scenario():
     assert data["confidence"] >= 65.0
 
 
+def test_extract_features_single_pass_record():
+    """Test the feature record that all answer scores are derived from."""
+    from scoring import extract_features, prepare_skills
+
+    features = extract_features(
+        "Our team faced slow builds. I led the fix and we cut build time by 3x; deploys improved 40%.",
+        prepare_skills(["Docker", "builds"])
+    )
+    assert features.word_count == 19
+    assert features.numeric_metric_hits == 2
+    assert features.metric_hits == 1
+    assert features.skill_hits == 1
+    assert features.collaboration_hits == 3  # team, led (inside "i led"), we
+    assert features.star_components == ["situation", "action", "result"]
+
+
+def test_extract_features_word_boundaries():
+    """Test STAR and collaboration words no longer match inside other words."""
+    from scoring import extract_features
+
+    features = extract_features("However, the tasks were answered; results followed.", [])
+    assert features.collaboration_hits == 0  # not "we" in "however"/"were"/"answered"
+    assert features.star_components == ["task", "result"]  # plurals still count
+
+
+def test_tfidf_similarity_tracks_the_question():
+    """Test answers score higher against the question they actually address."""
+    from relevance import ENGINE
+
+    answers = [
+        "I profiled the slow queries, added indexes and rewrote the query plan; database latency dropped.",
+        "I went hiking with friends last weekend and cooked dinner.",
+    ]
+    sql_question = "How do you optimize slow database queries?"
+    question_sim, skill_sim = ENGINE.score_batch(answers, [sql_question] * 2, ["sql"])
+    assert question_sim[0] > 0.2 and question_sim[1] == 0
+    assert skill_sim[0] > skill_sim[1]
+    assert ENGINE.similarity(answers[:1], ["How do you implement CI/CD pipelines?"])[0] < question_sim[0]
+
+
+def test_relevance_rewards_on_topic_answers():
+    """Test an on-topic answer outscores an equally long off-topic one, in batch and singly."""
+    from scoring import score_answer, score_answers
+
+    question = "How do you optimize slow database queries?"
+    on_topic = "I found the slow database queries with the profiler, then added an index and the query time dropped."
+    off_topic = "I organised the office party, booked the venue, ordered food and sent invitations to everyone."
+    batch = score_answers([on_topic, off_topic], [question, question], [])
+    assert batch[0]["relevance"] > batch[1]["relevance"]
+    assert batch == [score_answer(on_topic, [], question), score_answer(off_topic, [], question)]
+
+
+def test_evaluate_answers_batch_matches_single():
+    """Test batch evaluation returns the same per-answer scores as /evaluate-answer."""
+    answers = [
+        {"question": "Tell me about a time you optimized performance.",
+         "answer": "Situation: slow API. Task: I was asked to fix it. Action: I implemented caching. Result: latency decreased by 60%."},
+        {"question": "Describe a challenge.", "answer": "Fixed a bug in Python."},
+    ]
+    response = client.post(
+        "/evaluate-answers",
+        json={"answers": answers, "resume_skills": ["Python"], "role": "SWE"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["results"]) == 2
+
+    for item, result in zip(answers, data["results"]):
+        single = client.post("/evaluate-answer", json={**item, "resume_skills": ["Python"], "role": "SWE"})
+        assert single.json() == result
+
+    assert data["star_count"] == 1
+    assert data["average_relevance"] == round(sum(r["relevance"] for r in data["results"]) / 2, 1)
+
+
+def test_fast_json_matches_model_responses(monkeypatch):
+    """Test FAST_JSON bodies decode to exactly what the response models produce."""
+    import main
+
+    answers = [
+        {"question": "Q1", "answer": "Situation: slow API. Action: I added caching. Result: 60% faster."},
+        {"question": "Q2", "answer": "We shipped it with the team."},
+    ]
+    single = {**answers[0], "resume_skills": ["Python"], "role": "SWE"}
+    batch = {"answers": answers, "resume_skills": ["Python"], "role": "SWE"}
+    expected = [client.post("/evaluate-answer", json=single).json(), client.post("/evaluate-answers", json=batch).json()]
+
+    monkeypatch.setattr(main, "FAST_JSON", True)
+    fast = [client.post("/evaluate-answer", json=single), client.post("/evaluate-answers", json=batch)]
+    assert all(r.status_code == 200 and r.headers["content-type"] == "application/json" for r in fast)
+    assert [r.json() for r in fast] == expected
+
+
+def test_evaluate_answers_rejects_blank_answer():
+    """Test batch evaluation reports which answer is blank."""
+    response = client.post(
+        "/evaluate-answers",
+        json={"answers": [{"question": "Q1", "answer": "A real answer"}, {"question": "Q2", "answer": "   "}]}
+    )
+    assert response.status_code == 400
+    assert "Answer 2" in response.json()["detail"]
+
+
+def test_evaluate_answers_requires_answers():
+    """Test an empty batch is a validation error."""
+    response = client.post("/evaluate-answers", json={"answers": []})
+    assert response.status_code == 422
+
+
+def test_live_answer_matches_full_scan():
+    """Test features kept up to date edit by edit equal a fresh scan of the text."""
+    import random
+    from scoring import LiveAnswer, extract_features, prepare_skills
+
+    rng = random.Random(7)
+    words = ["i led", "the", "team", "projects", "improved", "40%", "3x", "python", "sql", "result", "goal", "\n"]
+    skills = prepare_skills(["Python", "SQL"])
+    question = "Tell me about a project where you improved performance"
+    live = LiveAnswer(skills, question)
+    for _ in range(300):
+        position = rng.randint(0, len(live.text))
+        delete = rng.randint(0, min(8, len(live.text) - position)) if rng.random() < 0.3 else 0
+        live.edit(position, delete, rng.choice(words) + rng.choice(["", " "]))
+
+        expected = extract_features(live.text, skills, question)
+        actual = live.features()
+        assert actual.question_similarity == pytest.approx(expected.question_similarity, abs=1e-4)
+        assert actual.skill_similarity == pytest.approx(expected.skill_similarity, abs=1e-4)
+        actual.question_similarity, actual.skill_similarity = expected.question_similarity, expected.skill_similarity
+        assert actual == expected
+
+
+def test_live_scoring_websocket(monkeypatch):
+    """Test the live scoring socket applies edits and pushes debounced scores."""
+    import main
+    from scoring import prepare_skills, score_answer
+
+    monkeypatch.setattr(main, "LIVE_SCORE_DEBOUNCE_SECONDS", 0.01)
+    question = "Tell me about a time you improved performance"
+    answer = "Our team faced slow queries and the goal was faster reports. I led the fix and improved latency by 40%."
+    with client.websocket_connect("/ws/evaluate-answer") as ws:
+        ws.send_json({"question": question, "resume_skills": ["SQL"]})
+        assert ws.receive_json()["version"] == 0
+
+        ws.send_json({"position": 10 ** 6, "insert": "x"})
+        for word in answer.split(" "):
+            ws.send_json({"insert": word + " "})
+        ws.send_json({"position": len(answer), "delete": 1})
+
+        messages = [ws.receive_json()]
+        while messages[-1].get("version", 0) < len(answer.split(" ")) + 1:
+            messages.append(ws.receive_json())
+        scores = messages[-1]
+        assert {"type": "error", "detail": "Edit is outside the answer"} in messages
+
+    expected = score_answer(answer, prepare_skills(["SQL"]), question)
+    assert scores["star_components"] == ["situation", "task", "action", "result"]
+    for field in ("relevance", "structure_star", "missing_points", "confidence"):
+        assert scores[field] == expected[field]
+
+
+
+# ============================================================================
+# INTERVIEW SESSION TESTS
+# ============================================================================
+
+def test_session_flow():
+    """Test create → next question → answer → summary using only the session ID."""
+    created = client.post(
+        "/sessions",
+        json={"skills": ["python", "sql"], "experience_level": "mid", "role": "software engineer"}
+    )
+    assert created.status_code == 201
+    session = created.json()
+    session_id = session["session_id"]
+    assert len(session["questions"]) == 5
+    assert session["evaluations"] == []
+
+    for question in session["questions"]:
+        nxt = client.get(f"/sessions/{session_id}/next-question")
+        assert nxt.json() == question
+        answer = client.post(
+            f"/sessions/{session_id}/answers",
+            json={"question_id": question["id"], "answer": "I wrote Python services and improved latency 30%."}
+        )
+        assert answer.status_code == 200
+        assert answer.json()["relevance"] > 0
+
+    assert client.get(f"/sessions/{session_id}/next-question").status_code == 204
+    summary = client.get(f"/sessions/{session_id}").json()
+    assert [e["question_id"] for e in summary["evaluations"]] == [1, 2, 3, 4, 5]
+
+
+def test_session_answer_errors():
+    """Test unknown sessions, unknown questions and duplicate answers."""
+    assert client.get("/sessions/does-not-exist").status_code == 404
+
+    session_id = client.post(
+        "/sessions", json={"experience_level": "junior", "role": "frontend developer"}
+    ).json()["session_id"]
+    url = f"/sessions/{session_id}/answers"
+    assert client.post(url, json={"question_id": 99, "answer": "text"}).status_code == 404
+    assert client.post(url, json={"question_id": 1, "answer": "text"}).status_code == 200
+    assert client.post(url, json={"question_id": 1, "answer": "again"}).status_code == 409
+
+
+def test_session_answer_scored_outside_write_transaction(monkeypatch, tmp_path):
+    """Test scoring runs before the SQLite write lock is taken, and a racing answer still gets 409."""
+    import main
+    from sessions import SQLiteSessionStore
+
+    store = SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"))
+    monkeypatch.setattr(main, "session_store", store)
+    session_id = client.post("/sessions", json={"experience_level": "mid", "role": "backend"}).json()["session_id"]
+    extract = main.extract_features
+
+    def scoring(*args):
+        assert not store._db.in_transaction
+        # Another worker answers the same question while this one is scoring
+        store.update(session_id, lambda session: session["evaluations"].setdefault("1", {"relevance": 1}))
+        return extract(*args)
+
+    monkeypatch.setattr(main, "extract_features", scoring)
+    response = client.post(f"/sessions/{session_id}/answers", json={"question_id": 1, "answer": "I shipped it."})
+    assert response.status_code == 409
+
+
+def test_memory_session_store_hands_out_copies():
+    """Test changes to a fetched session never reach the store except through update()."""
+    import sessions
+
+    store = sessions.MemorySessionStore()
+    session = {"id": "c", "asked": [1]}
+    store.create(session)
+    session["asked"].append(2)
+    fetched = store.get("c")
+    assert fetched["asked"] == [1]
+    fetched["asked"].append(3)
+    store.update("c", lambda s: s["asked"].append(4))
+    assert store.get("c")["asked"] == [1, 4]
+    assert fetched["asked"] == [1, 3]
+
+
+def test_session_stores_ttl_and_sqlite(tmp_path, monkeypatch):
+    """Test memory expiry and that SQLite sessions are visible to another store."""
+    import sessions
+
+    memory = sessions.MemorySessionStore(ttl=10)
+    memory.create({"id": "m", "evaluations": {}})
+    now = sessions.time.time()
+    monkeypatch.setattr(sessions.time, "time", lambda: now + 11)
+    assert memory.get("m") is None
+    monkeypatch.undo()
+
+    path = str(tmp_path / "sessions.db")
+    writer, reader = sessions.SQLiteSessionStore(path), sessions.SQLiteSessionStore(path)
+    writer.create({"id": "s", "evaluations": {}})
+    writer.update("s", lambda s: s["evaluations"].update({"1": {"relevance": 5.0}}))
+    assert reader.get("s")["evaluations"] == {"1": {"relevance": 5.0}}
+    with pytest.raises(KeyError):
+        reader.update("missing", lambda s: None)
+
+
+# ============================================================================
+# EVALUATION HISTORY TESTS
+# ============================================================================
+
+def test_candidate_history_endpoints():
+    """Test evaluations sent with a candidate ID are summarized and trended."""
+    import uuid
+
+    candidate = uuid.uuid4().hex
+    weak = "We fixed it."
+    strong = ("At my company our team faced a slow API and the goal was to cut latency. "
+              "I implemented caching and the result was 40% faster responses.")
+    response = client.post("/evaluate-answers", json={
+        "answers": [{"question": "Q", "answer": weak}, {"question": "Q", "answer": strong}],
+        "candidate_id": candidate,
+    })
+    assert response.status_code == 200
+    client.post("/evaluate-answer", json={"question": "Q", "answer": strong, "candidate_id": candidate})
+    client.post("/evaluate-answer", json={"question": "Q", "answer": strong})
+
+    session = client.post("/sessions", json={
+        "skills": [], "experience_level": "mid", "role": "software engineer", "candidate_id": candidate
+    }).json()
+    client.post(f"/sessions/{session['session_id']}/answers", json={"question_id": 1, "answer": weak})
+
+    summary = client.get(f"/candidates/{candidate}/history").json()
+    assert summary["evaluations"] == 4
+    assert summary["star_rate"] == 0.5
+    assert summary["star_components"]["task"] == 0.5
+    assert summary["weakest_star_component"] in ("situation", "task", "action", "result")
+    assert summary["missing_points"]["detail"] == 1.0
+    assert summary["relevance"]["p10"] <= summary["relevance"]["p50"] <= summary["relevance"]["p90"]
+
+    trend = client.get(f"/candidates/{candidate}/history/trend?bucket=week").json()
+    assert [point["evaluations"] for point in trend["points"]] == [4]
+    assert client.get("/candidates/nobody/history").status_code == 404
+
+
+def test_history_record_file_is_shared(tmp_path):
+    """Test workers sharing a record file see each other's rows and aggregates match a brute-force pass."""
+    import random
+    import numpy as np
+    from history import ROW, EvaluationHistory
+    from scoring import extract_features, score_features
+
+    path = str(tmp_path / "history.bin")
+    writer, reader = EvaluationHistory(path), EvaluationHistory(path)
+    rng = random.Random(3)
+    words = ["I", "led", "the", "team", "result", "40%", "goal", "we", "improved", "context"]
+    scored = []
+    for day in range(10):
+        answers = [" ".join(rng.choices(words, k=rng.randint(3, 90))) for _ in range(5)]
+        pairs = [(f, score_features(f)) for f in (extract_features(a, [], "Q") for a in answers)]
+        writer.record("cand", pairs, now=1_700_000_000 + day * 86400)
+        scored.extend(result for _, result in pairs)
+    writer.record("other", pairs, now=1_700_000_000)
+
+    assert len(reader) == 55 and (tmp_path / "history.bin").stat().st_size == 55 * ROW.itemsize
+    summary = reader.summary("cand")
+    relevance = sorted(r["relevance"] for r in scored)
+    assert summary["relevance"]["p50"] == relevance[24]
+    assert summary["relevance"]["p90"] == relevance[44]
+    assert summary["confidence"]["mean"] == round(float(np.mean([r["confidence"] for r in scored])), 1)
+    assert summary["star_rate"] == round(sum(r["structure_star"] for r in scored) / 50, 3)
+    assert len(reader.trend("cand", "day")) == 10
+
+
+# ============================================================================
+# METRICS TESTS
+# ============================================================================
+
+def test_metrics_endpoint_reports_routes_and_stages():
+    """Test /metrics exposes per-route counts, latency histograms and upload stages."""
+    client.get("/health")
+    client.post("/upload-resume", files={"file": ("m.pdf", make_pdf(["Metrics page", "Docker"]), "application/pdf")})
+    session_id = client.post("/sessions", json={"experience_level": "mid", "role": "x"}).json()["session_id"]
+    client.get(f"/sessions/{session_id}")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in body
+    assert 'http_request_duration_seconds_bucket{method="POST",route="/upload-resume",le="+Inf"}' in body
+    assert 'route="/sessions/{session_id}"' in body  # templated, not the raw ID
+    assert session_id not in body
+    for stage in ("read", "pdf_parse", "analyze"):
+        assert f'resume_upload_stage_seconds_count{{stage="{stage}"}}' in body
+    assert "pdf_extracted_pages_total" in body
+    assert 'analysis_cache_lookups_total{result="hit"}' in body
+
+
+def test_metrics_label_rejected_requests_by_route():
+    """Test 413s and 503s answered before routing are still counted under their route."""
+    client.post(
+        "/upload-resume",
+        content=b"x" * 64,
+        headers={"Content-Type": "multipart/form-data; boundary=x", "Content-Length": str(10 ** 9)}
+    )
+    body = client.get("/metrics").text
+    assert 'http_requests_total{method="POST",route="/upload-resume",status="413"}' in body
+    assert 'route="unmatched",status="413"' not in body
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test histogram rendering follows the Prometheus exposition format."""
+    from metrics import Histogram
+
+    h = Histogram("demo_seconds", "Demo.", ["op"], buckets=(0.1, 1.0))
+    h.observe(0.05, "a")
+    h.observe(0.5, "a")
+    h.observe(5.0, "a")
+    lines = h.render()
+    assert 'demo_seconds_bucket{op="a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{op="a",le="1"} 2' in lines
+    assert 'demo_seconds_bucket{op="a",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{op="a"} 3' in lines
+
+
+def test_server_timing_header_reports_stages():
+    """Test every response carries a Server-Timing breakdown of the stages it ran."""
+    pdf = make_pdf(["Staff engineer", "Rust and Go"])
+    response = client.post("/upload-resume", files={"file": ("timing.pdf", pdf, "application/pdf")})
+    stages = [entry.split(";")[0] for entry in response.headers["server-timing"].split(", ")]
+    assert stages == ["admission", "read", "pdf_stream", "pdf_layout", "pdf_parse", "analyze", "total"]
+
+    response = client.post("/evaluate-answer", json={"question": "Q", "answer": "I led the team."})
+    assert "score;dur=" in response.headers["server-timing"]
+    assert client.get("/health").headers["server-timing"].startswith("total;dur=")
+
+
+def test_profiling_requires_token(monkeypatch, tmp_path):
+    """Test only requests with the configured token are profiled to PROFILE_DIR."""
+    import profiling
+
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "s3cret")
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    body = {"answers": [{"question": "Q", "answer": "I improved latency by 40% " * 50}] * 50}
+
+    response = client.post("/evaluate-answers", json=body, headers={"X-Profile": "wrong"})
+    assert "profile;" not in response.headers["server-timing"]
+    assert list(tmp_path.iterdir()) == []
+
+    response = client.post("/evaluate-answers", json=body, headers={"X-Profile": "s3cret"})
+    profile_id = response.headers["server-timing"].split('profile;desc="')[1].rstrip('"')
+    lines = (tmp_path / f"{profile_id}.folded").read_text().splitlines()
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+# ============================================================================
+# ADMISSION CONTROL TESTS
+# ============================================================================
+
+def test_admission_budget_queues_then_rejects():
+    """Test a full budget queues up to its limit, rejects beyond it and hands slots to waiters."""
+    import asyncio
+    from admission import Budget, Overloaded
+
+    async def scenario():
+        budget = Budget("test", limit=1, queue=1, timeout=5)
+        await budget.acquire()
+        waiter = asyncio.create_task(budget.acquire())
+        await asyncio.sleep(0)
+        assert budget.waiting == 1
+        with pytest.raises(Overloaded) as rejected:
+            await budget.acquire()
+        assert rejected.value.reason == "queue_full"
+
+        budget.release()
+        await waiter
+        assert (budget.active, budget.waiting) == (1, 0)
+        budget.release()
+        assert budget.active == 0
+
+        slow = Budget("slow", limit=1, queue=1, timeout=0.01)
+        await slow.acquire()
+        with pytest.raises(Overloaded) as timed_out:
+            await slow.acquire()
+        assert timed_out.value.reason == "timeout" and slow.waiting == 0
+
+    asyncio.run(scenario())
+
+
+def test_admission_rejects_with_retry_after(monkeypatch):
+    """Test a saturated upload budget answers 503 while scoring and health still work."""
+    import main
+
+    upload = main.admission_budgets["upload"]
+    monkeypatch.setattr(upload, "active", upload.limit)
+    monkeypatch.setattr(upload, "queue", 0)
+
+    response = client.post("/upload-resume", files={"file": ("r.txt", b"Python", "text/plain")})
+    assert response.status_code == 503
+    assert int(response.headers["retry-after"]) > 0
+    assert client.get("/health").status_code == 200
+    assert client.post("/analyze-resume", json={"text": "Python"}).status_code == 200
+
+    metrics = client.get("/metrics").text
+    assert 'admission_rejections_total{budget="upload",reason="queue_full"}' in metrics
+
+
+def test_admission_rejections_keep_cors_headers(monkeypatch):
+    """Test preflights bypass admission and 503s stay readable by the browser frontend."""
+    import main
+
+    upload = main.admission_budgets["upload"]
+    monkeypatch.setattr(upload, "active", upload.limit)
+    monkeypatch.setattr(upload, "queue", 0)
+    origin = {"Origin": "http://localhost:3000"}
+
+    preflight = client.options("/upload-resume", headers={**origin, "Access-Control-Request-Method": "POST"})
+    assert preflight.status_code == 200
+
+    response = client.post("/upload-resume", files={"file": ("r.txt", b"Python", "text/plain")}, headers=origin)
+    assert response.status_code == 503
+    assert response.headers["access-control-allow-origin"] == "http://localhost:3000"
+    assert "retry-after" in response.headers["access-control-expose-headers"].lower()
+
 # ============================================================================
 # EDGE CASES & ERROR HANDLING
 # ============================================================================